@@ -0,0 +1,60 @@
+"""
+Time show balancing over a library of thousands of shows: the previous approach (walking every episode of every
+show through the show dicts) versus one search over the running durations, to the shortest show, an explicit
+length and the median show length.
+
+Usage: python -m benchmarks.balance_shows [show_count] [program_count]
+"""
+import sys
+import time
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_program_table import ProgramTable
+from dizqueTV.models.media import Program
+from benchmarks.stand_in_server import make_program
+
+
+def balance_by_walking(media_items: list, margin_of_correction: float = 0.1) -> list:
+    # how balancing worked before: a running duration kept per show, one episode at a time
+    show_dict = helpers.add_durations_to_show_dict(
+        show_dict=helpers.order_show_dict(show_dict=helpers.make_show_dict(media_items=media_items))
+    )
+    shortest_show_length = min(show["duration"] for show in show_dict.values())
+    final_shows = []
+    for show in show_dict.values():
+        running_duration = 0
+        episodes = [episode for season in show["seasons"].values() for episode in season["episodes"].values()]
+        for episode in episodes:
+            if (running_duration + episode["duration"]) / shortest_show_length > 1 + margin_of_correction:
+                break
+            final_shows.append(episode["episode"])
+            running_duration += episode["duration"]
+    return final_shows + helpers.sort_media_alphabetically(media_items=helpers.get_non_shows(media_items=media_items))
+
+
+def main(show_count=5000, program_count=200000):
+    # uneven shows: show n gets roughly n / show_count of the extra episodes
+    rows = [
+        make_program(index=index, show_count=show_count - (index * show_count // program_count) // 2)
+        for index in range(program_count)
+    ]
+    programs = [Program(data=row, dizque_instance=None, channel_instance=None) for row in rows]
+    table = ProgramTable(rows=rows)
+    print(f"{program_count} episodes of {len(table.show_index(alphabetical=False))} shows:")
+
+    start = time.perf_counter()
+    kept = len(balance_by_walking(media_items=programs))
+    print(f"  walking episodes (shortest):   {time.perf_counter() - start:.3f} s, {kept} kept")
+    for label, media_items, options in (
+            ("searching Programs (shortest)", programs, {}),
+            ("searching table (shortest)", table, {}),
+            ("searching table (4 hours)", table, {"target_duration": 4 * 60 * 60 * 1000}),
+            ("searching table (median)", table, {"target_percentile": 50}),
+    ):
+        start = time.perf_counter()
+        kept = len(helpers.balance_shows(media_items=media_items, **options))
+        print(f"  {label + ':':<30} {time.perf_counter() - start:.3f} s, {kept} kept")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
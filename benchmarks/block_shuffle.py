@@ -0,0 +1,68 @@
+"""
+Time the block shuffle, in order and randomized, over lineups of 1,000, 10,000 and 100,000 items: the previous
+approach (one show draw per block and a list pop per episode) versus slicing blocks out of each show's episodes.
+
+Usage: python -m benchmarks.block_shuffle [program_count ...]
+"""
+import random
+import sys
+import time
+
+import numpy
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_program_table import ProgramTable
+from dizqueTV.models.media import Program
+from benchmarks.program_table_sorting import make_rows
+
+
+def block_shuffle_by_popping(media_items: list, block_length: int, randomize: bool) -> list:
+    # how the shuffle worked before: every episode popped off the front of its show's list
+    non_shows = helpers.get_non_shows(media_items=media_items)
+    show_dict = helpers.condense_show_dict(
+        show_dict=helpers.order_show_dict(show_dict=helpers.make_show_dict(media_items=media_items))
+    )
+    final_show_list = []
+    while len(final_show_list) < show_dict["count"]:
+        if randomize:
+            show_name = random.choice(list(show_dict["shows"].keys()))
+            for _ in range(0, random.randint(1, block_length)):
+                if show_dict["shows"][show_name]["episodes"]:
+                    final_show_list.append(show_dict["shows"][show_name]["episodes"].pop(0))
+                else:
+                    del show_dict["shows"][show_name]
+                    break
+        else:
+            for data in show_dict["shows"].values():
+                for _ in range(0, block_length):
+                    if not data["episodes"]:
+                        break
+                    final_show_list.append(data["episodes"].pop(0))
+    return final_show_list + non_shows
+
+
+def main(program_counts=(1000, 10000, 100000), block_length=4):
+    random_generator = numpy.random.default_rng(seed=0)
+    for program_count in program_counts:
+        rows = make_rows(program_count=program_count)
+        programs = [Program(data=row, dizque_instance=None, channel_instance=None) for row in rows]
+        table = ProgramTable(rows=rows)
+        for randomize in (False, True):
+            start = time.perf_counter()
+            block_shuffle_by_popping(media_items=programs, block_length=block_length, randomize=randomize)
+            timings = [f"popping {time.perf_counter() - start:.2f} s"]
+            for label, media_items in (("sliced (Programs)", programs), ("sliced (ProgramTable)", table)):
+                start = time.perf_counter()
+                helpers.sort_media_block_shuffle(
+                    media_items=media_items,
+                    block_length=block_length,
+                    randomize=randomize,
+                    random_generator=random_generator,
+                )
+                timings.append(f"{label} {time.perf_counter() - start:.3f} s")
+            mode = "randomized" if randomize else "in order"
+            print(f"{program_count:>7} items, {mode:>10}: {', '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main(program_counts=[int(count) for count in sys.argv[1:]] or (1000, 10000, 100000))
@@ -0,0 +1,60 @@
+"""
+Time splitting a large lineup into Channel at Night blocks: the previous approach (repeatedly taking
+the programs that fit and rebuilding the list of leftovers) versus the block partitioner.
+
+Usage: python -m benchmarks.channel_at_night_blocks [program_count ...]
+"""
+import sys
+import time
+
+from dizqueTV.models.channels import Channel
+from dizqueTV.models.media import Program
+from benchmarks.stand_in_server import make_channel, make_program
+
+REGULAR_BLOCK = 18 * 60 * 60 * 1000
+NIGHT_BLOCK = 6 * 60 * 60 * 1000
+
+
+def blocks_by_leftovers(programs: list) -> list:
+    # how blocks were built before: each pass keeps what fits, then scans for everything it did not keep
+    blocks = []
+    programs_left = programs
+    while programs_left:
+        running_total = 0
+        programs_to_return = []
+        for program in programs_left:
+            if running_total + program.duration <= REGULAR_BLOCK:
+                running_total += program.duration
+                programs_to_return.append(program)
+            else:
+                break
+        programs_left = [program for program in programs_left if program not in programs_to_return]
+        blocks.append(programs_to_return)
+    return blocks
+
+
+def main(program_counts=(2000, 5000, 20000, 100000)):
+    channel = Channel(data=make_channel(number=1, program_count=0), dizque_instance=None)
+    for program_count in program_counts:
+        programs = [
+            Program(data=make_program(index=index), dizque_instance=None, channel_instance=None)
+            for index in range(program_count)
+        ]
+        timings = []
+        if program_count <= 20000:
+            start = time.perf_counter()
+            blocks_by_leftovers(programs=programs)
+            timings.append(f"leftovers {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        channel._interlace_night_channel(
+            programs=programs,
+            night_channel_number=2,
+            regular_block_length=REGULAR_BLOCK,
+            night_block_length=NIGHT_BLOCK,
+        )
+        timings.append(f"partitioner {time.perf_counter() - start:.3f} s")
+        print(f"{program_count:>7} programs: {', '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main(program_counts=[int(count) for count in sys.argv[1:]] or (2000, 5000, 20000, 100000))
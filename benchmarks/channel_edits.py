@@ -0,0 +1,48 @@
+"""
+Compare the old GET + POST + GET channel edit with the single-POST Channel.update against a local stand-in server.
+
+Usage: python -m benchmarks.channel_edits [program_count] [edit_count]
+"""
+import sys
+import time
+
+from dizqueTV import API
+from benchmarks.stand_in_server import StandInServer
+
+
+def edit_with_round_trips(api: API, edit_count: int):
+    channel = api.get_channel(channel_number=1)
+    for i in range(edit_count):
+        api.update_channel(channel_number=channel.number, name=f"Edit {i}")
+        channel.refresh()
+
+
+def edit_locally(api: API, edit_count: int):
+    channel = api.get_channel(channel_number=1)
+    for i in range(edit_count):
+        channel.update(name=f"Edit {i}")
+
+
+def main(program_count: int = 30000, edit_count: int = 5):
+    with StandInServer(channel_count=1, program_count=program_count) as server:
+        for label, edit, conflicts in (
+                ("GET + POST + GET", edit_with_round_trips, False),
+                ("single POST", edit_locally, False),
+                ("single POST + check", edit_locally, True),
+        ):
+            with API(url=server.url, allow_analytics=False, detect_channel_conflicts=conflicts) as api:
+                server.reset_counters()
+                start = time.perf_counter()
+                edit(api=api, edit_count=edit_count)
+                elapsed = time.perf_counter() - start
+            print(
+                f"{label:>20}: {edit_count} edits in {elapsed:.2f} s, {server.requests} requests, "
+                f"{server.bytes_sent / 1024 / 1024:.1f} MiB downloaded"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 30000,
+        edit_count=int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,40 @@
+"""
+Compare peak memory of decoding a large channel's programs in one piece versus streaming them.
+
+Usage: python -m benchmarks.channel_streaming_memory [program_count]
+"""
+import sys
+import time
+import tracemalloc
+
+from dizqueTV import API
+from benchmarks.stand_in_server import stand_in_server_process
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(program_count: int = 100000):
+    with stand_in_server_process(channel_count=1, program_count=program_count) as url:
+        with API(url=url, allow_analytics=False) as api:
+            runs = (
+                ("response.json()", lambda: len(api._get_json(endpoint="/channel/programs/1", timeout=30))),
+                ("iter_channel_programs", lambda: sum(1 for _ in api.iter_channel_programs(channel_number=1))),
+            )
+            for label, func in runs:
+                count, elapsed, peak = measure(func)
+                print(
+                    f"{label:>22}: {count} programs in {elapsed:.2f} s, "
+                    f"peak {peak / 1024 / 1024:.1f} MiB allocated"
+                )
+
+
+if __name__ == "__main__":
+    main(program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,34 @@
+"""
+Compare API.channels with and without connection reuse against a local stand-in server.
+
+Usage: python -m benchmarks.channels_connection_pool [channel_count]
+"""
+import sys
+import time
+
+from dizqueTV import API
+from benchmarks.stand_in_server import StandInServer
+
+
+def run(server: StandInServer, keep_alive: bool, rounds: int = 3):
+    with API(url=server.url, allow_analytics=False, keep_alive=keep_alive) as api:
+        server.reset_counters()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            channels = api.channels
+        elapsed = (time.perf_counter() - start) / rounds
+    return len(channels), elapsed, server.connections / rounds, server.requests / rounds
+
+
+def main(channel_count: int = 200):
+    with StandInServer(channel_count=channel_count) as server:
+        for label, keep_alive in (("no keep-alive", False), ("pooled keep-alive", True)):
+            count, elapsed, connections, requests = run(server=server, keep_alive=keep_alive)
+            print(
+                f"{label:>18}: {count} channels in {elapsed * 1000:.1f} ms/round, "
+                f"{connections:.0f} TCP connections for {requests:.0f} requests"
+            )
+
+
+if __name__ == "__main__":
+    main(channel_count=int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,64 @@
+"""
+Time the cyclical shuffle over lineups of 1,000, 10,000 and 100,000 items: the previous approach
+(one weighted draw and list pop per item) versus the batched version.
+
+Usage: python -m benchmarks.cyclical_shuffle [program_count ...]
+"""
+import random
+import sys
+import time
+
+import numpy
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_program_table import ProgramTable
+from dizqueTV.models.media import Program
+from benchmarks.program_table_sorting import make_rows
+
+
+def cyclical_shuffle_by_popping(media_items: list) -> list:
+    # how the shuffle worked before: a weighted category draw, a show draw and a pop(0) for every item
+    non_shows = helpers.get_non_shows(media_items=media_items)
+    random.shuffle(non_shows)
+    show_dict = helpers.order_show_dict(show_dict=helpers.make_show_dict(media_items=media_items))
+    shows = [
+        helpers.rotate_items(items=[episode for episodes in seasons.values() for episode in episodes.values()])
+        for seasons in show_dict.values()
+    ]
+    remaining = sum(len(episodes) for episodes in shows)
+    indexes = list(range(len(shows)))
+    final_list = []
+    while remaining or non_shows:
+        sizes = {"show": remaining, "non_show": len(non_shows)}
+        sizes = {category: size for category, size in sizes.items() if size}
+        if helpers.weighted_choice_by_sizes_dict(items_and_sizes=sizes) == "show":
+            index = random.choice(indexes)
+            final_list.append(shows[index].pop(0))
+            remaining -= 1
+            if not shows[index]:
+                indexes.remove(index)
+        else:
+            final_list.append(non_shows.pop(0))
+    return final_list
+
+
+def main(program_counts=(1000, 10000, 100000)):
+    random_generator = numpy.random.default_rng(seed=0)
+    for program_count in program_counts:
+        rows = make_rows(program_count=program_count)
+        programs = [Program(data=row, dizque_instance=None, channel_instance=None) for row in rows]
+        start = time.perf_counter()
+        cyclical_shuffle_by_popping(media_items=programs)
+        timings = [f"popping {time.perf_counter() - start:.2f} s"]
+        for label, media_items in (
+                ("batched (Programs)", programs),
+                ("batched (ProgramTable)", ProgramTable(rows=rows)),
+        ):
+            start = time.perf_counter()
+            helpers.sort_media_cyclical_shuffle(media_items=media_items, random_generator=random_generator)
+            timings.append(f"{label} {time.perf_counter() - start:.3f} s")
+        print(f"{program_count:>7} items: {', '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main(program_counts=[int(count) for count in sys.argv[1:]] or (1000, 10000, 100000))
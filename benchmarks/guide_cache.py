@@ -0,0 +1,41 @@
+"""
+Time repeated API.guide calls, as an EPG proxy makes on every client request,
+with and without the guide cache, against a stand-in server whose guide rarely changes.
+
+Usage: python -m benchmarks.guide_cache [call_count] [channel_count] [program_count]
+"""
+import sys
+import time
+
+from dizqueTV import API
+from benchmarks.stand_in_server import StandInServer
+
+
+def main(call_count: int = 100, channel_count: int = 50, program_count: int = 200):
+    with StandInServer(channel_count=channel_count, program_count=program_count) as server:
+        server.guide()
+        for cache_guide in (False, True):
+            with API(url=server.url, allow_analytics=False, cache_guide=cache_guide) as api:
+                server.reset_counters()
+                start = time.perf_counter()
+                for call in range(call_count):
+                    if call % 20 == 0:
+                        # the server updates its guide now and then
+                        server.guide_last_update = f"2021-01-01T00:00:{call // 20:02d}.000Z"
+                    guide = api.guide
+                    # a client usually only looks at one channel
+                    programs = guide.channels[call % len(guide.channels)].programs
+                    assert programs
+                elapsed = time.perf_counter() - start
+                print(
+                    f"cache_guide={cache_guide!s:>5}: {call_count} guide calls in {elapsed:.2f} s, "
+                    f"{server.requests} requests, {server.bytes_sent / 1024 / 1024:.1f} MiB downloaded"
+                )
+
+
+if __name__ == "__main__":
+    main(
+        call_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        channel_count=int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        program_count=int(sys.argv[3]) if len(sys.argv) > 3 else 200,
+    )
@@ -0,0 +1,76 @@
+"""
+Time grid-style guide queries (what is on now on every channel, and what airs in a 3-hour window)
+by walking GuideChannel.programs versus using the guide's interval index.
+
+Usage: python -m benchmarks.guide_index [channel_count] [query_count]
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from dizqueTV.helpers import datetime_to_string
+from dizqueTV.models.guide import Guide
+from benchmarks.stand_in_server import StandInServer
+
+
+def on_now_by_walking(guide: Guide, moment: datetime) -> dict:
+    moment = datetime_to_string(datetime_object=moment)
+    return {
+        channel.number: next(
+            (program for program in channel.programs if program.start <= moment < program.stop), None
+        )
+        for channel in guide.channels
+    }
+
+
+def window_by_walking(guide: Guide, from_date: datetime, to_date: datetime) -> dict:
+    from_date = datetime_to_string(datetime_object=from_date)
+    to_date = datetime_to_string(datetime_object=to_date)
+    return {
+        channel.number: [
+            program for program in channel.programs if program.stop > from_date and program.start < to_date
+        ]
+        for channel in guide.channels
+    }
+
+
+def main(channel_count: int = 200, query_count: int = 50):
+    guide_data = json.loads(StandInServer(channel_count=channel_count, program_count=50).guide())
+    guide = Guide(data=guide_data, dizque_instance=None)
+    for channel in guide.channels:
+        assert channel.programs
+    random.seed(0)
+    moments = [datetime(2021, 1, 1) + timedelta(minutes=random.randint(0, 60 * 66)) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    index = guide.index
+    print(f"building the index for {channel_count} channels: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for label, by_walking, by_index in (
+            (
+                    "on now, every channel",
+                    lambda moment: on_now_by_walking(guide=guide, moment=moment),
+                    lambda moment: index.at(moment=moment),
+            ),
+            (
+                    "3-hour window, every channel",
+                    lambda moment: window_by_walking(guide=guide, from_date=moment, to_date=moment + timedelta(hours=3)),
+                    lambda moment: index.between(from_date=moment, to_date=moment + timedelta(hours=3)),
+            ),
+    ):
+        timings = []
+        for func in (by_walking, by_index):
+            start = time.perf_counter()
+            results = [func(moment) for moment in moments]
+            timings.append((time.perf_counter() - start) / query_count * 1000)
+        assert results == [by_walking(moment) for moment in moments]
+        print(f"{label:>30}: walking {timings[0]:.2f} ms, index {timings[1]:.2f} ms per query")
+
+
+if __name__ == "__main__":
+    main(
+        channel_count=int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        query_count=int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
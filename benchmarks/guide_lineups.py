@@ -0,0 +1,62 @@
+"""
+Time fetching a 6-hour lineup for every guide channel against a stand-in server with some latency:
+one channel at a time, concurrently with Guide.get_lineups, and again after sliding the window 30 minutes.
+
+Usage: python -m benchmarks.guide_lineups [channel_count] [latency_ms]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from dizqueTV import API
+from benchmarks.stand_in_server import StandInServer
+
+WINDOW_START = datetime(2021, 1, 1, 12)
+WINDOW = timedelta(hours=6)
+
+
+def report(label: str, server: StandInServer, func) -> None:
+    server.reset_counters()
+    start = time.perf_counter()
+    lineups = func()
+    elapsed = time.perf_counter() - start
+    programs = sum(len(lineup) for lineup in lineups.values())
+    print(
+        f"{label:>30}: {elapsed:6.2f} s, {server.requests:4d} requests, "
+        f"{server.bytes_sent / 1024:7.1f} KiB downloaded, {programs} programs"
+    )
+
+
+def main(channel_count: int = 200, latency_ms: float = 20):
+    with StandInServer(channel_count=channel_count, program_count=50, latency=latency_ms / 1000) as server:
+        server.guide()
+        with API(url=server.url, allow_analytics=False, cache_guide=False) as api:
+            guide = api.guide
+            report(
+                label="get_lineup, one at a time",
+                server=server,
+                func=lambda: {
+                    channel.number: channel.get_lineup(from_date=WINDOW_START, to_date=WINDOW_START + WINDOW)
+                    for channel in guide.channels
+                },
+            )
+        with API(url=server.url, allow_analytics=False, max_workers=20, pool_maxsize=20) as api:
+            guide = api.guide
+            report(
+                label="get_lineups",
+                server=server,
+                func=lambda: guide.get_lineups(from_date=WINDOW_START, to_date=WINDOW_START + WINDOW),
+            )
+            slid = WINDOW_START + timedelta(minutes=30)
+            report(
+                label="get_lineups, 30 minutes later",
+                server=server,
+                func=lambda: guide.get_lineups(from_date=slid, to_date=slid + WINDOW),
+            )
+
+
+if __name__ == "__main__":
+    main(
+        channel_count=int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        latency_ms=float(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
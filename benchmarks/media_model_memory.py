@@ -0,0 +1,51 @@
+"""
+Measure the memory each Program object adds on top of its raw JSON data,
+compared with the previous layout that copied every field into the instance __dict__.
+
+Usage: python -m benchmarks.media_model_memory [program_count]
+"""
+import sys
+import tracemalloc
+
+from dizqueTV.models.media import Program
+from benchmarks.stand_in_server import make_program
+
+FIELDS = [
+    "type", "isOffline", "duration", "title", "key", "ratingKey", "icon", "summary", "date", "year",
+    "plexFile", "file", "showTitle", "episode", "season", "serverKey", "showIcon", "episodeIcon",
+    "seasonIcon", "channel", "rating",
+]
+
+
+class EagerProgram:
+    # layout of Program before the fields became views onto the raw data
+    def __init__(self, data: dict, dizque_instance, channel_instance):
+        self._raw_data = data
+        self._dizque_instance = dizque_instance
+        self._channel_instance = channel_instance
+        for field in FIELDS:
+            setattr(self, field, data.get(field))
+
+
+def bytes_per_program(program_class, program_count: int) -> float:
+    program_data = [make_program(index=i) for i in range(program_count)]
+    tracemalloc.start()
+    programs = [
+        program_class(data=data, dizque_instance=None, channel_instance=None) for data in program_data
+    ]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del programs
+    return current / program_count
+
+
+def main(program_count: int = 100000):
+    for label, program_class in (("before (eager copy)", EagerProgram), ("after (slots)", Program)):
+        print(
+            f"{label:>20}: {bytes_per_program(program_class, program_count=program_count):.0f} "
+            f"bytes per program (excluding raw JSON)"
+        )
+
+
+if __name__ == "__main__":
+    main(program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
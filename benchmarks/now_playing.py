@@ -0,0 +1,56 @@
+"""
+Time Channel.now_playing (binary search over prefix sums) against walking the lineup program by program.
+
+Usage: python -m benchmarks.now_playing [program_count] [query_count]
+"""
+import random
+import sys
+import time
+from datetime import timedelta
+
+from dizqueTV.models.channels import Channel
+from benchmarks.stand_in_server import make_channel
+
+
+def walk_lineup(channel: Channel, elapsed: int) -> int:
+    # what finding the current program looks like without an index
+    elapsed %= channel.duration
+    for index, program in enumerate(channel.json["programs"]):
+        if elapsed < program["duration"]:
+            return index
+        elapsed -= program["duration"]
+    return -1
+
+
+def main(program_count: int = 100000, query_count: int = 2000):
+    channel = Channel(data=make_channel(number=1, program_count=program_count), dizque_instance=None)
+    moments = [
+        channel.startTime_datetime + timedelta(milliseconds=random.randrange(channel.duration * 3))
+        for _ in range(query_count)
+    ]
+
+    start = time.perf_counter()
+    channel.timeline
+    print(f"{'build index':>14}: {(time.perf_counter() - start) * 1000:.1f} ms for {program_count} programs (with ProgramTable)")
+
+    start = time.perf_counter()
+    indexed = [channel.now_playing(at=moment).index for moment in moments]
+    elapsed = time.perf_counter() - start
+    print(f"{'now_playing':>14}: {elapsed / query_count * 1e6:.1f} us per query")
+
+    walk_count = min(query_count, 200)
+    start = time.perf_counter()
+    walked = [
+        walk_lineup(channel=channel, elapsed=channel.timeline.elapsed_milliseconds(at=moment))
+        for moment in moments[:walk_count]
+    ]
+    elapsed = time.perf_counter() - start
+    print(f"{'linear walk':>14}: {elapsed / walk_count * 1e6:.1f} us per query")
+    assert walked == indexed[:walk_count]
+
+
+if __name__ == "__main__":
+    main(
+        program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        query_count=int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+    )
@@ -0,0 +1,60 @@
+"""
+Time Channel.pad_times against a local stand-in server: the previous approach (a Program object per gap, with the
+offline times removed and the lineup re-added as separate edits) versus one vectorized pass, plus a dry run.
+
+Usage: python -m benchmarks.pad_times [program_count]
+"""
+import sys
+import time
+
+from dizqueTV import API
+from dizqueTV.models.media import Program
+import dizqueTV.helpers as helpers
+from benchmarks.stand_in_server import StandInServer
+
+
+def pad_times_per_program(channel, start_every_x_minutes: int) -> bool:
+    # how padding worked before: a flex computation and a Program object for every program
+    programs_and_pads = []
+    if channel._delete_all_offline_times():
+        for program in channel.programs:
+            filler_time_needed = helpers.get_needed_flex_time(
+                item_time_milliseconds=program.duration,
+                allowed_minutes_time_frame=start_every_x_minutes,
+            )
+            programs_and_pads.append(program)
+            if filler_time_needed > 0:
+                programs_and_pads.append(
+                    Program(
+                        data={"duration": filler_time_needed, "isOffline": True},
+                        dizque_instance=channel._dizque_instance,
+                        channel_instance=channel,
+                    )
+                )
+        if programs_and_pads:
+            return channel._replace_programs(programs=programs_and_pads)
+    return False
+
+
+def main(program_count: int = 50000):
+    for label, pad in (
+            ("per program", lambda channel: pad_times_per_program(channel=channel, start_every_x_minutes=30)),
+            ("vectorized", lambda channel: channel.pad_times(start_every_x_minutes=30)),
+            ("dry run", lambda channel: channel.pad_times(start_every_x_minutes=30, dry_run=True)),
+    ):
+        with StandInServer(channel_count=1, program_count=program_count) as server:
+            with API(url=server.url, allow_analytics=False) as api:
+                channel = api.get_channel(channel_number=1)
+                server.reset_counters()
+                start = time.perf_counter()
+                result = pad(channel)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{label:>12}: {elapsed:.2f} s, {server.requests} requests, "
+                    f"{len(channel.program_table)} programs and gaps, duration {channel.duration}"
+                    + (f", dry run result {result}" if isinstance(result, tuple) else "")
+                )
+
+
+if __name__ == "__main__":
+    main(program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,56 @@
+"""
+Time the sorting and balancing helpers over a large lineup, given Program objects or a ProgramTable.
+
+Usage: python -m benchmarks.program_table_sorting [program_count]
+"""
+import sys
+import time
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_program_table import ProgramTable
+from dizqueTV.models.media import Program
+from benchmarks.stand_in_server import make_program
+
+HELPERS = [
+    ("alphabetically", helpers.sort_media_alphabetically),
+    ("by release date", helpers.sort_media_by_release_date),
+    ("by season order", helpers.sort_media_by_season_order),
+    ("by duration", helpers.sort_media_by_duration),
+    ("balance shows", helpers.balance_shows),
+    ("remove duplicates", helpers.remove_duplicate_media_items),
+]
+
+
+def make_rows(program_count: int) -> list:
+    rows = []
+    for index in range(program_count):
+        row = make_program(index=index)
+        if index % 10 == 0:
+            # sprinkle in some movies
+            row.update(type="movie", showTitle=row["title"], season=None, episode=None)
+        rows.append(row)
+    return rows
+
+
+def time_helper(func, make_input) -> float:
+    media_items = make_input()
+    start = time.perf_counter()
+    func(media_items=media_items)
+    return time.perf_counter() - start
+
+
+def main(program_count: int = 100000):
+    rows = make_rows(program_count=program_count)
+    inputs = [
+        ("Program list", lambda: [Program(data=row, dizque_instance=None, channel_instance=None) for row in rows]),
+        ("ProgramTable", lambda: ProgramTable(rows=rows)),
+    ]
+    for label, func in HELPERS:
+        timings = ", ".join(
+            f"{input_label} {time_helper(func, make_input) * 1000:.0f} ms" for input_label, make_input in inputs
+        )
+        print(f"{label:>18}: {timings}")
+
+
+if __name__ == "__main__":
+    main(program_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
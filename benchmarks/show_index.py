@@ -0,0 +1,49 @@
+"""
+Time a chain of show-aware helpers (season order, balance, block shuffle, cyclical shuffle) over one ProgramTable:
+the first pass builds the table's ShowIndex, later passes reuse it.
+Also times the old show-dict chain (make, order, durations, condense) over the same programs, for comparison.
+
+Usage: python -m benchmarks.show_index [program_count]
+"""
+import sys
+import time
+
+import numpy
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_program_table import ProgramTable, ShowIndex
+from dizqueTV.models.media import Program
+from benchmarks.program_table_sorting import make_rows
+
+
+def run_chain(table: ProgramTable, random_generator: numpy.random.Generator):
+    helpers.sort_media_by_season_order(media_items=table)
+    helpers.balance_shows(media_items=table)
+    helpers.sort_media_block_shuffle(media_items=table, block_length=3)
+    helpers.sort_media_cyclical_shuffle(media_items=table, random_generator=random_generator)
+
+
+def main(program_count=100000):
+    random_generator = numpy.random.default_rng(seed=0)
+    rows = make_rows(program_count=program_count)
+    programs = [Program(data=row, dizque_instance=None, channel_instance=None) for row in rows]
+
+    start = time.perf_counter()
+    show_dict = helpers.order_show_dict(show_dict=helpers.make_show_dict(media_items=programs))
+    helpers.add_durations_to_show_dict(show_dict=show_dict)
+    helpers.condense_show_dict(show_dict=show_dict)
+    print(f"show-dict chain over {program_count} Programs: {time.perf_counter() - start:.3f} s")
+
+    table = ProgramTable(rows=rows)
+    start = time.perf_counter()
+    ShowIndex(table=table, alphabetical=False)
+    print(f"ShowIndex over {program_count} rows:            {time.perf_counter() - start:.3f} s")
+
+    for run in ("first pass (builds the index)", "second pass (reuses it)"):
+        start = time.perf_counter()
+        run_chain(table=table, random_generator=random_generator)
+        print(f"helper chain, {run}: {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
@@ -0,0 +1,294 @@
+"""
+Minimal local stand-in for a dizqueTV server, used by the benchmarks in this folder.
+
+Serves a fixed set of generated channels over HTTP/1.1 (keep-alive capable) and
+counts TCP connections and requests so benchmarks can report round-trip savings.
+"""
+import io
+import json
+import multiprocessing
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_program(index: int, show_count: int = 20) -> dict:
+    show_number = index % show_count
+    return {
+        "title": f"Episode {index}",
+        "key": f"/library/metadata/{index}",
+        "ratingKey": str(index),
+        "icon": "",
+        "type": "episode",
+        "duration": 1200000 + (index % 7) * 60000,
+        "summary": "",
+        "rating": "TV-PG",
+        "date": "2020-01-01",
+        "year": 2020,
+        "plexFile": f"/library/parts/{index}/file.mkv",
+        "file": f"/media/{index}.mkv",
+        "showTitle": f"Show {show_number}",
+        "episode": (index // show_count) % 24 + 1,
+        "season": (index // show_count) // 24 + 1,
+        "serverKey": "Plex",
+        "isOffline": False,
+    }
+
+
+def make_channel(number: int, program_count: int = 50) -> dict:
+    programs = [make_program(index=i) for i in range(program_count)]
+    return {
+        "number": number,
+        "name": f"Channel {number}",
+        "startTime": "2021-01-01T00:00:00.000Z",
+        "duration": sum(program["duration"] for program in programs),
+        "programs": programs,
+        "fillerCollections": [],
+        "fallback": [],
+        "watermark": {},
+        "transcoding": {},
+        "onDemand": {},
+        "stealth": False,
+        "_id": str(number),
+    }
+
+
+GUIDE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+class StandInServer:
+    def __init__(self, channel_count: int = 200, program_count: int = 50, latency: float = 0):
+        self.channels = {
+            number: json.dumps(make_channel(number=number, program_count=program_count)).encode()
+            for number in range(1, channel_count + 1)
+        }
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.xmltv_refreshes = 0
+        self.guide_last_update = "2021-01-01T00:00:00.000Z"
+        # seconds each GET takes to answer, to stand in for a busy server
+        self.latency = latency
+        self._xmltv = None
+        self._guide = None
+        self._guide_lock = threading.Lock()
+        self._parts = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def channel_part(self, number: int, part: str) -> bytes:
+        # "programs" (just the program list) or "programless" (everything else), encoded once
+        if (number, part) not in self._parts:
+            channel = json.loads(self.channels[number])
+            if part == "programs":
+                body = channel["programs"]
+            else:
+                del channel["programs"]
+                body = channel
+            self._parts[(number, part)] = json.dumps(body).encode()
+        return self._parts[(number, part)]
+
+    def xmltv(self) -> bytes:
+        # a three-day guide for every channel, built once
+        if self._xmltv is None:
+            from dizqueTV.dizquetv_xmltv import write_xmltv
+            from dizqueTV.models.channels import Channel
+
+            output = io.BytesIO()
+            write_xmltv(
+                channels=[Channel(data=json.loads(body), dizque_instance=None) for body in self.channels.values()],
+                output=output,
+                hours=72,
+                from_date=datetime(2021, 1, 1),
+            )
+            self._xmltv = output.getvalue()
+        return self._xmltv
+
+    def guide(self) -> bytes:
+        # a /guide/debug style three-day guide for every channel, built once per guide update
+        with self._guide_lock:
+            if self._guide is None or self._guide[0] != self.guide_last_update:
+                from dizqueTV.models.channels import Channel
+
+                from_date = datetime(2021, 1, 1)
+                guide = {}
+                for body in self.channels.values():
+                    channel = Channel(data=json.loads(body), dizque_instance=None)
+                    timeline = channel.timeline
+                    rows = channel.program_table.rows
+                    indexes, begins = timeline.window(
+                        start=timeline.elapsed_milliseconds(at=from_date),
+                        end=timeline.elapsed_milliseconds(at=from_date + timedelta(hours=72)),
+                    )
+                    guide[str(channel.number)] = {
+                        "channel": {"name": channel.name, "icon": "", "number": channel.number},
+                        "programs": [
+                            {
+                                "start": timeline.time_at(elapsed=begin).strftime(GUIDE_TIME_FORMAT),
+                                "stop": timeline.time_at(elapsed=begin + rows[index]["duration"]).strftime(
+                                    GUIDE_TIME_FORMAT
+                                ),
+                                "summary": rows[index]["summary"],
+                                "date": rows[index]["date"],
+                                "rating": rows[index]["rating"],
+                                "icon": rows[index]["icon"],
+                                "title": rows[index]["showTitle"],
+                            }
+                            for index, begin in zip(indexes.tolist(), begins.tolist())
+                        ],
+                    }
+                self._guide = (self.guide_last_update, guide, json.dumps(guide).encode())
+            return self._guide[2]
+
+    def guide_lineup(self, number: int, date_from: str, date_to: str) -> bytes:
+        # programs of one channel's guide overlapping a range, compared as ISO 8601 strings like dizqueTV does
+        self.guide()
+        programs = self._guide[1][str(number)]["programs"]
+        lineup = [program for program in programs if program["stop"] > date_from and program["start"] < date_to]
+        return json.dumps({"programs": lineup}).encode()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # headers and body go out in separate writes, which Nagle's algorithm would hold back ~40 ms
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body: bytes, status: int = 200):
+                with server._lock:
+                    server.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if self.close_connection:
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if self.path == "/api/channelNumbers":
+                    return self._send(json.dumps(list(server.channels.keys())).encode())
+                if self.path == "/api/version":
+                    return self._send(b'{"dizquetv": "1.5.0", "ffmpeg": "4.3", "nodejs": "14"}')
+                if self.path == "/api/guide/status":
+                    return self._send(
+                        json.dumps(
+                            {
+                                "lastUpdate": server.guide_last_update,
+                                "channelNumbers": [str(number) for number in server.channels],
+                            }
+                        ).encode()
+                    )
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlsplit(self.path)
+                match = re.match(r"^/api/guide/channels/(\d+)$", url.path)
+                if match and int(match.group(1)) in server.channels:
+                    query = parse_qs(url.query)
+                    return self._send(
+                        server.guide_lineup(
+                            number=int(match.group(1)), date_from=query["dateFrom"][0], date_to=query["dateTo"][0]
+                        )
+                    )
+                if self.path == "/api/guide/debug":
+                    return self._send(server.guide())
+                if self.path == "/api/xmltv-settings":
+                    return self._send(b'{"_id": "xmltv", "cache": 12, "refresh": 4, "file": "xmltv.xml"}')
+                if self.path == "/api/xmltv.xml":
+                    return self._send(server.xmltv())
+                match = re.match(r"^/api/channel/(\d+)$", self.path)
+                if match and int(match.group(1)) in server.channels:
+                    return self._send(server.channels[int(match.group(1))])
+                match = re.match(r"^/api/channel/(programs|programless)/(\d+)$", self.path)
+                if match and int(match.group(2)) in server.channels:
+                    return self._send(server.channel_part(number=int(match.group(2)), part=match.group(1)))
+                return self._send(b"{}", status=404)
+
+            def do_POST(self):
+                with server._lock:
+                    server.requests += 1
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                data = json.loads(body or b"{}")
+                if self.path == "/api/channel" and data.get("number") in server.channels:
+                    server.channels[data["number"]] = json.dumps(data).encode()
+                    server._parts.clear()
+                return self._send(json.dumps({"number": data.get("number")}).encode())
+
+            def do_PUT(self):
+                with server._lock:
+                    server.requests += 1
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                if self.path == "/api/xmltv-settings":
+                    with server._lock:
+                        server.xmltv_refreshes += 1
+                return self._send(b"{}")
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _serve(url_queue, stop_event, channel_count: int, program_count: int):
+    with StandInServer(channel_count=channel_count, program_count=program_count) as server:
+        url_queue.put(server.url)
+        stop_event.wait()
+
+
+@contextmanager
+def stand_in_server_process(channel_count: int = 200, program_count: int = 50):
+    """
+    Run a StandInServer in a separate process, so memory benchmarks only measure the client
+
+    :return: URL of the server
+    :rtype: str
+    """
+    context = multiprocessing.get_context("spawn")
+    url_queue = context.Queue()
+    stop_event = context.Event()
+    process = context.Process(
+        target=_serve, args=(url_queue, stop_event, channel_count, program_count), daemon=True
+    )
+    process.start()
+    try:
+        yield url_queue.get(timeout=300)
+    finally:
+        stop_event.set()
+        process.join(timeout=10)
@@ -0,0 +1,63 @@
+"""
+Time weighted draws: one numpy.random.choice call per draw (how the helpers used to work), the helpers as they
+are now, and a WeightedSampler drawing one at a time as categories drain and in bulk.
+
+Usage: python -m benchmarks.weighted_sampler [category_count] [draw_count]
+"""
+import sys
+import time
+
+import numpy
+
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_sampling import WeightedSampler
+
+
+def choice_by_sizes_dict(items_and_sizes: dict):
+    # how weighted_choice_by_sizes_dict worked before: a fresh probability list and numpy.random.choice each call
+    total = sum(items_and_sizes.values())
+    probabilities = [size / total for size in items_and_sizes.values()]
+    return numpy.random.choice(a=list(items_and_sizes.keys()), size=1, p=probabilities)[0]
+
+
+def drain_with(choose, sizes: dict) -> float:
+    sizes = dict(sizes)
+    start = time.perf_counter()
+    while sizes:
+        item = choose(sizes)
+        sizes[item] -= 1
+        if not sizes[item]:
+            del sizes[item]
+    return time.perf_counter() - start
+
+
+def main(category_count=50, draw_count=1000000):
+    random_generator = numpy.random.default_rng(seed=0)
+    sizes = {
+        f"show {number}": int(size)
+        for number, size in enumerate(random_generator.integers(50, 500, size=category_count))
+    }
+    print(f"drain {sum(sizes.values())} items from {category_count} categories, one draw at a time:")
+    print(f"  numpy.random.choice per draw:       {drain_with(choice_by_sizes_dict, sizes):.2f} s")
+    print(
+        f"  weighted_choice_by_sizes_dict:      "
+        f"{drain_with(lambda left: helpers.weighted_choice_by_sizes_dict(items_and_sizes=left), sizes):.2f} s"
+    )
+    sampler = WeightedSampler.from_sizes_dict(items_and_sizes=sizes, random_generator=random_generator)
+    start = time.perf_counter()
+    for _ in range(sum(sizes.values())):
+        sampler.drain(index=sampler.sample_indices())
+    print(f"  WeightedSampler.drain per draw:     {time.perf_counter() - start:.2f} s")
+
+    print(f"{draw_count} draws with replacement:")
+    start = time.perf_counter()
+    numpy.random.choice(a=category_count, size=draw_count, p=numpy.array(list(sizes.values())) / sum(sizes.values()))
+    print(f"  numpy.random.choice, one call:      {time.perf_counter() - start:.3f} s")
+    sampler = WeightedSampler.from_sizes_dict(items_and_sizes=sizes, random_generator=random_generator)
+    start = time.perf_counter()
+    sampler.sample_indices(size=draw_count)
+    print(f"  WeightedSampler.sample_indices:     {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
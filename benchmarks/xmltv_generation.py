@@ -0,0 +1,45 @@
+"""
+Time writing an XMLTV guide locally from channel data, and measure the memory it needs.
+
+Usage: python -m benchmarks.xmltv_generation [channel_count] [program_count] [hours]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from dizqueTV.dizquetv_xmltv import write_xmltv
+from dizqueTV.models.channels import Channel
+from benchmarks.stand_in_server import make_channel
+
+
+def main(channel_count: int = 50, program_count: int = 5000, hours: int = 168):
+    channels = [
+        Channel(data=make_channel(number=number, program_count=program_count), dizque_instance=None)
+        for number in range(1, channel_count + 1)
+    ]
+    for channel in channels:
+        channel.timeline
+
+    with open(os.devnull, "wb") as output:
+        tracemalloc.start()
+        start = time.perf_counter()
+        programme_count = write_xmltv(
+            channels=channels, output=output, hours=hours, from_date=datetime(2021, 6, 1)
+        )
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(
+        f"{channel_count} channels x {hours} h: {programme_count} programmes in {elapsed:.2f} s, "
+        f"peak {peak / 1024 / 1024:.1f} MiB while writing"
+    )
+
+
+if __name__ == "__main__":
+    main(
+        channel_count=int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        program_count=int(sys.argv[2]) if len(sys.argv) > 2 else 5000,
+        hours=int(sys.argv[3]) if len(sys.argv) > 3 else 168,
+    )
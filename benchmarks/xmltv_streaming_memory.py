@@ -0,0 +1,48 @@
+"""
+Compare peak client memory of API.xmltv_xml (whole document parsed into a tree)
+with API.iter_xmltv_programmes (parsed while streaming) against a stand-in server.
+
+Usage: python -m benchmarks.xmltv_streaming_memory [channel_count] [program_count]
+"""
+import sys
+import time
+import tracemalloc
+
+from dizqueTV import API
+from benchmarks.stand_in_server import stand_in_server_process
+
+
+def count_with_tree(api: API) -> int:
+    return len(api.xmltv_xml.findall("programme"))
+
+
+def count_with_stream(api: API) -> int:
+    return sum(1 for _ in api.iter_xmltv_programmes())
+
+
+def main(channel_count: int = 100, program_count: int = 500):
+    with stand_in_server_process(channel_count=channel_count, program_count=program_count) as url:
+        with API(url=url, allow_analytics=False) as api:
+            # have the server build its guide before measuring
+            api.iter_xmltv_programmes(channel_numbers=[]).close()
+            count_with_stream(api=api)
+            for label, count in (("xmltv_xml", count_with_tree), ("iter_xmltv_programmes", count_with_stream)):
+                start = time.perf_counter()
+                programme_count = count(api=api)
+                elapsed = time.perf_counter() - start
+                # measured separately, since tracing every allocation slows parsing down a lot
+                tracemalloc.start()
+                count(api=api)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{label:>22}: {programme_count} programmes in {elapsed:.2f} s, "
+                    f"peak {peak / 1024 / 1024:.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main(
+        channel_count=int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        program_count=int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
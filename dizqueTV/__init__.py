@@ -10,6 +10,7 @@ from dizqueTV.dizquetv import (API,
                                expand_custom_show_items,
                                fill_in_watermark_settings
                                )
+from dizqueTV.dizquetv_async import AsyncAPI
 from dizqueTV.models import PlexServer
 from dizqueTV.plex_utils import PlexUtils
 
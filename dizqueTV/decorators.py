@@ -20,3 +20,27 @@ def check_for_dizque_instance(func: object):
         raise NotRemoteObjectError(object_type=type(obj).__name__)
 
     return inner
+
+
+def batch_changes(func: object):
+    """
+    Run a Channel method inside a batch, so all the edits it makes are sent to dizqueTV in a single commit
+
+    :param func: Channel method to execute
+    :type func: object
+    :return: Result of func (False if the commit fails)
+    :rtype: object
+    """
+
+    @wraps(func)
+    def inner(obj, *args, **kwargs):
+        obj.begin()
+        try:
+            success = func(obj, *args, **kwargs)
+        except Exception:
+            obj.rollback()
+            raise
+        committed = obj.commit()
+        return success and committed
+
+    return inner
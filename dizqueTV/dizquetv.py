@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Union
+from typing import BinaryIO, Dict, Iterator, List, Union
 from xml.etree import ElementTree
 
 import m3u8
@@ -11,11 +11,18 @@ from plexapi.audio import Track, Artist, Album
 from plexapi.server import PlexServer as PServer
 from plexapi.video import Episode, Movie, Video, Show, Season, Clip
 
+import dizqueTV.dizquetv_logging as logs
 import dizqueTV.dizquetv_requests as requests
+import dizqueTV.dizquetv_streaming as streaming
+import dizqueTV.dizquetv_xmltv as xmltv
 import dizqueTV.helpers as helpers
 from dizqueTV._analytics import GoogleAnalytics
 from dizqueTV._info import __analytics_id__ as analytics_id
 from dizqueTV.advanced import Advanced
+from dizqueTV.dizquetv_cache import (GuideCache, LineupCache, ResponseCache, SingleFlight,
+                                     _copy_json, request_key)
+from dizqueTV.dizquetv_parallel import ParallelExecutor, TaskResult
+from dizqueTV.dizquetv_playout import PlayoutResolver
 from dizqueTV.exceptions import (ChannelCreationError, GeneralException,
                                  ItemCreationError, MissingParametersError)
 from dizqueTV.models import (Channel, CustomShow, CustomShowDetails,
@@ -31,6 +38,9 @@ from dizqueTV.models.templates import (CHANNEL_SETTINGS_DEFAULT,
                                        PLEX_SERVER_SETTINGS_TEMPLATE,
                                        WATERMARK_SETTINGS_DEFAULT)
 
+# bytes read from the connection at a time when decoding a response while it downloads
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def make_time_slot_from_dizque_program(
         program: Union[Program, Redirect], time: str, order: str
@@ -301,6 +311,17 @@ class API:
             verbose: bool = False,
             allow_analytics: bool = True,
             anonymous_analytics: bool = True,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = True,
+            keep_alive: bool = True,
+            max_workers: int = None,
+            task_timeout: float = None,
+            coalesce_requests: bool = True,
+            cache_responses: bool = False,
+            cache_ttls: Dict[str, float] = None,
+            detect_channel_conflicts: bool = False,
+            cache_guide: bool = True,
     ):
         """
         Interact with dizqueTV's API
@@ -313,9 +334,49 @@ class API:
         :type allow_analytics: bool
         :param anonymous_analytics: Make Google Analytics anonymous (see disclaimer)
         :type anonymous_analytics: bool
+        :param pool_connections: Number of per-host connection pools to keep
+        :type pool_connections: int, optional
+        :param pool_maxsize: Maximum number of open connections to the dizqueTV server
+        :type pool_maxsize: int, optional
+        :param pool_block: Wait for a free pooled connection instead of opening an extra one
+        :type pool_block: bool, optional
+        :param keep_alive: Reuse connections between API calls
+        :type keep_alive: bool, optional
+        :param max_workers: Maximum number of concurrent API calls when fanning out (default: pool_maxsize)
+        :type max_workers: int, optional
+        :param task_timeout: Seconds each fanned-out call may take before it is given up on (default: no limit)
+        :type task_timeout: float, optional
+        :param coalesce_requests: Share one request between threads making the same GET call at the same time
+        :type coalesce_requests: bool, optional
+        :param cache_responses: Cache responses from read endpoints (settings, channel numbers, etc.), cleared by related writes
+        :type cache_responses: bool, optional
+        :param cache_ttls: Seconds to cache each endpoint for, if caching (default: dizqueTV.dizquetv_cache.DEFAULT_CACHE_TTLS)
+        :type cache_ttls: Dict[str, float], optional
+        :param detect_channel_conflicts: Refuse to save a Channel if it was changed on dizqueTV since it was loaded
+        :type detect_channel_conflicts: bool, optional
+        :param cache_guide: Reuse the downloaded guide and channel lineups until /guide/status shows they were updated
+        :type cache_guide: bool, optional
         """
         self.url = url.rstrip("/")
         self.verbose = verbose
+        self.pool_maxsize = pool_maxsize
+        self._session = requests.make_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        self.executor = ParallelExecutor(
+            max_workers=(max_workers or pool_maxsize), timeout=task_timeout
+        )
+        self.coalesce_requests = coalesce_requests
+        self.single_flight = SingleFlight()
+        self.cache = ResponseCache(ttls=cache_ttls) if cache_responses else None
+        self.detect_channel_conflicts = detect_channel_conflicts
+        self.guide_cache = GuideCache() if cache_guide else None
+        self.lineup_cache = LineupCache() if cache_guide else None
+        # guide lastUpdate the server's xmltv.xml was last refreshed for
+        self._xmltv_refreshed_for = None
         self.advanced = Advanced(dizque_instance=self)
         self.analytics = GoogleAnalytics(
             analytics_id=analytics_id,
@@ -330,14 +391,63 @@ class API:
     def __repr__(self):
         return f"{self.__class__.__name__}({self.url})"
 
-    def _get(
-            self, endpoint: str, params: dict = None, headers: dict = None, timeout: int = 2
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close all pooled connections to the dizqueTV server and stop the worker threads
+
+        :return: None
+        :rtype: None
+        """
+        self.executor.shutdown()
+        requests.close_session(session=self._session)
+
+    def _log_failed_tasks(self, results: List[TaskResult]) -> List[TaskResult]:
+        for task in results:
+            if not task.succeeded:
+                logs.log(message=f"Call for {task.element} failed: {task.error!r}", level="error")
+        return results
+
+    def _send_get(
+            self,
+            endpoint: str,
+            params: dict = None,
+            headers: dict = None,
+            timeout: int = 2,
+            stream: bool = False,
     ) -> Union[Response, None]:
         if not endpoint.startswith("/"):
             endpoint = f"/{endpoint}"
         url = f"{self.url}/api{endpoint}"
         return requests.get(
-            url=url, params=params, headers=headers, timeout=timeout, log="info"
+            url=url,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            log="info",
+            session=self._session,
+            stream=stream,
+        )
+
+    def _get(
+            self, endpoint: str, params: dict = None, headers: dict = None, timeout: int = 2
+    ) -> Union[Response, None]:
+        if not self.coalesce_requests:
+            return self._send_get(
+                endpoint=endpoint, params=params, headers=headers, timeout=timeout
+            )
+        # raw and JSON reads of an endpoint share one request, and every caller gets their own copy of the response
+        return self.single_flight.do(
+            key=request_key("GET", endpoint, params or {}, headers or {}),
+            func=lambda: self._send_get(
+                endpoint=endpoint, params=params, headers=headers, timeout=timeout
+            ),
+            copy_func=requests.copy_response,
         )
 
     def _post(
@@ -352,7 +462,7 @@ class API:
         if not endpoint.startswith("/"):
             endpoint = f"/{endpoint}"
         url = f"{self.url}/api{endpoint}"
-        return requests.post(
+        response = requests.post(
             url=url,
             params=params,
             data=data,
@@ -360,7 +470,11 @@ class API:
             headers=headers,
             timeout=timeout,
             log="info",
+            session=self._session,
         )
+        if self.cache:
+            self.cache.invalidate(endpoint=endpoint)
+        return response
 
     def _put(
             self,
@@ -373,14 +487,18 @@ class API:
         if not endpoint.startswith("/"):
             endpoint = f"/{endpoint}"
         url = f"{self.url}/api{endpoint}"
-        return requests.put(
+        response = requests.put(
             url=url,
             params=params,
             data=data,
             headers=headers,
             timeout=timeout,
             log="info",
+            session=self._session,
         )
+        if self.cache:
+            self.cache.invalidate(endpoint=endpoint)
+        return response
 
     def _delete(
             self, endpoint: str, params: dict = None, data: dict = None, timeout: int = 2
@@ -388,20 +506,42 @@ class API:
         if not endpoint.startswith("/"):
             endpoint = f"/{endpoint}"
         url = f"{self.url}/api{endpoint}"
-        return requests.delete(
-            url=url, params=params, data=data, timeout=timeout, log="info"
+        response = requests.delete(
+            url=url,
+            params=params,
+            data=data,
+            timeout=timeout,
+            log="info",
+            session=self._session,
         )
+        if self.cache:
+            self.cache.invalidate(endpoint=endpoint)
+        return response
 
-    def _get_json(
+    def _get_json_uncached(
             self, endpoint: str, params: dict = None, headers: dict = None, timeout: int = 2
     ) -> Union[dict, list, str]:
-        response = self._get(
-            endpoint=endpoint, params=params, headers=headers, timeout=timeout
-        )
+        # every caller decodes their own copy of the response, since models keep and modify the JSON
+        response = self._get(endpoint=endpoint, params=params, headers=headers, timeout=timeout)
         if response:
             return response.json()
         return {}
 
+    def _get_json(
+            self, endpoint: str, params: dict = None, headers: dict = None, timeout: int = 2
+    ) -> Union[dict, list, str]:
+        if self.cache and self.cache.caches(endpoint=endpoint):
+            return self.cache.get(
+                endpoint=endpoint,
+                key=request_key(endpoint, params or {}, headers or {}),
+                fetch=lambda: self._get_json_uncached(
+                    endpoint=endpoint, params=params, headers=headers, timeout=timeout
+                ),
+            )
+        return self._get_json_uncached(
+            endpoint=endpoint, params=params, headers=headers, timeout=timeout
+        )
+
     @property
     def dizquetv_server_details(self) -> ServerDetails:
         """
@@ -589,20 +729,25 @@ class API:
         :rtype: List[Channel]
         """
         # temporary patch until /channels API is fixed. Runs concurrently to speed up.
-        numbers = self.channel_numbers
-        channels = []
-
-        channels_json_data = helpers._multithread(
+        results = self.executor.map(
             func=self._get_channel_data,
-            elements=numbers,
+            elements=self.channel_numbers,
             element_param_name="channel_number",
         )
+        return [
+            Channel(data=task.result, dizque_instance=self)
+            for task in self._log_failed_tasks(results=results)
+            if task.result
+        ]
 
-        for json_data in channels_json_data:
-            if json_data:
-                channels.append(Channel(data=json_data, dizque_instance=self))
+    def get_playout_resolver(self) -> PlayoutResolver:
+        """
+        Snapshot every dizqueTV channel to work out locally what airs on each, following redirects between channels
 
-        return channels
+        :return: PlayoutResolver object
+        :rtype: PlayoutResolver
+        """
+        return PlayoutResolver(channels=self.channels)
 
     def get_channel(
             self, channel_number: int = None, channel_name: str = None
@@ -656,6 +801,32 @@ class API:
         return [Program(data=program_data, dizque_instance=self, channel_instance=channel)
                 for program_data in programs_data]
 
+    def iter_channel_programs(self, channel_number: int) -> Iterator[Program]:
+        """
+        Get the programs for a dizqueTV channel one at a time, decoding them while they download
+        Memory use stays flat no matter how many programs the channel has.
+        The channel's settings are available from each Program's channel_instance (a Channel without programs).
+
+        :param channel_number: Number of channel
+        :type channel_number: int
+        :return: Iterator of Program objects
+        :rtype: Iterator[Program]
+        """
+        channel = self.get_channel_without_programs(channel_number=channel_number)
+        if not channel:
+            return
+        response = self._send_get(
+            endpoint=f"/channel/programs/{channel_number}", timeout=5, stream=True
+        )
+        if not response:
+            return
+        with response:
+            reader = streaming.JSONStreamReader(
+                chunks=response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            )
+            for program_data in reader.iter_array():
+                yield Program(data=program_data, dizque_instance=self, channel_instance=channel)
+
     @property
     def channel_numbers(self) -> List[int]:
         """
@@ -717,7 +888,7 @@ class API:
         return min(set(possible) - set(self.channel_numbers))
 
     def _fill_in_default_channel_settings(
-            self, settings_dict: dict, handle_errors: bool = False
+            self, settings_dict: dict, handle_errors: bool = False, channel_numbers: List[int] = None
     ) -> dict:
         """
         Set some dynamic default values, such as channel number, start time and image URLs
@@ -726,9 +897,13 @@ class API:
         :type settings_dict: dict
         :param handle_errors: Whether to internally handle errors
         :type handle_errors: bool, optional
+        :param channel_numbers: Existing channel numbers (fetched from dizqueTV if not provided)
+        :type channel_numbers: List[int], optional
         :return: Dictionary of settings with defaults filled in
         :rtype: dict
         """
+        if channel_numbers is None:
+            channel_numbers = self.channel_numbers
         if not settings_dict.get("programs", []):  # empty or doesn't exist
             if handle_errors:
                 settings_dict["programs"] = [{"duration": 600000, "isOffline": True}]
@@ -736,7 +911,7 @@ class API:
                 raise ChannelCreationError(
                     "You must include at least one program when creating a channel."
                 )
-        if settings_dict.get("number") in self.channel_numbers:
+        if settings_dict.get("number") in channel_numbers:
             if handle_errors:
                 settings_dict.pop(
                     "number"
@@ -746,7 +921,7 @@ class API:
                     f"Channel #{settings_dict.get('number')} already exists."
                 )
         if not settings_dict.get("number"):
-            settings_dict["number"] = max(self.channel_numbers) + 1
+            settings_dict["number"] = max(channel_numbers) + 1
         if not settings_dict.get("name"):
             settings_dict["name"] = f"Channel {settings_dict['number']}"
         if not settings_dict.get("startTime"):
@@ -786,6 +961,36 @@ class API:
         :return: new Channel object or None
         :rtype: Channel
         """
+        kwargs = self._make_new_channel_settings(
+            programs=programs, plex_server=plex_server, handle_errors=handle_errors, **kwargs
+        )
+        if self._put(endpoint="/channel", data=kwargs):
+            return self.get_channel(channel_number=kwargs["number"])
+        return None
+
+    def _make_new_channel_settings(
+            self,
+            programs: List[Union[Program, Redirect, Video, Movie, Episode, Track]] = None,
+            plex_server: PServer = None,
+            handle_errors: bool = True,
+            channel_numbers: List[int] = None,
+            **kwargs,
+    ) -> dict:
+        """
+        Build and validate the complete settings for a new channel
+
+        :param programs: Program, Redirect or PlexAPI Video, Movie, Episode or Track objects to add to the new channel
+        :type programs: List[Union[Program, Redirect, plexapi.video.Video, plexapi.video.Movie, plexapi.video.Episode, plexapi.audio.Track]], optional
+        :param plex_server: plexapi.server.PlexServer (optional, required if adding PlexAPI Video, Movie, Episode or Track)
+        :type plex_server: plexapi.server.PlexServer, optional
+        :param handle_errors: Suppress error if they arise
+        :type handle_errors: bool, optional
+        :param channel_numbers: Existing channel numbers (fetched from dizqueTV if not provided)
+        :type channel_numbers: List[int], optional
+        :param kwargs: keyword arguments of setting names and values
+        :return: Dictionary of complete channel settings
+        :rtype: dict
+        """
         kwargs["programs"] = []
         programs = programs or []
         for item in programs:
@@ -807,15 +1012,14 @@ class API:
                 position_text=kwargs["iconPosition"]
             )
         kwargs = self._fill_in_default_channel_settings(
-            settings_dict=kwargs, handle_errors=handle_errors
+            settings_dict=kwargs, handle_errors=handle_errors, channel_numbers=channel_numbers
         )
-        if helpers._settings_are_complete(
-                new_settings_dict=kwargs,
-                template_settings_dict=CHANNEL_SETTINGS_TEMPLATE,
-                ignore_keys=["_id", "id"],
-        ) and self._put(endpoint="/channel", data=kwargs):
-            return self.get_channel(channel_number=kwargs["number"])
-        return None
+        helpers._settings_are_complete(
+            new_settings_dict=kwargs,
+            template_settings_dict=CHANNEL_SETTINGS_TEMPLATE,
+            ignore_keys=["_id", "id"],
+        )
+        return kwargs
 
     def update_channel(self, channel_number: int, **kwargs) -> bool:
         """
@@ -840,6 +1044,18 @@ class API:
                 return True
         return False
 
+    def _save_channel(self, channel_data: dict) -> bool:
+        # channel data is sent whole, so large channels may take longer
+        if self._post(endpoint="/channel", data=channel_data, timeout=5):
+            return True
+        return False
+
+    def _get_channel_fingerprint(self, channel_number: int) -> Union[str, None]:
+        channel_data = self._get_json(endpoint=f"/channel/programless/{channel_number}")
+        if channel_data:
+            return helpers._channel_fingerprint(channel_data=channel_data)
+        return None
+
     def delete_channel(self, channel_number: int) -> bool:
         """
         Delete a dizqueTV channel
@@ -999,10 +1215,12 @@ class API:
         :rtype: List[Channel]
         """
         channel_data = self._get_json(endpoint=f"/filler/{filler_list_id}/channels")
-        return [
-            self.get_channel(channel_number=channel.get("number"))
-            for channel in channel_data
-        ]
+        results = self.executor.map(
+            func=self.get_channel,
+            elements=[channel.get("number") for channel in channel_data],
+            element_param_name="channel_number",
+        )
+        return [task.result for task in self._log_failed_tasks(results=results)]
 
     def _fill_in_default_filler_list_settings(
             self, settings_dict: dict, handle_errors: bool = False
@@ -1436,20 +1654,98 @@ class API:
         # updating the xmltv_settings causes the server to reload the xmltv.xml file
         return self.update_xmltv_settings()
 
+    def _refresh_xml_if_guide_changed(self) -> None:
+        # only have the server rewrite xmltv.xml when its guide has changed since the last refresh
+        data = self._get_json(endpoint="/guide/status")
+        last_update = data.get("lastUpdate") if data else None
+        if last_update is not None and last_update == self._xmltv_refreshed_for:
+            return
+        if not self.refresh_xml():
+            return
+        # refreshing moves lastUpdate itself, so remember where it ended up, read past the response cache
+        data = self._get_json_uncached(endpoint="/guide/status")
+        self._xmltv_refreshed_for = data.get("lastUpdate") if data else None
+
     @property
     def xmltv_xml(self) -> Union[ElementTree.Element, None]:
         """
         Get dizqueTV's XMLTV data
+        The server only refreshes xmltv.xml first if its guide has changed since the last refresh.
 
         :return: xml.etree.ElementTree.Element object or None
         :rtype: ElementTree.Element
         """
-        self.refresh_xml()
+        self._refresh_xml_if_guide_changed()
         response = self._get(endpoint="/xmltv.xml")
         if response:
             return ElementTree.fromstring(response.content)
         return None
 
+    def iter_xmltv_programmes(
+            self,
+            channel_numbers: List[int] = None,
+            from_date: datetime = None,
+            to_date: datetime = None,
+    ) -> Iterator[xmltv.XMLTVProgramme]:
+        """
+        Get the programmes in dizqueTV's XMLTV data one at a time, parsing them while they download
+        Memory use stays flat no matter how large the guide is.
+        The server only refreshes xmltv.xml first if its guide has changed since the last refresh.
+
+        :param channel_numbers: Only get programmes on these channels
+        :type channel_numbers: List[int], optional
+        :param from_date: Only get programmes still airing at or after this time. Naive datetimes are assumed to be UTC.
+        :type from_date: datetime.datetime, optional
+        :param to_date: Only get programmes starting before this time. Naive datetimes are assumed to be UTC.
+        :type to_date: datetime.datetime, optional
+        :return: Iterator of XMLTVProgramme objects
+        :rtype: Iterator[XMLTVProgramme]
+        """
+        self._refresh_xml_if_guide_changed()
+        response = self._send_get(endpoint="/xmltv.xml", timeout=5, stream=True)
+        if not response:
+            return
+        with response:
+            yield from xmltv.iter_programmes(
+                chunks=response.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                channel_ids=channel_numbers,
+                from_date=from_date,
+                to_date=to_date,
+            )
+
+    def write_xmltv(
+            self,
+            output: Union[str, BinaryIO],
+            hours: int = 72,
+            from_date: datetime = None,
+            channel_numbers: List[int] = None,
+            channels: List[Channel] = None,
+    ) -> int:
+        """
+        Write an XMLTV guide built locally from channel programs, without having dizqueTV rebuild its xmltv.xml
+
+        :param output: Path of the file to write, or a binary file-like object (ex. socket.makefile("wb"))
+        :type output: Union[str, BinaryIO]
+        :param hours: How many hours of programming to include
+        :type hours: int, optional
+        :param from_date: Start of the guide (default: now). Naive datetimes are assumed to be UTC.
+        :type from_date: datetime.datetime, optional
+        :param channel_numbers: Numbers of the channels to include (default: all channels)
+        :type channel_numbers: List[int], optional
+        :param channels: Channel objects to build the guide from (default: download every channel)
+        :type channels: List[Channel], optional
+        :return: Number of programmes written
+        :rtype: int
+        """
+        return xmltv.write_xmltv(
+            channels=channels if channels is not None else self.channels,
+            output=output,
+            hours=hours,
+            from_date=from_date,
+            channel_numbers=channel_numbers,
+            executor=self.executor,
+        )
+
     @property
     def m3u(self) -> m3u8.model.M3U8:
         """
@@ -1530,16 +1826,26 @@ class API:
         return f"{self.url}/radio?channel={channel_number}"
 
     # Guide
+    def _get_guide_json(self) -> dict:
+        if not self.guide_cache:
+            return self._get_json(endpoint="/guide/debug")
+        # the guide rarely changes, so check its (much smaller) status before downloading it again
+        data = self._get_json(endpoint="/guide/status")
+        return self.guide_cache.get(
+            last_update=data.get("lastUpdate") if data else None,
+            fetch=lambda: self._get_json(endpoint="/guide/debug"),
+        )
+
     @property
     def guide(self) -> Guide:
         """
         Get the dizqueTV guide
+        If the guide has not been updated since it was last downloaded, the downloaded copy is reused.
 
         :return: dizqueTV.Guide object
         :rtype: Guide
         """
-        json_data = self._get_json(endpoint="/guide/debug")
-        return Guide(data=json_data, dizque_instance=self)
+        return Guide(data=self._get_guide_json(), dizque_instance=self)
 
     @property
     def last_guide_update(self) -> Union[datetime, None]:
@@ -1575,7 +1881,10 @@ class API:
         :return: JSON data
         :rtype: dict
         """
-        return self._get_json(endpoint="/guide/debug")
+        if self.guide_cache:
+            # the cached guide is shared, so callers get their own copy to modify
+            return _copy_json(self._get_guide_json())
+        return self._get_guide_json()
 
     # Other Functions
     def convert_plex_item_to_program(
@@ -0,0 +1,808 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Dict, List, Union
+from urllib.parse import urlencode
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, install with `pip install dizqueTV[async]`
+    aiohttp = None
+
+from plexapi.audio import Track
+from plexapi.server import PlexServer as PServer
+from plexapi.video import Episode, Movie, Video
+
+import dizqueTV.dizquetv_logging as logs
+import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv import API
+from dizqueTV.exceptions import GeneralException, MissingParametersError
+from dizqueTV.models import (Channel, CustomShow, CustomShowDetails,
+                             FFMPEGSettings, FillerList, Guide,
+                             HDHomeRunSettings, PlexSettings, Program,
+                             Redirect, ServerDetails, XMLTVSettings)
+from dizqueTV.models.guide import GuideProgram
+
+
+class AsyncResponse:
+    def __init__(self, status: int, content: bytes):
+        """
+        Fully-read response to an AsyncAPI call
+
+        :param status: HTTP status code
+        :type status: int
+        :param content: Response body
+        :type content: bytes
+        """
+        self.status_code = status
+        self.content = content
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    def __repr__(self):
+        return f"<AsyncResponse [{self.status_code}]>"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Union[dict, list, str]:
+        return json.loads(self.content)
+
+
+class AsyncAPI:
+    def __init__(
+            self,
+            url: str,
+            verbose: bool = False,
+            allow_analytics: bool = True,
+            anonymous_analytics: bool = True,
+            max_concurrency: int = 50,
+            pool_maxsize: int = 100,
+            keep_alive: bool = True,
+    ):
+        """
+        Interact with dizqueTV's API using asyncio
+
+        Returned objects (Channel, FillerList, etc.) are bound to a regular (blocking) API instance,
+        available as AsyncAPI.api, so their own methods keep working as before.
+        Those methods (ex. Channel.update) block, so inside an event loop run them in a thread,
+        ex. await asyncio.to_thread(channel.update, name="New name")
+
+        :param url: dizqueTV URL
+        :type url: str
+        :param verbose: Log API calls and other debugging
+        :type verbose: bool
+        :param allow_analytics: Allow Google Analytics (see disclaimer)
+        :type allow_analytics: bool
+        :param anonymous_analytics: Make Google Analytics anonymous (see disclaimer)
+        :type anonymous_analytics: bool
+        :param max_concurrency: Maximum number of API calls in flight at once
+        :type max_concurrency: int, optional
+        :param pool_maxsize: Maximum number of open connections to the dizqueTV server
+        :type pool_maxsize: int, optional
+        :param keep_alive: Reuse connections between API calls
+        :type keep_alive: bool, optional
+        """
+        if aiohttp is None:
+            raise GeneralException(
+                "AsyncAPI requires aiohttp. Install it with 'pip install dizqueTV[async]'."
+            )
+        self.url = url.rstrip("/")
+        self.verbose = verbose
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.api = API(
+            url=url,
+            verbose=verbose,
+            allow_analytics=allow_analytics,
+            anonymous_analytics=anonymous_analytics,
+        )
+        self._session = None
+        self._semaphore = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.url})"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close all pooled connections to the dizqueTV server
+
+        :return: None
+        :rtype: None
+        """
+        if self._session:
+            await self._session.close()
+            self._session = None
+        self.api.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # created lazily so the session and semaphore belong to the running event loop
+        if not self._session or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize, force_close=not self.keep_alive
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(
+            self,
+            method: str,
+            endpoint: str,
+            params: dict = None,
+            data: dict = None,
+            timeout: int = 2,
+    ) -> Union[AsyncResponse, None]:
+        if not endpoint.startswith("/"):
+            endpoint = f"/{endpoint}"
+        url = f"{self.url}/api{endpoint}"
+        if params:
+            url += f"?{urlencode(params)}"
+        session = self._get_session()
+        async with self._semaphore:
+            try:
+                async with session.request(
+                        method=method,
+                        url=url,
+                        json=data,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                ) as response:
+                    res = AsyncResponse(status=response.status, content=await response.read())
+            except asyncio.TimeoutError:
+                return None
+            except aiohttp.ClientError as error:
+                # connection refused, DNS failure, etc.
+                logs.log(message=f"{method} {url} failed: {error!r}", level="error")
+                return None
+        logs.log(message=f"{method} {url}" + (f", Body: {data}" if data else ""), level="info")
+        logs.log(message=f"Response: {res}", level=("error" if not res else "info"))
+        return res
+
+    async def _get(
+            self, endpoint: str, params: dict = None, timeout: int = 2
+    ) -> Union[AsyncResponse, None]:
+        return await self._request(method="GET", endpoint=endpoint, params=params, timeout=timeout)
+
+    async def _post(
+            self, endpoint: str, params: dict = None, data: dict = None, timeout: int = 2
+    ) -> Union[AsyncResponse, None]:
+        return await self._request(
+            method="POST", endpoint=endpoint, params=params, data=data, timeout=timeout
+        )
+
+    async def _put(
+            self, endpoint: str, params: dict = None, data: dict = None, timeout: int = 2
+    ) -> Union[AsyncResponse, None]:
+        return await self._request(
+            method="PUT", endpoint=endpoint, params=params, data=data, timeout=timeout
+        )
+
+    async def _delete(
+            self, endpoint: str, params: dict = None, data: dict = None, timeout: int = 2
+    ) -> Union[AsyncResponse, None]:
+        return await self._request(
+            method="DELETE", endpoint=endpoint, params=params, data=data, timeout=timeout
+        )
+
+    async def _get_json(
+            self, endpoint: str, params: dict = None, timeout: int = 2
+    ) -> Union[dict, list, str]:
+        response = await self._get(endpoint=endpoint, params=params, timeout=timeout)
+        if response:
+            return response.json()
+        return {}
+
+    async def dizquetv_server_details(self) -> ServerDetails:
+        """
+        Get dizqueTV server details
+
+        :return: ServerDetails object
+        :rtype: ServerDetails
+        """
+        json_data = await self._get_json(endpoint="/version")
+        return ServerDetails(data=json_data, dizque_instance=self.api)
+
+    async def dizquetv_version(self) -> str:
+        """
+        Get dizqueTV version number
+
+        :return: dizqueTV version number
+        :rtype: str
+        """
+        return (await self.dizquetv_server_details()).server_version
+
+    # Channels
+    async def channel_numbers(self) -> List[int]:
+        """
+        Get all dizqueTV channel numbers
+
+        :return: List of channel numbers
+        :rtype: List[int]
+        """
+        data = await self._get_json(endpoint="/channelNumbers")
+        if data:
+            return data
+        return []
+
+    async def channel_count(self) -> int:
+        """
+        Get the number of dizqueTV channels
+
+        :return: Int number of channels
+        :rtype: int
+        """
+        return len(await self.channel_numbers())
+
+    async def channels(self) -> List[Channel]:
+        """
+        Get all dizqueTV channels (fetched concurrently)
+
+        :return: List of Channel objects
+        :rtype: List[Channel]
+        """
+        numbers = await self.channel_numbers()
+        channels = await asyncio.gather(
+            *[self.get_channel(channel_number=number) for number in numbers]
+        )
+        return [channel for channel in channels if channel]
+
+    async def get_channel(
+            self, channel_number: int = None, channel_name: str = None
+    ) -> Union[Channel, None]:
+        """
+        Get a specific dizqueTV channel by number or name
+
+        :param channel_number: Number of channel
+        :type channel_number: int, optional
+        :param channel_name: Name of channel
+        :type channel_name: str, optional
+        :return: Channel object or None
+        :rtype: Channel
+        """
+        if not channel_number and not channel_name:
+            raise MissingParametersError(
+                "Must include either 'channel_number' or 'channel_name'"
+            )
+        if channel_number:
+            # large JSON may take longer, so bigger timeout
+            channel_data = await self._get_json(endpoint=f"/channel/{channel_number}", timeout=5)
+            if channel_data:
+                return Channel(data=channel_data, dizque_instance=self.api)
+        if channel_name:
+            for channel in await self.channels():
+                if channel.name == channel_name:
+                    return channel
+        return None
+
+    async def get_channel_info(self, channel_number: int) -> dict:
+        """
+        Get the name, number and icon for a dizqueTV channel
+
+        :param channel_number: Number of channel
+        :type channel_number: int
+        :return: JSON data with channel name, number and icon path
+        :rtype: dict
+        """
+        return await self._get_json(endpoint=f"/channel/description/{channel_number}")
+
+    async def get_channel_without_programs(self, channel_number: int) -> Union[Channel, None]:
+        """
+        Get a dizqueTV channel without its programs
+
+        :param channel_number: Number of channel
+        :type channel_number: int
+        :return: Channel object or None
+        :rtype: Channel
+        """
+        channel_data = await self._get_json(endpoint=f"/channel/programless/{channel_number}")
+        if channel_data:
+            return Channel(data=channel_data, dizque_instance=self.api)
+        return None
+
+    async def get_channel_programs(self, channel_number: int) -> List[Program]:
+        """
+        Get the programs for a dizqueTV channel
+
+        :param channel_number: Number of channel
+        :type channel_number: int
+        :return: List of Program objects
+        :rtype: List[Program]
+        """
+        channel, programs_data = await asyncio.gather(
+            self.get_channel_without_programs(channel_number=channel_number),
+            self._get_json(endpoint=f"/channel/programs/{channel_number}", timeout=5),
+        )
+        return [Program(data=program_data, dizque_instance=self.api, channel_instance=channel)
+                for program_data in programs_data]
+
+    async def add_channel(
+            self,
+            programs: List[Union[Program, Redirect, Video, Movie, Episode, Track]] = None,
+            plex_server: PServer = None,
+            handle_errors: bool = True,
+            **kwargs,
+    ) -> Union[Channel, None]:
+        """
+        Add a channel to dizqueTV
+
+        :param programs: Program, Redirect or PlexAPI Video, Movie, Episode or Track objects to add to the new channel
+        :type programs: List[Union[Program, Redirect, plexapi.video.Video, plexapi.video.Movie, plexapi.video.Episode, plexapi.audio.Track]], optional
+        :param plex_server: plexapi.server.PlexServer (optional, required if adding PlexAPI Video, Movie, Episode or Track)
+        :type plex_server: plexapi.server.PlexServer, optional
+        :param handle_errors: Suppress error if they arise (ex. alter invalid channel number, add Flex Time if no program is included)
+        :type handle_errors: bool, optional
+        :param kwargs: keyword arguments of setting names and values
+        :return: new Channel object or None
+        :rtype: Channel
+        """
+        kwargs = self.api._make_new_channel_settings(
+            programs=programs,
+            plex_server=plex_server,
+            handle_errors=handle_errors,
+            channel_numbers=await self.channel_numbers(),
+            **kwargs,
+        )
+        if await self._put(endpoint="/channel", data=kwargs):
+            return await self.get_channel(channel_number=kwargs["number"])
+        return None
+
+    async def update_channel(self, channel_number: int, **kwargs) -> bool:
+        """
+        Edit a dizqueTV channel
+
+        :param channel_number: Number of channel to update
+        :type channel_number: int
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        channel = await self.get_channel(channel_number=channel_number)
+        if channel:
+            if kwargs.get("iconPosition"):
+                kwargs["iconPosition"] = helpers.convert_icon_position(
+                    position_text=kwargs["iconPosition"]
+                )
+            new_settings = helpers._combine_settings_add_new(
+                new_settings_dict=kwargs, default_dict=channel._data
+            )
+            if await self._post(endpoint="/channel", data=new_settings, timeout=5):
+                return True
+        return False
+
+    async def delete_channel(self, channel_number: int) -> bool:
+        """
+        Delete a dizqueTV channel
+
+        :param channel_number: Number of channel to delete
+        :type channel_number: int
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        if await self._delete(endpoint="/channel", data={"number": channel_number}):
+            return True
+        return False
+
+    # Filler Lists
+    async def filler_lists(self) -> List[FillerList]:
+        """
+        Get all dizqueTV filler lists
+
+        :return: List of FillerList objects
+        :rtype: List[FillerList]
+        """
+        json_data = await self._get_json(endpoint="/fillers", timeout=5)
+        return [
+            FillerList(data=filler_list, dizque_instance=self.api)
+            for filler_list in json_data
+        ]
+
+    async def get_filler_list(self, filler_list_id: str) -> Union[FillerList, None]:
+        """
+        Get a specific dizqueTV filler list
+
+        :param filler_list_id: id of filler list
+        :type filler_list_id: str
+        :return: FillerList object
+        :rtype: FillerList
+        """
+        filler_list_data = await self._get_json(endpoint=f"/filler/{filler_list_id}")
+        if filler_list_data:
+            return FillerList(data=filler_list_data, dizque_instance=self.api)
+        return None
+
+    async def get_filler_list_by_name(self, filler_list_name: str) -> Union[FillerList, None]:
+        """
+        Get a specific dizqueTV filler list
+
+        :param filler_list_name: name of filler list
+        :type filler_list_name: str
+        :return: FillerList object
+        :rtype: FillerList
+        """
+        for filler_list in await self.filler_lists():
+            if filler_list.name == filler_list_name:
+                return filler_list
+        return None
+
+    async def get_filler_list_info(self, filler_list_id: str) -> dict:
+        """
+        Get the name, content and id for a dizqueTV filler list
+
+        :param filler_list_id: id of filler list
+        :type filler_list_id: str
+        :return: JSON data with filler list name, content and id
+        :rtype: dict
+        """
+        return await self._get_json(endpoint=f"/filler/{filler_list_id}")
+
+    async def get_filler_list_channels(self, filler_list_id: str) -> List[Channel]:
+        """
+        Get the channels that a dizqueTV filler list belongs to (fetched concurrently)
+
+        :param filler_list_id: ID of filler list
+        :type filler_list_id: str
+        :return: List of Channel objects
+        :rtype: List[Channel]
+        """
+        channel_data = await self._get_json(endpoint=f"/filler/{filler_list_id}/channels")
+        channels = await asyncio.gather(
+            *[self.get_channel(channel_number=channel.get("number")) for channel in channel_data]
+        )
+        # skip channels that could not be fetched (ex. deleted in the meantime)
+        return [channel for channel in channels if channel]
+
+    async def update_filler_list(self, filler_list_id: str, **kwargs) -> bool:
+        """
+        Edit a dizqueTV filler list
+
+        :param filler_list_id: ID of FillerList to update
+        :type filler_list_id: str
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        filler_list = await self.get_filler_list(filler_list_id=filler_list_id)
+        if filler_list:
+            new_settings = helpers._combine_settings(
+                new_settings_dict=kwargs, default_dict=filler_list._data
+            )
+            if await self._post(endpoint=f"/filler/{filler_list_id}", data=new_settings):
+                return True
+        return False
+
+    async def delete_filler_list(self, filler_list_id: str) -> bool:
+        """
+        Delete a dizqueTV filler list
+
+        :param filler_list_id: ID of FillerList to delete
+        :type filler_list_id: str
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        if await self._delete(endpoint=f"/filler/{filler_list_id}"):
+            return True
+        return False
+
+    # Custom Shows
+    async def custom_shows(self) -> List[CustomShow]:
+        """
+        Get a list of all custom shows
+
+        :return: List of CustomShow objects
+        :rtype: List[CustomShow]
+        """
+        json_data = await self._get_json(endpoint="/shows", timeout=5)
+        return [CustomShow(data=show, dizque_instance=self.api) for show in json_data]
+
+    async def get_custom_show(self, custom_show_id: str) -> Union[CustomShow, None]:
+        """
+        Get a CustomShow object by its ID
+
+        :param custom_show_id: ID of custom show
+        :type custom_show_id: str
+        :return: CustomShow object or None
+        :rtype: CustomShow
+        """
+        for custom_show in await self.custom_shows():
+            if custom_show.id == custom_show_id:
+                return custom_show
+        return None
+
+    async def get_custom_show_details(
+            self, custom_show_id: str
+    ) -> Union[CustomShowDetails, None]:
+        """
+        Get the details of a custom show
+
+        :param custom_show_id: ID of custom show
+        :type custom_show_id: str
+        :return: CustomShowDetails object or None
+        :rtype: CustomShowDetails
+        """
+        json_data = await self._get_json(endpoint=f"/show/{custom_show_id}")
+        if json_data:
+            return CustomShowDetails(data=json_data, dizque_instance=self.api)
+        return None
+
+    async def update_custom_show(self, custom_show_id: str, **kwargs) -> bool:
+        """
+        Edit a dizqueTV custom show
+
+        :param custom_show_id: ID of CustomShow to update
+        :type custom_show_id: str
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        custom_show = await self.get_custom_show(custom_show_id=custom_show_id)
+        if custom_show:
+            new_settings = helpers._combine_settings_add_new(
+                new_settings_dict=kwargs, default_dict=custom_show._data
+            )
+            if await self._post(endpoint=f"/show/{custom_show_id}", data=new_settings):
+                return True
+        return False
+
+    async def delete_custom_show(self, custom_show_id: str) -> bool:
+        """
+        Delete a dizqueTV custom show
+
+        :param custom_show_id: ID of CustomShow to delete
+        :type custom_show_id: str
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        if await self._delete(endpoint=f"/show/{custom_show_id}"):
+            return True
+        return False
+
+    # Settings
+    async def _get_settings(self, endpoint: str, settings_type):
+        json_data = await self._get_json(endpoint=endpoint)
+        if json_data:
+            return settings_type(data=json_data, dizque_instance=self.api)
+        return None
+
+    async def _update_settings(self, endpoint: str, settings_type, **kwargs) -> bool:
+        current_settings = await self._get_settings(endpoint=endpoint, settings_type=settings_type)
+        if not current_settings:
+            return False
+        new_settings = helpers._combine_settings(
+            new_settings_dict=kwargs, default_dict=current_settings._data
+        )
+        if await self._put(endpoint=endpoint, data=new_settings):
+            return True
+        return False
+
+    async def _reset_settings(self, endpoint: str, settings_type) -> bool:
+        current_settings = await self._get_settings(endpoint=endpoint, settings_type=settings_type)
+        if not current_settings:
+            return False
+        if await self._post(endpoint=endpoint, data={"_id": current_settings._data["_id"]}):
+            return True
+        return False
+
+    async def ffmpeg_settings(self) -> Union[FFMPEGSettings, None]:
+        """
+        Get dizqueTV's FFMPEG settings
+
+        :return: FFMPEGSettings object or None
+        :rtype: FFMPEGSettings
+        """
+        return await self._get_settings(endpoint="/ffmpeg-settings", settings_type=FFMPEGSettings)
+
+    async def update_ffmpeg_settings(self, **kwargs) -> bool:
+        """
+        Edit dizqueTV's FFMPEG settings
+
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._update_settings(
+            endpoint="/ffmpeg-settings", settings_type=FFMPEGSettings, **kwargs
+        )
+
+    async def reset_ffmpeg_settings(self) -> bool:
+        """
+        Reset dizqueTV's FFMPEG settings to default
+
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._reset_settings(endpoint="/ffmpeg-settings", settings_type=FFMPEGSettings)
+
+    async def plex_settings(self) -> Union[PlexSettings, None]:
+        """
+        Get dizqueTV's Plex settings
+
+        :return: PlexSettings object or None
+        :rtype: PlexSettings
+        """
+        return await self._get_settings(endpoint="/plex-settings", settings_type=PlexSettings)
+
+    async def update_plex_settings(self, **kwargs) -> bool:
+        """
+        Edit dizqueTV's Plex settings
+
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._update_settings(
+            endpoint="/plex-settings", settings_type=PlexSettings, **kwargs
+        )
+
+    async def reset_plex_settings(self) -> bool:
+        """
+        Reset dizqueTV's Plex settings to default
+
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._reset_settings(endpoint="/plex-settings", settings_type=PlexSettings)
+
+    async def xmltv_settings(self) -> Union[XMLTVSettings, None]:
+        """
+        Get dizqueTV's XMLTV settings
+
+        :return: XMLTVSettings object or None
+        :rtype: XMLTVSettings
+        """
+        return await self._get_settings(endpoint="/xmltv-settings", settings_type=XMLTVSettings)
+
+    async def update_xmltv_settings(self, **kwargs) -> bool:
+        """
+        Edit dizqueTV's XMLTV settings
+
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._update_settings(
+            endpoint="/xmltv-settings", settings_type=XMLTVSettings, **kwargs
+        )
+
+    async def reset_xmltv_settings(self) -> bool:
+        """
+        Reset dizqueTV's XMLTV settings to default
+
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._reset_settings(endpoint="/xmltv-settings", settings_type=XMLTVSettings)
+
+    async def hdhr_settings(self) -> Union[HDHomeRunSettings, None]:
+        """
+        Get dizqueTV's HDHomeRun settings
+
+        :return: HDHomeRunSettings object or None
+        :rtype: HDHomeRunSettings
+        """
+        return await self._get_settings(endpoint="/hdhr-settings", settings_type=HDHomeRunSettings)
+
+    async def update_hdhr_settings(self, **kwargs) -> bool:
+        """
+        Edit dizqueTV's HDHomeRun settings
+
+        :param kwargs: keyword arguments of setting names and values
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._update_settings(
+            endpoint="/hdhr-settings", settings_type=HDHomeRunSettings, **kwargs
+        )
+
+    async def reset_hdhr_settings(self) -> bool:
+        """
+        Reset dizqueTV's HDHomeRun settings to default
+
+        :return: True if successful, False if unsuccessful
+        :rtype: bool
+        """
+        return await self._reset_settings(endpoint="/hdhr-settings", settings_type=HDHomeRunSettings)
+
+    # Guide
+    async def guide(self) -> Guide:
+        """
+        Get the dizqueTV guide
+
+        :return: dizqueTV.Guide object
+        :rtype: Guide
+        """
+        json_data = await self.guide_lineup_json()
+        return Guide(data=json_data, dizque_instance=self.api)
+
+    async def guide_lineup_json(self) -> dict:
+        """
+        Get the raw guide JSON data
+
+        :return: JSON data
+        :rtype: dict
+        """
+        return await self._get_json(endpoint="/guide/debug", timeout=5)
+
+    async def last_guide_update(self) -> Union[datetime, None]:
+        """
+        Get the last update time for the guide
+
+        :return: datetime.datetime object
+        :rtype: datetime
+        """
+        data = await self._get_json(endpoint="/guide/status")
+        if data and data.get("lastUpdate"):
+            return helpers.string_to_datetime(date_string=data["lastUpdate"])
+        return None
+
+    async def guide_channel_numbers(self) -> List[str]:
+        """
+        Get the list of channel numbers from the guide
+
+        :return: List of strings (not ints)
+        :rtype: List[str]
+        """
+        data = await self._get_json(endpoint="/guide/status")
+        if data and data.get("channelNumbers"):
+            return data["channelNumbers"]
+        return []
+
+    async def get_guide_channel_lineup(
+            self, channel_number: int, from_date: datetime, to_date: datetime
+    ) -> List[GuideProgram]:
+        """
+        Get guide channel lineup for a certain time range
+
+        :param channel_number: Number of channel
+        :type channel_number: int
+        :param from_date: datetime.datetime object to start time frame
+        :type from_date: datetime.datetime
+        :param to_date: datetime.datetime object to end time frame
+        :type to_date: datetime.datetime
+        :return: list of GuideProgram objects
+        :rtype: list[GuideProgram]
+        """
+        params = {
+            "dateFrom": helpers.datetime_to_string(datetime_object=from_date),
+            "dateTo": helpers.datetime_to_string(datetime_object=to_date),
+        }
+        json_data = await self._get_json(endpoint=f"/guide/channels/{channel_number}", params=params)
+        return [
+            GuideProgram(data=program_data)
+            for program_data in json_data.get("programs", [])
+        ]
+
+    async def get_guide_lineups(
+            self, from_date: datetime, to_date: datetime, channel_numbers: List[int] = None
+    ) -> Dict[int, List[GuideProgram]]:
+        """
+        Get guide lineups for many channels concurrently
+
+        :param from_date: datetime.datetime object to start time frame
+        :type from_date: datetime.datetime
+        :param to_date: datetime.datetime object to end time frame
+        :type to_date: datetime.datetime
+        :param channel_numbers: Numbers of channels to get lineups for (default: all channels)
+        :type channel_numbers: List[int], optional
+        :return: Dictionary of channel numbers and their GuideProgram objects
+        :rtype: Dict[int, List[GuideProgram]]
+        """
+        if channel_numbers is None:
+            channel_numbers = await self.channel_numbers()
+        lineups = await asyncio.gather(
+            *[
+                self.get_guide_channel_lineup(
+                    channel_number=number, from_date=from_date, to_date=to_date
+                )
+                for number in channel_numbers
+            ]
+        )
+        return dict(zip(channel_numbers, lineups))
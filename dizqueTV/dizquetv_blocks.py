@@ -0,0 +1,86 @@
+from typing import Iterable, List, Tuple
+
+import numpy
+
+
+def _running_times(durations: Iterable[int]) -> numpy.ndarray:
+    # running_times[i] is the total duration of the first i programs
+    durations = numpy.fromiter((duration or 0 for duration in durations), dtype=numpy.int64)
+    return numpy.concatenate(([0], numpy.cumsum(durations)))
+
+
+def _fit(running_times: numpy.ndarray, start: int, length: int) -> int:
+    # index after the last of the programs from start on that fit in the length (start itself if none do)
+    end = int(numpy.searchsorted(running_times, running_times[start] + length, side="right")) - 1
+    return max(end, start)
+
+
+def fit_programs(durations: Iterable[int], length: int) -> Tuple[int, int]:
+    """
+    Find how many programs, taken in order, fit in a length of time
+
+    :param durations: Duration of each program, in milliseconds
+    :type durations: Iterable[int]
+    :param length: Length of time to fill, in milliseconds
+    :type length: int
+    :return: Number of programs that fit, their total running time in milliseconds
+    :rtype: Tuple[int, int]
+    """
+    running_times = _running_times(durations=durations)
+    count = _fit(running_times=running_times, start=0, length=length)
+    return count, int(running_times[count])
+
+
+def fill_length(durations: Iterable[int], length: int, allow_overtime: bool = False) -> Tuple[int, int]:
+    """
+    Find how many programs, taken in order, it takes to fill a length of time
+    Programs stop being added as soon as the length is filled.
+
+    :param durations: Duration of each program, in milliseconds
+    :type durations: Iterable[int]
+    :param length: Length of time to fill, in milliseconds
+    :type length: int
+    :param allow_overtime: Include the program that runs past the end of the length (default: leave it out)
+    :type allow_overtime: bool, optional
+    :return: Number of programs needed, their total running time in milliseconds
+    :rtype: Tuple[int, int]
+    """
+    running_times = _running_times(durations=durations)
+    # every program starting before the length is filled
+    count = int(numpy.searchsorted(running_times[:-1], length, side="left"))
+    if count and running_times[count] > length and not allow_overtime:
+        count -= 1
+    return count, int(running_times[count])
+
+
+def partition_into_blocks(
+        durations: Iterable[int], block_length: int, first_block_length: int = None
+) -> List[Tuple[int, int, int]]:
+    """
+    Split programs, in order, into consecutive blocks that each fit in a length of time
+
+    Each block takes as many of the remaining programs as fit, found with a binary search over their running times.
+    A program too long for any block gets a block of its own (and runs over).
+
+    :param durations: Duration of each program, in milliseconds
+    :type durations: Iterable[int]
+    :param block_length: Length of each block, in milliseconds
+    :type block_length: int
+    :param first_block_length: Length of the first block, if different (this block may be left empty)
+    :type first_block_length: int, optional
+    :return: (index of the first program, index after the last program, running time in milliseconds) for each block
+    :rtype: List[Tuple[int, int, int]]
+    """
+    running_times = _running_times(durations=durations)
+    program_count = len(running_times) - 1
+    blocks = []
+    start = 0
+    if first_block_length is not None:
+        start = _fit(running_times=running_times, start=0, length=first_block_length)
+        blocks.append((0, start, int(running_times[start])))
+    while start < program_count:
+        # a program too long to fit in a block gets one of its own
+        end = max(_fit(running_times=running_times, start=start, length=block_length), start + 1)
+        blocks.append((start, end, int(running_times[end] - running_times[start])))
+        start = end
+    return blocks
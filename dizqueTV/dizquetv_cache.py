@@ -0,0 +1,445 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+
+
+def _copy_json(data: Any) -> Any:
+    """
+    Copy decoded JSON so callers can modify their copy without affecting anyone else's
+
+    Faster than copy.deepcopy since decoded JSON only holds dicts, lists and immutable values.
+
+    :param data: Decoded JSON data
+    :type data: Any
+    :return: Independent copy of the data
+    :rtype: Any
+    """
+    if isinstance(data, dict):
+        return {key: _copy_json(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_copy_json(value) for value in data]
+    return data
+
+
+def request_key(*parts) -> Tuple:
+    """
+    Build a hashable key for a request from its endpoint, parameters, headers, etc.
+
+    :param parts: Parts of the request (dicts are sorted by key)
+    :return: Hashable tuple
+    :rtype: tuple
+    """
+    return tuple(
+        tuple(sorted((key, str(value)) for key, value in part.items()))
+        if isinstance(part, dict)
+        else part
+        for part in parts
+    )
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Share one in-flight call between all threads making the same call at the same time
+        """
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(calls={self.calls}, coalesced={self.coalesced})"
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Get the number of calls made and how many of them were served by another thread's call
+
+        :return: Dictionary with 'calls', 'coalesced' and 'in_flight' counts
+        :rtype: dict
+        """
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": self.in_flight}
+
+    def reset_counters(self) -> None:
+        """
+        Reset the call counters
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self.calls = 0
+            self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], copy_func: Callable[[Any], Any] = None) -> Any:
+        """
+        Run a call, or wait for the identical call already in flight and share its result
+
+        :param key: Key identifying the call
+        :type key: Hashable
+        :param func: Function making the call
+        :type func: function
+        :param copy_func: Function to copy a shared result, so every caller gets its own (default: no copy)
+        :type copy_func: function, optional
+        :return: Result of the call
+        :rtype: Any
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            if flight:
+                self.coalesced += 1
+                flight.followers += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if leader:
+            try:
+                flight.value = func()
+            except Exception as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    # no new followers can join once the flight is removed
+                    del self._flights[key]
+                flight.event.set()
+            if flight.error:
+                raise flight.error
+            if flight.followers and copy_func:
+                return copy_func(flight.value)
+            return flight.value
+
+        flight.event.wait()
+        if flight.error:
+            raise flight.error
+        if copy_func:
+            return copy_func(flight.value)
+        return flight.value
+
+
+# seconds to keep each read endpoint's response
+DEFAULT_CACHE_TTLS = {
+    "/version": 3600,
+    "/channelNumbers": 30,
+    "/fillers": 60,
+    "/shows": 60,
+    "/plex-servers": 300,
+    "/ffmpeg-settings": 300,
+    "/plex-settings": 300,
+    "/xmltv-settings": 300,
+    "/hdhr-settings": 300,
+    "/xmltv-last-refresh": 30,
+    "/guide/status": 30,
+}
+
+# writes to an endpoint starting with the key drop cached endpoints starting with any of the values
+# writes to endpoints not listed here drop the whole cache
+CACHE_INVALIDATIONS = {
+    "/channel-tools": [],
+    "/upload": [],
+    "/channel": ["/channel", "/guide", "/xmltv-last-refresh"],
+    "/filler": ["/filler", "/channel", "/guide", "/xmltv-last-refresh"],
+    "/show": ["/show", "/channel", "/guide", "/xmltv-last-refresh"],
+    "/plex-servers": ["/plex-servers"],
+    "/ffmpeg-settings": ["/ffmpeg-settings"],
+    "/plex-settings": ["/plex-settings"],
+    "/xmltv-settings": ["/xmltv-settings", "/xmltv-last-refresh", "/guide"],
+    "/hdhr-settings": ["/hdhr-settings"],
+}
+
+
+class ResponseCache:
+    def __init__(self, ttls: Dict[str, float] = None, invalidations: Dict[str, List[str]] = None):
+        """
+        Time-limited cache of decoded JSON responses, cleared by writes to related endpoints
+
+        :param ttls: Seconds to cache each endpoint for (default: DEFAULT_CACHE_TTLS). Endpoints not listed are not cached.
+        :type ttls: Dict[str, float], optional
+        :param invalidations: Which cached endpoints a write to an endpoint clears (default: CACHE_INVALIDATIONS)
+        :type invalidations: Dict[str, List[str]], optional
+        """
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self.invalidations = dict(CACHE_INVALIDATIONS if invalidations is None else invalidations)
+        self._lock = threading.Lock()
+        self._entries = {}
+        # bumped on every invalidation, so responses fetched before a write are not stored after it
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(entries={len(self._entries)}, hits={self.hits}, misses={self.misses})"
+
+    @property
+    def stats(self) -> dict:
+        """
+        Get the cache hit and miss counts
+
+        :return: Dictionary with 'hits', 'misses' and 'entries' counts
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def caches(self, endpoint: str) -> bool:
+        """
+        Check whether responses for an endpoint are cached
+
+        :param endpoint: API endpoint
+        :type endpoint: str
+        :return: True if the endpoint is cached
+        :rtype: bool
+        """
+        return bool(self.ttls.get(endpoint))
+
+    def get(self, endpoint: str, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """
+        Get a copy of the cached response, calling fetch to get (and cache) it if missing or expired
+
+        :param endpoint: API endpoint
+        :type endpoint: str
+        :param key: Key identifying the request
+        :type key: Hashable
+        :param fetch: Function returning the decoded JSON response
+        :type fetch: function
+        :return: Decoded JSON response
+        :rtype: Any
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return _copy_json(entry[2])
+            self.misses += 1
+            generation = self._generation
+        value = fetch()
+        if value:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttls[endpoint], endpoint, _copy_json(value))
+        return value
+
+    def invalidate(self, endpoint: str) -> None:
+        """
+        Drop the cached responses affected by a write to an endpoint
+
+        :param endpoint: API endpoint that was written to
+        :type endpoint: str
+        :return: None
+        :rtype: None
+        """
+        matches = [prefix for prefix in self.invalidations if endpoint.startswith(prefix)]
+        with self._lock:
+            self._generation += 1
+            if not matches:
+                self._entries.clear()
+                return
+            # most specific rule wins, so /channel-tools does not fall back to /channel
+            prefixes = tuple(self.invalidations[max(matches, key=len)])
+            if not prefixes:
+                return
+            for key in [key for key, entry in self._entries.items() if entry[1].startswith(prefixes)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Drop every cached response
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+class GuideCache:
+    def __init__(self):
+        """
+        Keep the last decoded guide, reused for as long as the server's guide has not been updated
+
+        The guide is keyed on the 'lastUpdate' of /guide/status, which is far cheaper to fetch than the guide itself.
+        """
+        self._lock = threading.Lock()
+        self._last_update = None
+        self._data = None
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(last_update={self._last_update}, hits={self.hits}, misses={self.misses})"
+
+    @property
+    def stats(self) -> dict:
+        """
+        Get the cache hit and miss counts
+
+        :return: Dictionary with 'hits' and 'misses' counts
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def get(self, last_update: Any, fetch: Callable[[], Any]) -> Any:
+        """
+        Get the cached guide if it is still for the same guide update, calling fetch to get (and cache) it otherwise
+        The cached guide is shared between callers rather than copied, so it must not be modified.
+
+        :param last_update: 'lastUpdate' of the server's guide (None if unknown, which always fetches)
+        :type last_update: Any
+        :param fetch: Function returning the decoded guide
+        :type fetch: function
+        :return: Decoded guide
+        :rtype: Any
+        """
+        with self._lock:
+            if last_update is not None and self._data is not None and last_update == self._last_update:
+                self.hits += 1
+                return self._data
+            self.misses += 1
+        value = fetch()
+        if value and last_update is not None:
+            with self._lock:
+                self._last_update = last_update
+                self._data = value
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop the cached guide
+
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            self._last_update = None
+            self._data = None
+
+
+class _LineupWindow:
+    __slots__ = ("start", "stop", "programs")
+
+    def __init__(self, start: str, stop: str, programs: List[dict]):
+        self.start = start
+        self.stop = stop
+        self.programs = programs
+
+
+class LineupCache:
+    def __init__(self):
+        """
+        Guide programs already fetched for each channel, so overlapping lineup requests only fetch what is missing
+
+        Times are compared as dizqueTV's ISO 8601 UTC strings (ex. '2021-01-01T00:00:00.000Z'), which sort in time order.
+        Cached programs are cleared whenever the guide's 'lastUpdate' changes.
+        """
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._last_update = None
+        self.hits = 0
+        self.fetches = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(channels={len(self._windows)}, hits={self.hits}, fetches={self.fetches})"
+
+    @property
+    def stats(self) -> dict:
+        """
+        Get how many lineups were served entirely from the cache, and how many ranges had to be fetched
+
+        :return: Dictionary with 'hits', 'fetches' and 'channels' counts
+        :rtype: dict
+        """
+        return {"hits": self.hits, "fetches": self.fetches, "channels": len(self._windows)}
+
+    def sync(self, last_update: Any) -> None:
+        """
+        Drop every cached lineup if the guide has been updated since they were fetched
+
+        :param last_update: 'lastUpdate' of the server's guide (None if unknown, which drops everything)
+        :type last_update: Any
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            if last_update is None or last_update != self._last_update:
+                self._windows.clear()
+                self._last_update = last_update
+
+    def get(
+            self,
+            channel_number: int,
+            start: str,
+            stop: str,
+            fetch: Callable[[str, str], Union[List[dict], None]],
+    ) -> List[dict]:
+        """
+        Get the programs airing on a channel between two times, fetching only the parts not already cached
+
+        :param channel_number: Number of the channel
+        :type channel_number: int
+        :param start: Start of the range (ISO 8601 UTC string)
+        :type start: str
+        :param stop: End of the range (ISO 8601 UTC string)
+        :type stop: str
+        :param fetch: Function returning the program data between two times, or None if it could not be fetched
+        :type fetch: function
+        :return: Program data (shared with the cache, so it must not be modified), in start order
+        :rtype: List[dict]
+        """
+        with self._lock:
+            window = self._windows.get(channel_number)
+        if window and window.start <= stop and start <= window.stop:
+            missing = []
+            if start < window.start:
+                missing.append((start, window.start))
+            if stop > window.stop:
+                missing.append((window.stop, stop))
+            programs = window.programs
+        else:
+            window = None
+            missing = [(start, stop)]
+            programs = []
+
+        if not missing:
+            with self._lock:
+                self.hits += 1
+        complete = True
+        for missing_start, missing_stop in missing:
+            fetched = fetch(missing_start, missing_stop)
+            with self._lock:
+                self.fetches += 1
+            if fetched is None:
+                complete = False
+                continue
+            programs = programs + fetched
+        if missing:
+            # programs straddling the edge of a fetched range come back from both fetches
+            programs = sorted(
+                {program["start"]: program for program in programs}.values(),
+                key=lambda program: program["start"],
+            )
+            if complete:
+                # anything that ended before this range is dropped, so sliding a window forward does not grow the cache
+                with self._lock:
+                    self._windows[channel_number] = _LineupWindow(
+                        start=start,
+                        stop=max(stop, window.stop) if window else stop,
+                        programs=[program for program in programs if program["stop"] > start],
+                    )
+        return [program for program in programs if program["stop"] > start and program["start"] < stop]
@@ -0,0 +1,282 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+import numpy
+
+from dizqueTV.dizquetv_timeline import to_utc
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def to_epoch_milliseconds(moment: datetime) -> int:
+    """
+    Convert a datetime.datetime to milliseconds since the Unix epoch
+
+    :param moment: datetime.datetime object (naive datetimes are assumed to be UTC)
+    :type moment: datetime.datetime
+    :return: Milliseconds since 1970-01-01 00:00:00 UTC
+    :rtype: int
+    """
+    return (to_utc(moment) - _EPOCH) // _MILLISECOND
+
+
+def from_epoch_milliseconds(milliseconds: int) -> datetime:
+    """
+    Convert milliseconds since the Unix epoch to a naive UTC datetime.datetime
+
+    :param milliseconds: Milliseconds since 1970-01-01 00:00:00 UTC
+    :type milliseconds: int
+    :return: datetime.datetime object (UTC)
+    :rtype: datetime.datetime
+    """
+    return _EPOCH + timedelta(milliseconds=int(milliseconds))
+
+
+def guide_times_to_epoch_milliseconds(time_strings: Iterable[str]) -> numpy.ndarray:
+    """
+    Convert dizqueTV guide times (ex. '2021-01-01T00:00:00.000Z') to milliseconds since the Unix epoch
+
+    :param time_strings: ISO 8601 UTC time strings
+    :type time_strings: Iterable[str]
+    :return: Array of milliseconds since 1970-01-01 00:00:00 UTC
+    :rtype: numpy.ndarray
+    """
+    # numpy parses ISO 8601 itself, but warns about the 'Z' suffix
+    return numpy.array(
+        [time_string.rstrip("Z") for time_string in time_strings], dtype="datetime64[ms]"
+    ).astype(numpy.int64)
+
+
+class ChannelGuideIndex:
+    def __init__(self, programs: List[Any]):
+        """
+        Interval index over one channel's guide programs, for time range, gap and overlap lookups by binary search
+
+        :param programs: GuideProgram objects (anything with 'start' and 'stop' guide time strings)
+        :type programs: List[GuideProgram]
+        """
+        programs = [program for program in programs if program.start and program.stop]
+        starts = guide_times_to_epoch_milliseconds(time_strings=(program.start for program in programs))
+        stops = guide_times_to_epoch_milliseconds(time_strings=(program.stop for program in programs))
+        order = numpy.argsort(starts, kind="stable")
+        self.programs = [programs[index] for index in order.tolist()]
+        self.starts = starts[order]
+        self.stops = stops[order]
+        # latest stop of any program so far, and which program it belongs to; unlike stops, always sorted
+        self.reach = numpy.maximum.accumulate(self.stops)
+        self._reach_holders = numpy.maximum.accumulate(
+            numpy.where(self.stops == self.reach, numpy.arange(len(self.stops)), 0)
+        )
+        # boundaries between one program and the next, worked out once so gap and overlap lookups are searches
+        following = self.starts[1:]
+        reach = self.reach[:-1]
+        self._gap_positions = numpy.flatnonzero(following > reach)
+        self._overlap_positions = numpy.flatnonzero(following < reach)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(programs={len(self)})"
+
+    def __len__(self):
+        return len(self.programs)
+
+    def _candidates(self, start: int, end: int) -> numpy.ndarray:
+        # programs are sorted by start, and reach by latest stop, so both ends of the range are binary searches
+        first = numpy.searchsorted(self.reach, start, side="right")
+        last = numpy.searchsorted(self.starts, end, side="left")
+        positions = numpy.arange(first, last)
+        return positions[self.stops[positions] > start]
+
+    def between(self, from_date: datetime, to_date: datetime) -> List[Any]:
+        """
+        Get the programs airing at any point between two times
+
+        :param from_date: Start of the range (naive datetimes are assumed to be UTC)
+        :type from_date: datetime.datetime
+        :param to_date: End of the range, exclusive (naive datetimes are assumed to be UTC)
+        :type to_date: datetime.datetime
+        :return: List of GuideProgram objects, in start order
+        :rtype: List[GuideProgram]
+        """
+        positions = self._candidates(
+            start=to_epoch_milliseconds(moment=from_date), end=to_epoch_milliseconds(moment=to_date)
+        )
+        return [self.programs[position] for position in positions.tolist()]
+
+    def at(self, moment: datetime) -> Union[Any, None]:
+        """
+        Get the program airing at a moment
+
+        :param moment: datetime.datetime object (naive datetimes are assumed to be UTC)
+        :type moment: datetime.datetime
+        :return: GuideProgram object (the latest to start, if programs overlap), or None if nothing airs
+        :rtype: Union[GuideProgram, None]
+        """
+        elapsed = to_epoch_milliseconds(moment=moment)
+        positions = self._candidates(start=elapsed, end=elapsed + 1)
+        if not len(positions):
+            return None
+        return self.programs[int(positions[-1])]
+
+    def gaps(self, from_date: datetime = None, to_date: datetime = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Get the stretches of time between programs with nothing in the guide
+
+        :param from_date: Only include gaps ending after this time (naive datetimes are assumed to be UTC)
+        :type from_date: datetime.datetime, optional
+        :param to_date: Only include gaps starting before this time (naive datetimes are assumed to be UTC)
+        :type to_date: datetime.datetime, optional
+        :return: List of (start, end) datetime.datetime tuples (UTC)
+        :rtype: List[Tuple[datetime.datetime, datetime.datetime]]
+        """
+        positions = self._gap_positions
+        gap_starts = self.reach[positions]
+        gap_ends = self.starts[positions + 1]
+        first = 0
+        if from_date is not None:
+            first = numpy.searchsorted(gap_ends, to_epoch_milliseconds(moment=from_date), side="right")
+        last = len(positions)
+        if to_date is not None:
+            last = numpy.searchsorted(gap_starts, to_epoch_milliseconds(moment=to_date), side="left")
+        return [
+            (from_epoch_milliseconds(milliseconds=start), from_epoch_milliseconds(milliseconds=end))
+            for start, end in zip(gap_starts[first:last].tolist(), gap_ends[first:last].tolist())
+        ]
+
+    def overlaps(self, from_date: datetime = None, to_date: datetime = None) -> List[Tuple[Any, Any]]:
+        """
+        Get the programs that start before an earlier program has ended
+
+        :param from_date: Only include overlaps ending after this time (naive datetimes are assumed to be UTC)
+        :type from_date: datetime.datetime, optional
+        :param to_date: Only include overlaps starting before this time (naive datetimes are assumed to be UTC)
+        :type to_date: datetime.datetime, optional
+        :return: List of (earlier GuideProgram, overlapping GuideProgram) tuples
+        :rtype: List[Tuple[GuideProgram, GuideProgram]]
+        """
+        positions = self._overlap_positions
+        overlap_starts = self.starts[positions + 1]
+        overlap_ends = numpy.minimum(self.reach[positions], self.stops[positions + 1])
+        first = 0
+        if from_date is not None:
+            from_milliseconds = to_epoch_milliseconds(moment=from_date)
+            # an overlap ends by the reach before it, which is sorted, so that bounds the search
+            first = numpy.searchsorted(self.reach[positions], from_milliseconds, side="right")
+        last = len(positions)
+        if to_date is not None:
+            last = numpy.searchsorted(overlap_starts, to_epoch_milliseconds(moment=to_date), side="left")
+        return [
+            (self.programs[int(self._reach_holders[position])], self.programs[position + 1])
+            for position, end in zip(positions[first:last].tolist(), overlap_ends[first:last].tolist())
+            if from_date is None or end > from_milliseconds
+        ]
+
+
+class GuideIndex:
+    def __init__(self, channels: Iterable[Any]):
+        """
+        Interval index over the programs of many guide channels, answering queries for every channel at once
+
+        Each channel's programs are laid end to end in one array, with every channel's times shifted into a range
+        of their own, so a single binary search finds the programs of every channel.
+
+        :param channels: GuideChannel objects
+        :type channels: Iterable[GuideChannel]
+        """
+        self.channels = {channel.number: channel.index for channel in channels}
+        self._rows = {number: row for row, number in enumerate(self.channels)}
+        indexes = list(self.channels.values())
+        counts = [len(index) for index in indexes]
+        self._bounds = numpy.concatenate(([0], numpy.cumsum(counts))).astype(numpy.int64)
+        self._programs = [program for index in indexes for program in index.programs]
+        starts = numpy.concatenate([index.starts for index in indexes] + [numpy.empty(0, dtype=numpy.int64)])
+        self._stops = numpy.concatenate([index.stops for index in indexes] + [numpy.empty(0, dtype=numpy.int64)])
+        self._reach = numpy.concatenate([index.reach for index in indexes] + [numpy.empty(0, dtype=numpy.int64)])
+        self._origin = int(starts.min()) if len(starts) else 0
+        # wide enough that a clamped query time never strays into the next channel's range
+        self._span = (int(self._reach.max()) - self._origin + 2) if len(starts) else 2
+        self._channel_keys = numpy.arange(len(indexes), dtype=numpy.int64) * self._span
+        channel_offsets = numpy.repeat(self._channel_keys, counts) - self._origin
+        self._start_keys = starts + channel_offsets
+        self._reach_keys = self._reach + channel_offsets
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(channels={len(self.channels)})"
+
+    def __getitem__(self, channel_number: int) -> ChannelGuideIndex:
+        return self.channels[channel_number]
+
+    def _relative(self, milliseconds: int) -> int:
+        return min(max(milliseconds - self._origin, -1), self._span - 1)
+
+    def at(self, moment: datetime) -> Dict[int, Any]:
+        """
+        Get what airs at a moment on every channel
+
+        :param moment: datetime.datetime object (naive datetimes are assumed to be UTC)
+        :type moment: datetime.datetime
+        :return: Dictionary of channel numbers and GuideProgram objects (None if nothing airs)
+        :rtype: Dict[int, Union[GuideProgram, None]]
+        """
+        if not self._programs:
+            return {number: None for number in self.channels}
+        elapsed = to_epoch_milliseconds(moment=moment)
+        # the last program of each channel to start by then
+        positions = numpy.searchsorted(
+            self._start_keys, self._channel_keys + self._relative(milliseconds=elapsed), side="right"
+        ) - 1
+        started = positions >= self._bounds[:-1]
+        airing = started & (self._stops[positions] > elapsed)
+        results = {
+            number: (self._programs[position] if is_airing else None)
+            for number, position, is_airing in zip(self.channels, positions.tolist(), airing.tolist())
+        }
+        # it ended, but a longer program it overlaps has not
+        numbers = list(self.channels)
+        for row in numpy.flatnonzero(started & ~airing & (self._reach[positions] > elapsed)).tolist():
+            results[numbers[row]] = self.channels[numbers[row]].at(moment=moment)
+        return results
+
+    def between(
+            self, from_date: datetime, to_date: datetime, channel_numbers: Iterable[int] = None
+    ) -> Dict[int, List[Any]]:
+        """
+        Get what airs between two times on every channel
+
+        :param from_date: Start of the range (naive datetimes are assumed to be UTC)
+        :type from_date: datetime.datetime
+        :param to_date: End of the range, exclusive (naive datetimes are assumed to be UTC)
+        :type to_date: datetime.datetime
+        :param channel_numbers: Only include these channels (default: all channels)
+        :type channel_numbers: Iterable[int], optional
+        :return: Dictionary of channel numbers and lists of GuideProgram objects, in start order
+        :rtype: Dict[int, List[GuideProgram]]
+        """
+        if channel_numbers is None:
+            numbers = list(self.channels)
+        else:
+            numbers = [number for number in channel_numbers if number in self.channels]
+        rows = numpy.array([self._rows[number] for number in numbers], dtype=numpy.int64)
+        start = to_epoch_milliseconds(moment=from_date)
+        end = to_epoch_milliseconds(moment=to_date)
+        channel_keys = self._channel_keys[rows]
+        firsts = numpy.searchsorted(
+            self._reach_keys, channel_keys + self._relative(milliseconds=start), side="right"
+        )
+        lasts = numpy.searchsorted(self._start_keys, channel_keys + self._relative(milliseconds=end), side="left")
+        # every channel's firsts:lasts run of positions, end to end
+        lengths = numpy.maximum(lasts - firsts, 0)
+        run_starts = numpy.cumsum(lengths) - lengths
+        positions = numpy.arange(int(lengths.sum())) + numpy.repeat(firsts - run_starts, lengths)
+        # programs an earlier, longer program made look relevant
+        keep = self._stops[positions] > start
+        counts = numpy.bincount(
+            numpy.repeat(numpy.arange(len(numbers)), lengths)[keep], minlength=len(numbers)
+        )
+        kept = positions[keep].tolist()
+        results = {}
+        offset = 0
+        for number, count in zip(numbers, counts.tolist()):
+            results[number] = [self._programs[position] for position in kept[offset:offset + count]]
+            offset += count
+        return results
@@ -0,0 +1,247 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TaskTimeoutError
+from concurrent.futures import wait
+from typing import Any, Callable, Iterable, Iterator, List
+
+_worker_state = threading.local()
+
+
+class TaskResult:
+    __slots__ = ("index", "element", "result", "error")
+
+    def __init__(self, index: int, element: Any, result: Any = None, error: Exception = None):
+        """
+        Outcome of one task run by a ParallelExecutor
+
+        :param index: Position of the element in the input
+        :type index: int
+        :param element: Element the task was run for
+        :type element: Any
+        :param result: Return value of the task (None if it failed)
+        :type result: Any, optional
+        :param error: Exception raised by the task, or TimeoutError if it missed its deadline
+        :type error: Exception, optional
+        """
+        self.index = index
+        self.element = element
+        self.result = result
+        self.error = error
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.element}, {'failed' if self.error else 'ok'})"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+class ParallelExecutor:
+    def __init__(self, max_workers: int = 10, timeout: float = None):
+        """
+        Bounded, reusable thread pool to fan out calls over many elements
+
+        :param max_workers: Maximum number of tasks running at once
+        :type max_workers: int, optional
+        :param timeout: Default seconds each task may run before it is reported as timed out (None to wait forever)
+        :type timeout: float, optional
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        # tasks that timed out but are still running, each holding one of the pool's threads
+        self._stuck = set()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(max_workers={self.max_workers})"
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        abandoned = None
+        with self._lock:
+            if self._pool and len(self._stuck) * 2 >= self.max_workers:
+                # too many threads are tied up by timed-out tasks, so new tasks get a fresh pool
+                # the old one's threads exit on their own once their tasks return
+                abandoned, self._pool = self._pool, None
+                self._stuck = set()
+            if not self._pool:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="dizqueTV"
+                )
+            pool = self._pool
+        if abandoned:
+            abandoned.shutdown(wait=False)
+        return pool
+
+    def _abandon(self, future) -> None:
+        with self._lock:
+            self._stuck.add(future)
+        future.add_done_callback(self._release)
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._stuck.discard(future)
+
+    def shutdown(self, wait_for_tasks: bool = True) -> None:
+        """
+        Stop the worker threads. The pool is recreated on the next call.
+
+        :param wait_for_tasks: Wait for running tasks to finish
+        :type wait_for_tasks: bool, optional
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=wait_for_tasks)
+
+    @staticmethod
+    def _run(func: Callable, started: list, slot: int, kwargs: dict):
+        started[slot] = time.monotonic()
+        _worker_state.executor = True
+        return func(**kwargs)
+
+    def imap(
+            self,
+            func: Callable,
+            elements: Iterable,
+            element_param_name: str,
+            ordered: bool = True,
+            timeout: float = None,
+            **kwargs,
+    ) -> Iterator[TaskResult]:
+        """
+        Run a function for every element in a list, yielding results as they arrive
+
+        Errors are collected on the TaskResult rather than raised.
+        A task's deadline counts from when it starts running, not from when it is queued.
+        A running thread cannot be stopped, so a task that times out keeps its worker thread busy until it returns.
+        Once half of the pool's threads are held up this way, later calls get a fresh pool.
+
+        :param func: Function to run
+        :type func: function
+        :param elements: Elements to run the function for
+        :type elements: Iterable
+        :param element_param_name: Name of the parameter to pass each element as
+        :type element_param_name: str
+        :param ordered: Yield results in input order (True) or in completion order (False)
+        :type ordered: bool, optional
+        :param timeout: Seconds each task may run (default: executor's timeout)
+        :type timeout: float, optional
+        :param kwargs: Keyword arguments to pass to every call
+        :return: Iterator of TaskResult objects
+        :rtype: Iterator[TaskResult]
+        """
+        elements = list(elements)
+        if timeout is None:
+            timeout = self.timeout
+        if getattr(_worker_state, "executor", False):
+            # already on a worker thread; waiting on the pool from here could deadlock it
+            yield from self._imap_inline(func, elements, element_param_name, **kwargs)
+            return
+
+        pool = self._get_pool()
+        started = [None] * len(elements)
+        pending = {}
+        for index, element in enumerate(elements):
+            task_kwargs = kwargs.copy()
+            task_kwargs[element_param_name] = element
+            future = pool.submit(self._run, func, started, index, task_kwargs)
+            pending[future] = index
+
+        finished = {}
+        next_index = 0
+        try:
+            while pending:
+                wait_time = None
+                if timeout is not None:
+                    now = time.monotonic()
+                    deadlines = [started[i] + timeout for i in pending.values() if started[i]]
+                    wait_time = max(min(deadlines) - now, 0) if deadlines else timeout
+                done, _ = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+                results = []
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        results.append(TaskResult(index, elements[index], result=future.result()))
+                    except Exception as e:
+                        results.append(TaskResult(index, elements[index], error=e))
+                if timeout is not None:
+                    now = time.monotonic()
+                    for future, index in list(pending.items()):
+                        if started[index] and now - started[index] >= timeout:
+                            if not future.cancel():
+                                self._abandon(future)
+                            del pending[future]
+                            results.append(
+                                TaskResult(
+                                    index,
+                                    elements[index],
+                                    error=TaskTimeoutError(
+                                        f"Task for {elements[index]} exceeded {timeout} seconds"
+                                    ),
+                                )
+                            )
+                if not ordered:
+                    yield from results
+                    continue
+                for result in results:
+                    finished[result.index] = result
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            # stop queued tasks if the caller stops iterating early
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _imap_inline(
+            func: Callable, elements: List, element_param_name: str, **kwargs
+    ) -> Iterator[TaskResult]:
+        for index, element in enumerate(elements):
+            task_kwargs = kwargs.copy()
+            task_kwargs[element_param_name] = element
+            try:
+                yield TaskResult(index, element, result=func(**task_kwargs))
+            except Exception as e:
+                yield TaskResult(index, element, error=e)
+
+    def map(
+            self,
+            func: Callable,
+            elements: Iterable,
+            element_param_name: str,
+            ordered: bool = True,
+            timeout: float = None,
+            **kwargs,
+    ) -> List[TaskResult]:
+        """
+        Run a function for every element in a list and wait for all results
+
+        :param func: Function to run
+        :type func: function
+        :param elements: Elements to run the function for
+        :type elements: Iterable
+        :param element_param_name: Name of the parameter to pass each element as
+        :type element_param_name: str
+        :param ordered: Return results in input order (True) or in completion order (False)
+        :type ordered: bool, optional
+        :param timeout: Seconds each task may run (default: executor's timeout)
+        :type timeout: float, optional
+        :param kwargs: Keyword arguments to pass to every call
+        :return: List of TaskResult objects
+        :rtype: List[TaskResult]
+        """
+        return list(
+            self.imap(
+                func,
+                elements,
+                element_param_name=element_param_name,
+                ordered=ordered,
+                timeout=timeout,
+                **kwargs,
+            )
+        )
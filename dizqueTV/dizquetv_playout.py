@@ -0,0 +1,147 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple, Union
+
+import dizqueTV.dizquetv_logging as logs
+from dizqueTV.dizquetv_timeline import ScheduledProgram, TimelineIndex, to_utc
+from dizqueTV.exceptions import RedirectCycleError
+
+
+class ResolvedProgram:
+    __slots__ = ("channel_number", "scheduled", "path", "until")
+
+    def __init__(
+            self, channel_number: int, scheduled: ScheduledProgram, path: Tuple[int, ...], until: datetime
+    ):
+        """
+        What actually airs on a channel at a moment, after following any redirects
+
+        :param channel_number: Number of the channel that was resolved
+        :type channel_number: int
+        :param scheduled: ScheduledProgram on the last channel of the redirect chain
+        :type scheduled: ScheduledProgram
+        :param path: Channel numbers followed, starting with channel_number
+        :type path: Tuple[int, ...]
+        :param until: When this could next change (the earliest end of any program along the chain, UTC)
+        :type until: datetime.datetime
+        """
+        self.channel_number = channel_number
+        self.scheduled = scheduled
+        self.path = path
+        self.until = until
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({' -> '.join(str(number) for number in self.path)}: {self.program})"
+
+    @property
+    def program(self):
+        return self.scheduled.program
+
+    @property
+    def redirected(self) -> bool:
+        return len(self.path) > 1
+
+
+class PlayoutResolver:
+    def __init__(self, channels: Iterable):
+        """
+        Work out what airs on channels, following Redirect programs from channel to channel
+        Works entirely from the given Channel objects, without calling dizqueTV
+
+        :param channels: Channel objects (every channel a redirect may point to)
+        :type channels: Iterable[Channel]
+        """
+        self.channels = {channel.number: channel for channel in channels}
+        self._timelines = {}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(channels={len(self.channels)})"
+
+    def _timeline(self, channel_number: int) -> TimelineIndex:
+        timeline = self._timelines.get(channel_number)
+        if timeline is None:
+            timeline = self._timelines[channel_number] = self.channels[channel_number].timeline
+        return timeline
+
+    def _resolve(
+            self, channel_number: int, at: datetime, resolved: Dict, path: List[int]
+    ) -> Union[ResolvedProgram, None]:
+        if channel_number in resolved:
+            return resolved[channel_number]
+        if channel_number in path:
+            loop = path[path.index(channel_number):] + [channel_number]
+            raise RedirectCycleError(
+                f"Redirects loop between channels {' -> '.join(str(number) for number in loop)}"
+            )
+        channel = self.channels[channel_number]
+        timeline = self._timeline(channel_number=channel_number)
+        position = timeline.locate(elapsed=timeline.elapsed_milliseconds(at=at))
+        if not position:
+            resolved[channel_number] = None
+            return None
+        index, start = position
+        until = timeline.time_at(elapsed=start + int(timeline.durations[index]))
+        row = channel.program_table.rows[index]
+        target = None
+        if row.get("type") == "redirect" and row.get("channel") in self.channels:
+            target = self._resolve(
+                channel_number=row["channel"], at=at, resolved=resolved, path=path + [channel_number]
+            )
+        if target:
+            result = ResolvedProgram(
+                channel_number=channel_number,
+                scheduled=target.scheduled,
+                path=(channel_number,) + target.path,
+                until=min(until, target.until),
+            )
+        else:
+            # not a redirect, or one to a channel with nothing airing (or that is missing), so it airs itself
+            result = ResolvedProgram(
+                channel_number=channel_number,
+                scheduled=channel._schedule_program(index=index, start=start),
+                path=(channel_number,),
+                until=until,
+            )
+        resolved[channel_number] = result
+        return result
+
+    def resolve(self, channel_number: int, at: datetime = None) -> Union[ResolvedProgram, None]:
+        """
+        Get what airs on a channel at a moment, following redirects to other channels
+
+        :param channel_number: Number of the channel
+        :type channel_number: int
+        :param at: datetime.datetime object (default: now). Naive datetimes are assumed to be UTC.
+        :type at: datetime.datetime, optional
+        :return: ResolvedProgram object, or None if nothing airs
+        :rtype: Union[ResolvedProgram, None]
+        :raises RedirectCycleError: if the redirects lead back to a channel already in the chain
+        """
+        if channel_number not in self.channels:
+            return None
+        at = to_utc(at or datetime.utcnow())
+        return self._resolve(channel_number=channel_number, at=at, resolved={}, path=[])
+
+    def resolve_all(self, at: datetime = None) -> Dict[int, Union[ResolvedProgram, None]]:
+        """
+        Get what airs on every channel at a moment, following redirects to other channels
+        Each channel is resolved once, however many redirect chains pass through it.
+        Channels caught in a redirect cycle are logged and resolve to None.
+
+        :param at: datetime.datetime object (default: now). Naive datetimes are assumed to be UTC.
+        :type at: datetime.datetime, optional
+        :return: Dictionary of channel numbers and ResolvedProgram objects (None if nothing airs)
+        :rtype: Dict[int, Union[ResolvedProgram, None]]
+        """
+        at = to_utc(at or datetime.utcnow())
+        # shared by every chain, so each channel is only looked up once
+        resolved = {}
+        results = {}
+        for channel_number in self.channels:
+            try:
+                results[channel_number] = self._resolve(
+                    channel_number=channel_number, at=at, resolved=resolved, path=[]
+                )
+            except RedirectCycleError as e:
+                logs.log(message=f"Could not resolve channel {channel_number}: {e}", level="error")
+                results[channel_number] = None
+        return results
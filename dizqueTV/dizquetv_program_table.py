@@ -0,0 +1,427 @@
+from typing import Any, Callable, Iterable, List, Tuple, Union
+
+import numpy
+
+# stands in for None in the numeric columns and in the codes of the string columns
+MISSING = -1
+
+_NUMERIC_FIELDS = ["duration", "season", "episode"]
+_STRING_FIELDS = [
+    "type",
+    "title",
+    "showTitle",
+    "serverKey",
+    "ratingKey",
+    "date",
+    "channel",
+    "customShowId",
+]
+
+
+class StringColumn:
+    __slots__ = ("codes", "values", "_lookup")
+
+    def __init__(self, strings: Iterable, count: int = -1):
+        """
+        Dictionary-encoded column of (mostly repeated) strings
+
+        Each row holds a code pointing into values, or MISSING for None.
+
+        :param strings: Value of every row
+        :type strings: Iterable
+        :param count: Number of rows, if known (speeds up building the column)
+        :type count: int, optional
+        """
+        lookup = {}
+        self.codes = numpy.fromiter(
+            (MISSING if value is None else lookup.setdefault(value, len(lookup)) for value in strings),
+            dtype=numpy.int32,
+            count=count,
+        )
+        self.values = list(lookup)
+        self._lookup = lookup
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(rows={len(self.codes)}, values={len(self.values)})"
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Any:
+        code = self.codes[index]
+        return None if code == MISSING else self.values[code]
+
+    def code_of(self, value: Any) -> int:
+        """
+        Get the code of a value
+
+        :param value: Value to look up
+        :type value: Any
+        :return: Code of the value, or MISSING if no row holds it
+        :rtype: int
+        """
+        if value is None:
+            return MISSING
+        return self._lookup.get(value, -2)
+
+    def equals(self, value: Any) -> numpy.ndarray:
+        """
+        Get which rows hold a value
+
+        :param value: Value to look for (None for missing rows)
+        :type value: Any
+        :return: Boolean array, True for rows holding the value
+        :rtype: numpy.ndarray
+        """
+        return self.codes == self.code_of(value)
+
+    @property
+    def present(self) -> numpy.ndarray:
+        """
+        Get which rows hold a value (are not None)
+
+        :return: Boolean array, True for rows that are not None
+        :rtype: numpy.ndarray
+        """
+        return self.codes != MISSING
+
+    def map_values(self, func: Callable[[Any], Any], missing: Any, dtype=None) -> numpy.ndarray:
+        """
+        Apply a function to each distinct value once, and spread the results over the rows
+
+        :param func: Function to apply to each distinct value
+        :type func: function
+        :param missing: Result for missing rows
+        :type missing: Any
+        :param dtype: numpy dtype of the result
+        :return: Array with the result for every row
+        :rtype: numpy.ndarray
+        """
+        # the extra last entry is picked up by MISSING (-1) codes
+        results = numpy.array([func(value) for value in self.values] + [missing], dtype=dtype)
+        return results[self.codes]
+
+
+def rank_codes(columns_and_codes: List[Tuple[StringColumn, numpy.ndarray]]) -> List[numpy.ndarray]:
+    """
+    Rank codes from one or more string columns in one shared alphabetical order, so they can be compared
+
+    Only the distinct values actually referenced are sorted.
+
+    :param columns_and_codes: (StringColumn, array of its codes) pairs
+    :type columns_and_codes: List[Tuple[StringColumn, numpy.ndarray]]
+    :return: Array of ranks (MISSING for missing codes) for each pair
+    :rtype: List[numpy.ndarray]
+    """
+    distinct = [
+        numpy.unique(codes, return_inverse=True) for _, codes in columns_and_codes
+    ]
+    ordered = sorted(
+        {
+            column.values[code]
+            for (column, _), (unique_codes, _) in zip(columns_and_codes, distinct)
+            for code in unique_codes.tolist()
+            if code != MISSING
+        }
+    )
+    positions = {value: position for position, value in enumerate(ordered)}
+    ranks = []
+    for (column, _), (unique_codes, inverse) in zip(columns_and_codes, distinct):
+        lookup = numpy.array(
+            [
+                MISSING if code == MISSING else positions[column.values[code]]
+                for code in unique_codes.tolist()
+            ],
+            dtype=numpy.int64,
+        )
+        ranks.append(lookup[inverse.reshape(-1)])
+    return ranks
+
+
+class ProgramTable:
+    def __init__(
+            self,
+            rows: List[dict],
+            items: List = None,
+            item_factory: Callable[[dict], Any] = None,
+    ):
+        """
+        Columnar view of a list of programs, for sorting and filtering large lineups with numpy
+
+        Numeric columns (durations, seasons, episodes) use MISSING for None, except durations which use 0.
+        String columns are dictionary-encoded StringColumn objects.
+
+        :param rows: JSON data of each program
+        :type rows: List[dict]
+        :param items: Object for each row, returned by materialize() (default: built with item_factory)
+        :type items: list, optional
+        :param item_factory: Function building the object for a row (default: the row's JSON data)
+        :type item_factory: function, optional
+        """
+        self.rows = rows
+        self._items = items
+        self._item_factory = item_factory
+        count = len(rows)
+        self.durations = numpy.fromiter(
+            (row.get("duration") or 0 for row in rows), dtype=numpy.int64, count=count
+        )
+        self.seasons = self._numeric_column(values=(row.get("season") for row in rows), count=count)
+        self.episodes = self._numeric_column(values=(row.get("episode") for row in rows), count=count)
+        self.offline = numpy.fromiter(
+            (bool(row.get("isOffline")) for row in rows), dtype=bool, count=count
+        )
+        self.types = StringColumn(strings=(row.get("type") for row in rows), count=count)
+        self.titles = StringColumn(strings=(row.get("title") for row in rows), count=count)
+        self.show_titles = StringColumn(strings=(row.get("showTitle") for row in rows), count=count)
+        self.server_keys = StringColumn(strings=(row.get("serverKey") for row in rows), count=count)
+        self.rating_keys = StringColumn(strings=(row.get("ratingKey") for row in rows), count=count)
+        self.dates = StringColumn(strings=(row.get("date") for row in rows), count=count)
+        self.redirect_channels = StringColumn(strings=(row.get("channel") for row in rows), count=count)
+        self.custom_show_ids = StringColumn(
+            strings=(row.get("customShowId") for row in rows), count=count
+        )
+        self._show_indexes = {}
+
+    @classmethod
+    def from_media_items(cls, media_items: List) -> "ProgramTable":
+        """
+        Build a ProgramTable over a list of Program, Redirect, FillerItem or CustomShow objects
+
+        :param media_items: List of media objects
+        :type media_items: list
+        :return: ProgramTable whose rows materialize as the given objects
+        :rtype: ProgramTable
+        """
+        # imported here, since the models themselves build ProgramTables
+        from dizqueTV.models.media import BaseMediaItem
+
+        fields = _NUMERIC_FIELDS + _STRING_FIELDS + ["isOffline"]
+        rows = [
+            # media item attributes are read straight from their JSON data, so the data can stand in as the row
+            item._raw_data
+            if isinstance(item, BaseMediaItem)
+            else {field: getattr(item, field, None) for field in fields}
+            for item in media_items
+        ]
+        return cls(rows=rows, items=media_items)
+
+    @staticmethod
+    def _numeric_column(values: Iterable, count: int) -> numpy.ndarray:
+        return numpy.fromiter(
+            (MISSING if value is None else value for value in values), dtype=numpy.int64, count=count
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(rows={len(self)})"
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def has_custom_shows(self) -> bool:
+        """
+        Whether any row belongs to a custom show
+
+        :return: True if any row has a customShowId
+        :rtype: bool
+        """
+        return bool(self.custom_show_ids.present.any())
+
+    def materialize(self, indices: Union[numpy.ndarray, Iterable[int]]) -> List:
+        """
+        Get the objects for the given rows, in the given order
+
+        :param indices: Row numbers
+        :type indices: Union[numpy.ndarray, Iterable[int]]
+        :return: List of objects
+        :rtype: list
+        """
+        if isinstance(indices, numpy.ndarray):
+            indices = indices.tolist()
+        if self._items is not None:
+            items = self._items
+            return [items[index] for index in indices]
+        rows = self.rows
+        if self._item_factory:
+            factory = self._item_factory
+            return [factory(rows[index]) for index in indices]
+        return [rows[index] for index in indices]
+
+    def show_order(self, alphabetical: bool = True) -> numpy.ndarray:
+        """
+        Get the rows of TV episodes in series-season-episode order
+        If several rows share a series, season and episode, only the last is kept.
+
+        :param alphabetical: Order series alphabetically (True) or by their first appearance (False)
+        :type alphabetical: bool, optional
+        :return: Array of row numbers
+        :rtype: numpy.ndarray
+        """
+        episodes = numpy.flatnonzero(self.types.equals("episode") & (self.episodes > 0))
+        show_codes = self.show_titles.codes[episodes]
+        if alphabetical:
+            (show_ranks,) = rank_codes(columns_and_codes=[(self.show_titles, show_codes)])
+        else:
+            _, first_appearances, show_ranks = numpy.unique(
+                show_codes, return_index=True, return_inverse=True
+            )
+            show_ranks = numpy.argsort(numpy.argsort(first_appearances))[show_ranks.reshape(-1)]
+        sort_order = numpy.lexsort((self.episodes[episodes], self.seasons[episodes], show_ranks))
+        order = episodes[sort_order]
+        if len(order) < 2:
+            return order
+        keys = numpy.stack(
+            (show_ranks[sort_order], self.seasons[order], self.episodes[order]), axis=1
+        )
+        # lexsort is stable, so the last row of a run of duplicates is the last one in the lineup
+        last_of_run = numpy.append(numpy.any(keys[1:] != keys[:-1], axis=1), True)
+        return order[last_of_run]
+
+    def show_index(self, alphabetical: bool = True) -> "ShowIndex":
+        """
+        Get the TV episodes grouped by series and season, with their counts and running times
+        Built once per ordering and reused (a ProgramTable never changes)
+
+        :param alphabetical: Order series alphabetically (True) or by their first appearance (False)
+        :type alphabetical: bool, optional
+        :return: ShowIndex object
+        :rtype: ShowIndex
+        """
+        if alphabetical not in self._show_indexes:
+            self._show_indexes[alphabetical] = ShowIndex(table=self, alphabetical=alphabetical)
+        return self._show_indexes[alphabetical]
+
+    def non_show_mask(self) -> numpy.ndarray:
+        """
+        Get which rows are not TV episodes (movies, music, redirects, etc.) or are episodes without a season
+
+        :return: Boolean array
+        :rtype: numpy.ndarray
+        """
+        typed = self.types.present
+        return (typed & ~self.types.equals("episode")) | (self.seasons == 0)
+
+    def alphabetical_order(self, indices: numpy.ndarray = None) -> numpy.ndarray:
+        """
+        Order rows alphabetically, by series title for episodes and by title otherwise
+        Rows without a title come last, in their original order.
+
+        :param indices: Rows to order (default: all rows)
+        :type indices: numpy.ndarray, optional
+        :return: Array of row numbers
+        :rtype: numpy.ndarray
+        """
+        if indices is None:
+            indices = numpy.arange(len(self))
+        with_titles = indices[self.titles.present[indices]]
+        without_titles = indices[~self.titles.present[indices]]
+        is_episode = self.types.equals("episode")[with_titles]
+        keys = numpy.empty(len(with_titles), dtype=numpy.int64)
+        keys[is_episode], keys[~is_episode] = rank_codes(
+            columns_and_codes=[
+                (self.show_titles, self.show_titles.codes[with_titles[is_episode]]),
+                (self.titles, self.titles.codes[with_titles[~is_episode]]),
+            ]
+        )
+        return numpy.concatenate(
+            (with_titles[numpy.argsort(keys, kind="stable")], without_titles)
+        )
+
+
+def _run_starts(keys: numpy.ndarray, breaks: numpy.ndarray) -> numpy.ndarray:
+    # breaks[i] says whether keys[i + 1] starts a new run; the first key (if any) always does
+    if not len(keys):
+        return numpy.zeros(0, dtype=numpy.int64)
+    return numpy.flatnonzero(numpy.concatenate(([True], breaks)))
+
+
+def _run_sums(values: numpy.ndarray, starts: numpy.ndarray) -> numpy.ndarray:
+    if not len(starts):
+        return numpy.zeros(0, dtype=values.dtype)
+    return numpy.add.reduceat(values, starts)
+
+
+class ShowIndex:
+    __slots__ = (
+        "episodes",
+        "show_titles",
+        "show_starts",
+        "show_episode_counts",
+        "show_durations",
+        "show_numbers",
+        "positions",
+        "show_running_durations",
+        "seasons",
+        "season_starts",
+        "season_episode_counts",
+        "season_durations",
+        "season_shows",
+    )
+
+    def __init__(self, table: ProgramTable, alphabetical: bool = True):
+        """
+        TV episodes of a ProgramTable grouped by series and season, from a single sort of the table
+        Each series (and each season) is a run of consecutive entries in the episodes array.
+
+        :param table: ProgramTable to index
+        :type table: ProgramTable
+        :param alphabetical: Order series alphabetically (True) or by their first appearance (False)
+        :type alphabetical: bool, optional
+        """
+        self.episodes = table.show_order(alphabetical=alphabetical)
+        show_codes = table.show_titles.codes[self.episodes]
+        seasons = table.seasons[self.episodes]
+        durations = table.durations[self.episodes]
+        new_show = show_codes[1:] != show_codes[:-1]
+
+        self.show_starts = _run_starts(keys=show_codes, breaks=new_show)
+        self.show_titles = [
+            None if code == MISSING else table.show_titles.values[code]
+            for code in show_codes[self.show_starts].tolist()
+        ]
+        self.show_episode_counts = numpy.diff(numpy.append(self.show_starts, len(self.episodes)))
+        self.show_durations = _run_sums(values=durations, starts=self.show_starts)
+        # which series each episode belongs to, and how far into its series it is
+        self.show_numbers = numpy.repeat(numpy.arange(len(self.show_starts)), self.show_episode_counts)
+        self.positions = numpy.arange(len(self.episodes)) - self.show_starts[self.show_numbers]
+        # running time of each series up to and including each episode
+        running_durations = numpy.cumsum(durations)
+        self.show_running_durations = running_durations - numpy.repeat(
+            running_durations[self.show_starts] - durations[self.show_starts], self.show_episode_counts
+        )
+
+        self.season_starts = _run_starts(keys=seasons, breaks=new_show | (seasons[1:] != seasons[:-1]))
+        self.seasons = seasons[self.season_starts]
+        self.season_episode_counts = numpy.diff(numpy.append(self.season_starts, len(self.episodes)))
+        self.season_durations = _run_sums(values=durations, starts=self.season_starts)
+        self.season_shows = self.show_numbers[self.season_starts]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(shows={len(self)}, episodes={len(self.episodes)})"
+
+    def __len__(self):
+        return len(self.show_starts)
+
+    def show_episodes(self, show_number: int) -> numpy.ndarray:
+        """
+        Get the rows of a series' episodes, in season-episode order
+
+        :param show_number: Series number (position in show_titles)
+        :type show_number: int
+        :return: Array of row numbers
+        :rtype: numpy.ndarray
+        """
+        start = self.show_starts[show_number]
+        return self.episodes[start:start + self.show_episode_counts[show_number]]
+
+    def season_episodes(self, season_number: int) -> numpy.ndarray:
+        """
+        Get the rows of a season's episodes, in episode order
+
+        :param season_number: Season number (position in seasons, across all series)
+        :type season_number: int
+        :return: Array of row numbers
+        :rtype: numpy.ndarray
+        """
+        start = self.season_starts[season_number]
+        return self.episodes[start:start + self.season_episode_counts[season_number]]
@@ -1,22 +1,94 @@
+import copy
 from typing import Union
 from urllib.parse import urlencode
 
 import objectrest
+from requests.adapters import HTTPAdapter
 
 import dizqueTV.dizquetv_logging as logs
 
 
+def make_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+    max_retries: int = 0,
+) -> objectrest.Session:
+    """
+    Build a pooled HTTP session to share across requests (and threads)
+
+    :param pool_connections: Number of per-host connection pools to keep
+    :type pool_connections: int, optional
+    :param pool_maxsize: Maximum number of connections kept open per host
+    :type pool_maxsize: int, optional
+    :param pool_block: Block when every connection to a host is in use, rather than opening a throwaway connection
+    :type pool_block: bool, optional
+    :param keep_alive: Reuse connections between requests
+    :type keep_alive: bool, optional
+    :param max_retries: Number of retries for failed connections
+    :type max_retries: int, optional
+    :return: objectrest.Session object
+    :rtype: objectrest.Session
+    """
+    session = objectrest.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=max_retries,
+    )
+    session._session.mount("http://", adapter)
+    session._session.mount("https://", adapter)
+    if not keep_alive:
+        session._session.headers["Connection"] = "close"
+    return session
+
+
+def close_session(session: objectrest.Session) -> None:
+    """
+    Close all pooled connections held by a session
+
+    :param session: objectrest.Session object
+    :type session: objectrest.Session
+    :return: None
+    :rtype: None
+    """
+    session._session.close()
+
+
+def copy_response(response: Union[objectrest.Response, None]) -> Union[objectrest.Response, None]:
+    """
+    Copy a fully-read response, so every caller sharing it gets their own
+    The body bytes are immutable, so the copies share them.
+
+    :param response: requests.Response object (not streamed) or None
+    :type response: objectrest.Response
+    :return: Copy of the response, or None
+    :rtype: objectrest.Response
+    """
+    if response is None:
+        return None
+    response_copy = copy.copy(response)
+    response_copy.headers = response.headers.copy()
+    return response_copy
+
+
 def get(
     url: str,
     params: dict = None,
     headers: dict = None,
     timeout: int = 2,
     log: str = None,
+    session: objectrest.Session = None,
+    stream: bool = False,
 ) -> Union[objectrest.Response, None]:
     if params:
         url += f"?{urlencode(params)}"
     try:
-        res = objectrest.get(url=url, headers=headers, timeout=timeout)
+        res = objectrest.get(
+            url=url, session=session, headers=headers, timeout=timeout, stream=stream
+        )
         if log:
             logs.log(message=f"GET {url}", level=log)
             logs.log(message=f"Response: {res}", level=("error" if not res else log))
@@ -33,12 +105,18 @@ def post(
     files: dict = None,
     timeout: int = 2,
     log: str = None,
+    session: objectrest.Session = None,
 ) -> Union[objectrest.Response, None]:
     if params:
         url += f"?{urlencode(params)}"
     try:
         res = objectrest.post(
-            url=url, json=data, files=files, headers=headers, timeout=timeout
+            url=url,
+            session=session,
+            json=data,
+            files=files,
+            headers=headers,
+            timeout=timeout,
         )
         if log:
             logs.log(message=f"POST {url}, Body: {data}", level=log)
@@ -56,11 +134,14 @@ def put(
     data: dict = None,
     timeout: int = 2,
     log: str = None,
+    session: objectrest.Session = None,
 ) -> Union[objectrest.Response, None]:
     if params:
         url += f"?{urlencode(params)}"
     try:
-        res = objectrest.put(url=url, json=data, headers=headers, timeout=timeout)
+        res = objectrest.put(
+            url=url, session=session, json=data, headers=headers, timeout=timeout
+        )
         if log:
             logs.log(message=f"PUT {url}, Body: {data}", level=log)
             logs.log(message=f"Response: {res}", level=("error" if not res else log))
@@ -77,11 +158,14 @@ def delete(
     data: dict = None,
     timeout: int = 2,
     log: str = None,
+    session: objectrest.Session = None,
 ) -> Union[objectrest.Response, None]:
     if params:
         url += f"?{urlencode(params)}"
     try:
-        res = objectrest.delete(url=url, json=data, headers=headers, timeout=timeout)
+        res = objectrest.delete(
+            url=url, session=session, json=data, headers=headers, timeout=timeout
+        )
         if log:
             logs.log(message=f"DELETE {url}, Body: {data}", level=log)
             logs.log(message=f"Response: {res}", level=("error" if not res else log))
@@ -0,0 +1,218 @@
+from typing import Any, Iterable, List, Tuple, Union
+
+import numpy
+
+from dizqueTV.exceptions import GeneralException
+
+
+def _build_alias_table(weights: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    # Vose's alias method: column i keeps itself with probability prob[i], otherwise it gives alias[i]
+    count = len(weights)
+    scaled = weights * count / weights.sum()
+    prob = numpy.ones(count)
+    alias = numpy.arange(count)
+    small = [index for index in range(count) if scaled[index] < 1]
+    large = [index for index in range(count) if scaled[index] >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1 - scaled[less]
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    # whatever is left over is 1 up to rounding error, and keeps prob 1
+    return prob, alias
+
+
+class WeightedSampler:
+    def __init__(
+            self,
+            weights: Iterable[float],
+            items: List = None,
+            random_generator: numpy.random.Generator = None,
+    ):
+        """
+        Draw from weighted categories in constant time per draw, with Vose's alias method
+
+        Weights can be changed between draws. Lowering a weight (e.g. as a category drains) costs nothing: draws
+        from the existing alias table are kept with probability new weight / old weight. The table is only
+        rebuilt when a weight goes up or the total weight has halved since the table was built.
+
+        :param weights: Weight of each category (do not need to total 1)
+        :type weights: Iterable[float]
+        :param items: Item for each category, returned by sample() (default: category numbers)
+        :type items: list, optional
+        :param random_generator: numpy.random.Generator to draw from, for reproducible results (default: a new one)
+        :type random_generator: numpy.random.Generator, optional
+        """
+        self._weights = numpy.array(list(weights), dtype=numpy.float64)
+        if (self._weights < 0).any():
+            raise GeneralException("Weights cannot be negative.")
+        self._items = items
+        self._random_generator = random_generator or numpy.random.default_rng()
+        self._total = float(self._weights.sum())
+        self._table_weights = None
+        self._table_total = 0.0
+        self._prob = None
+        self._alias = None
+        # plain-list copies of the table, which single draws index faster than numpy arrays
+        self._lists = None
+        self._drained = False
+        # uniforms drawn ahead in bulk for single draws, which would otherwise pay numpy's per-call overhead
+        self._uniforms = []
+
+    @classmethod
+    def from_sizes_dict(
+            cls, items_and_sizes: dict, random_generator: numpy.random.Generator = None
+    ) -> "WeightedSampler":
+        """
+        Make a sampler over the keys of a dictionary, weighted by its values
+
+        :param items_and_sizes: dict of items and sizes
+        :type items_and_sizes: dict
+        :param random_generator: numpy.random.Generator to draw from (default: a new one)
+        :type random_generator: numpy.random.Generator, optional
+        :return: WeightedSampler object
+        :rtype: WeightedSampler
+        """
+        return cls(
+            weights=items_and_sizes.values(),
+            items=list(items_and_sizes.keys()),
+            random_generator=random_generator,
+        )
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @property
+    def total(self) -> float:
+        """
+        Get the current total weight
+
+        :return: Total weight
+        :rtype: float
+        """
+        return self._total
+
+    @property
+    def weights(self) -> numpy.ndarray:
+        """
+        Get the current weight of each category
+
+        :return: Array of weights
+        :rtype: numpy.ndarray
+        """
+        return self._weights.copy()
+
+    def update(self, index: int, weight: float):
+        """
+        Set the weight of a category
+
+        :param index: Category number
+        :type index: int
+        :param weight: New weight (0 to stop drawing the category)
+        :type weight: float
+        :return: None
+        :rtype: None
+        """
+        if weight < 0:
+            raise GeneralException("Weights cannot be negative.")
+        self._total += weight - self._weights[index]
+        self._weights[index] = weight
+        if self._table_weights is None:
+            return
+        if weight > self._table_weights[index]:
+            # the alias table can't draw this category often enough any more
+            self._table_weights = None
+        elif weight < self._table_weights[index]:
+            self._drained = True
+
+    def drain(self, index: int, amount: float = 1):
+        """
+        Lower the weight of a category, e.g. after one of its items is used up
+        The weight stops at 0.
+
+        :param index: Category number
+        :type index: int
+        :param amount: How much to lower the weight by
+        :type amount: float, optional
+        :return: None
+        :rtype: None
+        """
+        self.update(index=index, weight=max(self._weights[index] - amount, 0))
+
+    def _build(self):
+        self._table_weights = self._weights.copy()
+        self._table_total = self._total
+        self._prob, self._alias = _build_alias_table(weights=self._table_weights)
+        self._drained = False
+        self._lists = (self._prob.tolist(), self._alias.tolist(), self._table_weights.tolist())
+
+    def _prepare(self):
+        if self._total <= 0:
+            raise GeneralException("No category has any weight left to draw from.")
+        if self._table_weights is None or self._total * 2 < self._table_total:
+            self._build()
+
+    def _uniform(self) -> float:
+        if not self._uniforms:
+            self._uniforms = self._random_generator.random(size=1024).tolist()
+        return self._uniforms.pop()
+
+    def _sample_index(self) -> int:
+        prob, alias, table_weights = self._lists
+        while True:
+            # one uniform picks the column (whole part) and tosses its coin (fractional part)
+            column, coin = divmod(self._uniform() * len(prob), 1)
+            pick = int(column) if coin < prob[int(column)] else alias[int(column)]
+            if not self._drained or self._uniform() * table_weights[pick] < self._weights[pick]:
+                return pick
+
+    def sample_indices(self, size: int = None) -> Union[int, numpy.ndarray]:
+        """
+        Draw category numbers, with replacement
+
+        :param size: Number of draws (default: draw a single category number)
+        :type size: int, optional
+        :return: A category number, or an array of them if size is given
+        :rtype: Union[int, numpy.ndarray]
+        """
+        self._prepare()
+        if size is None:
+            return self._sample_index()
+        drawn = []
+        needed = size
+        while needed > 0:
+            # draw enough that, on average, the ones kept cover what is still needed
+            batch_size = needed if not self._drained else int(needed * self._table_total / self._total) + 1
+            uniforms = self._random_generator.random(size=batch_size) * len(self._prob)
+            columns = uniforms.astype(numpy.int64)
+            coins = uniforms - columns
+            picks = numpy.where(coins < self._prob[columns], columns, self._alias[columns])
+            if self._drained:
+                kept = (
+                    self._random_generator.random(size=batch_size) * self._table_weights[picks]
+                    < self._weights[picks]
+                )
+                picks = picks[kept]
+            drawn.append(picks[:needed])
+            needed -= len(drawn[-1])
+        return numpy.concatenate(drawn) if len(drawn) != 1 else drawn[0]
+
+    def sample(self, size: int = None) -> Union[Any, List]:
+        """
+        Draw items, with replacement
+
+        :param size: Number of draws (default: draw a single item)
+        :type size: int, optional
+        :return: An item, or a list of items if size is given (category numbers if the sampler has no items)
+        :rtype: Union[object, list]
+        """
+        indices = self.sample_indices(size=size)
+        if size is None:
+            return indices if self._items is None else self._items[indices]
+        if self._items is None:
+            return indices.tolist()
+        return [self._items[index] for index in indices]
@@ -0,0 +1,156 @@
+import codecs
+import json
+from types import GeneratorType
+from typing import Any, Iterable, Iterator, Tuple
+
+_WHITESPACE = " \t\n\r"
+_TERMINATORS = _WHITESPACE + ",:]}"
+
+
+class JSONStreamReader:
+    def __init__(self, chunks: Iterable[bytes], compact_after: int = 65536):
+        """
+        Incrementally parse a JSON document from chunks of bytes, holding only a small buffer in memory
+
+        :param chunks: Chunks of the UTF-8 encoded JSON document (ex. requests.Response.iter_content())
+        :type chunks: Iterable[bytes]
+        :param compact_after: Drop already-parsed text from the buffer once it reaches this many characters
+        :type compact_after: int, optional
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._compact_after = compact_after
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    def _read_more(self) -> bool:
+        if self._exhausted:
+            return False
+        if self._position > self._compact_after:
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            self._buffer += self._decoder.decode(b"", final=True)
+            return True
+        self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        # skip whitespace and return the next character without consuming it ("" at the end of the document)
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ""
+
+    def _expect(self, characters: str) -> str:
+        character = self._peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError(
+                f"Expected one of {characters!r}", self._buffer, self._position
+            )
+        self._position += 1
+        return character
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+                # a number cut off by the end of a chunk (ex. "2." of "2.5") still decodes, so only
+                # trust a value once the character after it shows it is complete
+                if self._exhausted or (end < len(self._buffer) and self._buffer[end] in _TERMINATORS):
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._exhausted:
+                    raise
+            self._read_more()
+
+    def iter_array(self) -> Iterator[Any]:
+        """
+        Yield the items of the JSON array at the current position, one at a time
+
+        :return: Iterator of decoded items
+        :rtype: Iterator[Any]
+        """
+        self._expect("[")
+        if self._peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def iter_object(
+            self, stream_keys: Iterable[str] = None, stream_arrays: bool = False
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield the members of the JSON object at the current position
+
+        Array members named in stream_keys (or every array member, if stream_arrays) are yielded as an iterator
+        over their items instead of as a list. Any items not consumed are skipped when iteration continues.
+
+        :param stream_keys: Names of array members to stream item by item
+        :type stream_keys: Iterable[str], optional
+        :param stream_arrays: Stream every array member item by item
+        :type stream_arrays: bool, optional
+        :return: Iterator of (key, value) tuples
+        :rtype: Iterator[Tuple[str, Any]]
+        """
+        stream_keys = set(stream_keys or [])
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if (stream_arrays or key in stream_keys) and self._peek() == "[":
+                items = self.iter_array()
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def value(self) -> Any:
+        """
+        Decode the whole JSON value at the current position
+
+        :return: Decoded value
+        :rtype: Any
+        """
+        return self._value()
+
+
+def load(chunks: Iterable[bytes]) -> Any:
+    """
+    Decode a JSON document from chunks of bytes without first joining the whole body into one string
+
+    :param chunks: Chunks of the UTF-8 encoded JSON document
+    :type chunks: Iterable[bytes]
+    :return: Decoded JSON data
+    :rtype: Any
+    """
+    reader = JSONStreamReader(chunks=chunks)
+    character = reader._peek()
+    if character == "{":
+        # decode member by member and array item by item, so only a small piece of text is buffered at a time
+        return {
+            key: (list(value) if isinstance(value, GeneratorType) else value)
+            for key, value in reader.iter_object(stream_arrays=True)
+        }
+    if character == "[":
+        return list(reader.iter_array())
+    return reader.value()
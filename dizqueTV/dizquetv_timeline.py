@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Tuple, Union
+
+import numpy
+
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def to_utc(moment: datetime) -> datetime:
+    """
+    Convert a datetime.datetime to a naive UTC datetime.datetime, as used for channel start times
+    Naive datetimes are assumed to already be in UTC.
+
+    :param moment: datetime.datetime object
+    :type moment: datetime.datetime
+    :return: Naive datetime.datetime object in UTC
+    :rtype: datetime.datetime
+    """
+    if moment.tzinfo:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+class ScheduledProgram:
+    __slots__ = ("program", "index", "start", "stop")
+
+    def __init__(self, program: Any, index: int, start: datetime, stop: datetime):
+        """
+        A program airing at a specific time on a channel
+
+        :param program: Program object airing
+        :type program: Program
+        :param index: Position of the program in the channel's lineup
+        :type index: int
+        :param start: When the program starts (UTC)
+        :type start: datetime.datetime
+        :param stop: When the program ends (UTC)
+        :type stop: datetime.datetime
+        """
+        self.program = program
+        self.index = index
+        self.start = start
+        self.stop = stop
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.program}, {self.start:%Y-%m-%d %H:%M:%S})"
+
+    def elapsed(self, at: datetime) -> timedelta:
+        """
+        Get how far into the program a moment is
+
+        :param at: datetime.datetime object (naive datetimes are assumed to be UTC)
+        :type at: datetime.datetime
+        :return: datetime.timedelta since the program started
+        :rtype: datetime.timedelta
+        """
+        return to_utc(at) - self.start
+
+
+class TimelineIndex:
+    def __init__(self, start_time: datetime, durations: Iterable[int], loop: bool = True):
+        """
+        Prefix sums of program durations, to find what airs at any time with a binary search
+
+        :param start_time: When the first program first aired (naive datetimes are assumed to be UTC)
+        :type start_time: datetime.datetime
+        :param durations: Duration of each program, in milliseconds
+        :type durations: Iterable[int]
+        :param loop: Whether the lineup repeats once it ends, as dizqueTV channels do
+        :type loop: bool, optional
+        """
+        self.start_time = to_utc(start_time)
+        durations = numpy.asarray(durations, dtype=numpy.int64)
+        self.durations = durations
+        # offsets[i] is when program i starts, offsets[i + 1] when it ends, relative to the start of the lineup
+        self.offsets = numpy.concatenate(([0], numpy.cumsum(durations)))
+        self.total_duration = int(self.offsets[-1])
+        self.loop = loop
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(programs={len(self.durations)}, total_duration={self.total_duration})"
+
+    def __len__(self):
+        return len(self.durations)
+
+    def elapsed_milliseconds(self, at: datetime) -> int:
+        """
+        Get the milliseconds between the start of the timeline and a moment
+
+        :param at: datetime.datetime object (naive datetimes are assumed to be UTC)
+        :type at: datetime.datetime
+        :return: Milliseconds since the start (negative if before it)
+        :rtype: int
+        """
+        return (to_utc(at) - self.start_time) // _MILLISECOND
+
+    def time_at(self, elapsed: int) -> datetime:
+        """
+        Get the moment a number of milliseconds after the start of the timeline
+
+        :param elapsed: Milliseconds since the start
+        :type elapsed: int
+        :return: datetime.datetime object (UTC)
+        :rtype: datetime.datetime
+        """
+        return self.start_time + timedelta(milliseconds=int(elapsed))
+
+    def locate(self, elapsed: int) -> Union[Tuple[int, int], None]:
+        """
+        Find the program airing a number of milliseconds after the start of the timeline
+
+        :param elapsed: Milliseconds since the start
+        :type elapsed: int
+        :return: (program index, milliseconds after the start that the program began), or None if nothing airs
+        :rtype: Union[Tuple[int, int], None]
+        """
+        if elapsed < 0 or not self.total_duration:
+            return None
+        cycle_start = 0
+        if self.loop:
+            cycle_start = elapsed - elapsed % self.total_duration
+        elif elapsed >= self.total_duration:
+            return None
+        # the first program ending after this moment (zero-length programs end as they start, so never match)
+        index = int(numpy.searchsorted(self.offsets[1:], elapsed - cycle_start, side="right"))
+        return index, cycle_start + int(self.offsets[index])
+
+    def window(self, start: int, end: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Find every program airing in part of a time range
+
+        :param start: Start of the range, in milliseconds since the start of the timeline
+        :type start: int
+        :param end: End of the range (exclusive), in milliseconds since the start of the timeline
+        :type end: int
+        :return: Array of program indexes, array of when each began (milliseconds after the start)
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        start = max(start, 0)
+        if end <= start or not self.total_duration:
+            return numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.int64)
+        if not self.loop:
+            end = min(end, self.total_duration)
+        ends = self.offsets[1:]
+        starts = self.offsets[:-1]
+        indexes = []
+        begins = []
+        cycle_start = start - start % self.total_duration
+        while cycle_start < end:
+            first = numpy.searchsorted(ends, start - cycle_start, side="right")
+            last = numpy.searchsorted(starts, end - cycle_start, side="left")
+            cycle_indexes = numpy.arange(first, last)
+            cycle_indexes = cycle_indexes[self.durations[cycle_indexes] > 0]
+            indexes.append(cycle_indexes)
+            begins.append(starts[cycle_indexes] + cycle_start)
+            cycle_start += self.total_duration
+        return numpy.concatenate(indexes), numpy.concatenate(begins)
@@ -0,0 +1,302 @@
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from dizqueTV.dizquetv_parallel import ParallelExecutor
+from dizqueTV.dizquetv_timeline import to_utc
+
+XMLTV_TIME_FORMAT = "%Y%m%d%H%M%S +0000"
+
+# each rendering task covers one channel for this long, which bounds how much XML is held in memory at once
+RENDER_WINDOW = timedelta(hours=24)
+
+
+class XMLTVProgramme:
+    __slots__ = (
+        "channel", "start", "stop", "title", "sub_title", "desc", "date", "icon", "rating", "episode_numbers"
+    )
+
+    def __init__(self, element: ElementTree.Element):
+        """
+        Lightweight record of a <programme> in an XMLTV guide
+
+        :param element: <programme> element
+        :type element: xml.etree.ElementTree.Element
+        """
+        self.channel = element.get("channel")
+        self.start = parse_xmltv_time(element.get("start"))
+        self.stop = parse_xmltv_time(element.get("stop"))
+        self.title = element.findtext("title")
+        self.sub_title = element.findtext("sub-title")
+        self.desc = element.findtext("desc")
+        self.date = element.findtext("date")
+        icon = element.find("icon")
+        self.icon = icon.get("src") if icon is not None else None
+        self.rating = element.findtext("rating/value")
+        self.episode_numbers = {
+            episode_num.get("system"): episode_num.text for episode_num in element.iterfind("episode-num")
+        }
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.channel}: {self.title})"
+
+
+def parse_xmltv_time(time_string: str) -> Union[datetime, None]:
+    """
+    Convert an XMLTV time (ex. '20210101000000 +0000') to a naive UTC datetime.datetime
+
+    :param time_string: XMLTV time
+    :type time_string: str
+    :return: datetime.datetime object, or None if there is no time
+    :rtype: datetime.datetime
+    """
+    if not time_string:
+        return None
+    # sliced by hand rather than with strptime, which is several times slower on a large guide
+    digits, _, offset = time_string.partition(" ")
+    moment = datetime(
+        int(digits[0:4]),
+        int(digits[4:6] or 1),
+        int(digits[6:8] or 1),
+        int(digits[8:10] or 0),
+        int(digits[10:12] or 0),
+        int(digits[12:14] or 0),
+    )
+    offset = offset.strip()
+    if offset and offset[1:] != "0000":
+        shift = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+        moment = moment - shift if offset[0] == "+" else moment + shift
+    return moment
+
+
+def iter_programmes(
+        chunks: Iterable[bytes],
+        channel_ids: Iterable[str] = None,
+        from_date: datetime = None,
+        to_date: datetime = None,
+) -> Iterator[XMLTVProgramme]:
+    """
+    Parse an XMLTV document from chunks of bytes, yielding its programmes as they are parsed
+    Parsed elements are discarded as soon as they are read, so memory use does not grow with the document.
+
+    :param chunks: Chunks of the XMLTV document (ex. requests.Response.iter_content())
+    :type chunks: Iterable[bytes]
+    :param channel_ids: Only yield programmes on these channels (XMLTV channel ids, the channel numbers for dizqueTV)
+    :type channel_ids: Iterable[str], optional
+    :param from_date: Only yield programmes still airing at or after this time. Naive datetimes are assumed to be UTC.
+    :type from_date: datetime.datetime, optional
+    :param to_date: Only yield programmes starting before this time. Naive datetimes are assumed to be UTC.
+    :type to_date: datetime.datetime, optional
+    :return: Iterator of XMLTVProgramme objects
+    :rtype: Iterator[XMLTVProgramme]
+    """
+    channel_ids = {str(channel_id) for channel_id in channel_ids} if channel_ids is not None else None
+    from_date = to_utc(from_date) if from_date else None
+    to_date = to_utc(to_date) if to_date else None
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    root = None
+    depth = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if element.tag == "programme" and (channel_ids is None or element.get("channel") in channel_ids):
+                programme = XMLTVProgramme(element=element)
+                if (not from_date or not programme.stop or programme.stop > from_date) and (
+                        not to_date or not programme.start or programme.start < to_date
+                ):
+                    yield programme
+            # drop every finished top-level element (channels and programmes) from the tree
+            root.clear()
+    parser.close()
+
+
+def _airings(
+        channel, channels: Dict, from_date: datetime, to_date: datetime, path: frozenset
+) -> Iterator[Tuple[datetime, datetime, dict, object]]:
+    """
+    Yield (start, stop, program data, channel airing it) for every program on a channel in a time range
+    Redirects are replaced with whatever their target channel airs during the redirect.
+    """
+    timeline = channel.timeline
+    rows = channel.program_table.rows
+    indexes, begins = timeline.window(
+        start=timeline.elapsed_milliseconds(at=from_date),
+        end=timeline.elapsed_milliseconds(at=to_date),
+    )
+    for index, begin in zip(indexes.tolist(), begins.tolist()):
+        start = timeline.time_at(elapsed=begin)
+        stop = timeline.time_at(elapsed=begin + int(timeline.durations[index]))
+        row = rows[index]
+        target = channels.get(row.get("channel")) if row.get("type") == "redirect" else None
+        if target is None or target.number in path:
+            yield start, stop, row, channel
+            continue
+        for airing_start, airing_stop, airing_row, airing_channel in _airings(
+                channel=target,
+                channels=channels,
+                from_date=max(start, from_date),
+                to_date=min(stop, to_date),
+                path=path | {target.number},
+        ):
+            yield max(airing_start, start), min(airing_stop, stop), airing_row, airing_channel
+
+
+def _render_channel(channel) -> str:
+    icon = channel.json.get("icon")
+    return "".join(
+        [
+            f"<channel id={quoteattr(str(channel.number))}>",
+            f"<display-name>{escape(str(channel.name))}</display-name>",
+            f"<icon src={quoteattr(icon)}/>" if icon else "",
+            "</channel>\n",
+        ]
+    )
+
+
+def _render_programme(
+        channel_number: int, start: datetime, stop: datetime, row: dict, airing_channel
+) -> str:
+    parts = [
+        f'<programme start="{start.strftime(XMLTV_TIME_FORMAT)}" '
+        f'stop="{stop.strftime(XMLTV_TIME_FORMAT)}" channel={quoteattr(str(channel_number))}>'
+    ]
+    if row.get("isOffline") or row.get("type") == "redirect":
+        # flex time (or a redirect that could not be followed) shows as the channel itself
+        parts.append(f'<title lang="en">{escape(str(airing_channel.name))}</title>')
+    elif row.get("type") == "episode":
+        parts.append(f'<title lang="en">{escape(str(row.get("showTitle")))}</title>')
+        if row.get("title"):
+            parts.append(f'<sub-title lang="en">{escape(row["title"])}</sub-title>')
+    else:
+        parts.append(f'<title lang="en">{escape(str(row.get("title")))}</title>')
+    if not row.get("isOffline"):
+        if row.get("summary"):
+            parts.append(f'<desc lang="en">{escape(row["summary"])}</desc>')
+        if row.get("date"):
+            parts.append(f"<date>{escape(row['date'].replace('-', ''))}</date>")
+        if row.get("type") == "episode" and row.get("season") and row.get("episode"):
+            season, episode = row["season"], row["episode"]
+            parts.append(f'<episode-num system="onscreen">S{season:02d}E{episode:02d}</episode-num>')
+            parts.append(f'<episode-num system="xmltv_ns">{season - 1}.{episode - 1}.0/1</episode-num>')
+        if row.get("icon"):
+            parts.append(f"<icon src={quoteattr(row['icon'])}/>")
+        if row.get("rating"):
+            parts.append(f'<rating><value>{escape(row["rating"])}</value></rating>')
+    parts.append("</programme>\n")
+    return "".join(parts)
+
+
+def _render_window(task: Tuple, channels: Dict) -> Tuple[bytes, int]:
+    channel, from_date, to_date, first_window = task
+    programmes = [
+        _render_programme(
+            channel_number=channel.number, start=start, stop=stop, row=row, airing_channel=airing_channel
+        )
+        for start, stop, row, airing_channel in _airings(
+            channel=channel,
+            channels=channels,
+            from_date=from_date,
+            to_date=to_date,
+            path=frozenset([channel.number]),
+        )
+        # a program straddling two windows belongs to the one it starts in
+        if first_window or start >= from_date
+    ]
+    return "".join(programmes).encode("utf-8"), len(programmes)
+
+
+def _build_timeline(channel):
+    return channel.timeline
+
+
+def write_xmltv(
+        channels: Iterable,
+        output: Union[str, BinaryIO],
+        hours: int = 72,
+        from_date: datetime = None,
+        channel_numbers: List[int] = None,
+        executor: ParallelExecutor = None,
+) -> int:
+    """
+    Write an XMLTV guide for channels, worked out locally from their programs and start times
+    The XML is written as it is rendered, a day of one channel at a time, so memory use does not grow with the guide.
+    Redirects are replaced with what their target channel airs.
+
+    :param channels: Channel objects (including any that redirects point to)
+    :type channels: Iterable[Channel]
+    :param output: Path of the file to write, or a binary file-like object (ex. socket.makefile("wb"))
+    :type output: Union[str, BinaryIO]
+    :param hours: How many hours of programming to include
+    :type hours: int, optional
+    :param from_date: Start of the guide (default: now). Naive datetimes are assumed to be UTC.
+    :type from_date: datetime.datetime, optional
+    :param channel_numbers: Numbers of the channels to include (default: all channels)
+    :type channel_numbers: List[int], optional
+    :param executor: ParallelExecutor to render channels with (default: a temporary one)
+    :type executor: ParallelExecutor, optional
+    :return: Number of programmes written
+    :rtype: int
+    """
+    channels = list(channels)
+    channels_by_number = {channel.number: channel for channel in channels}
+    if channel_numbers is not None:
+        channels = [channel for channel in channels if channel.number in channel_numbers]
+    from_date = to_utc(from_date or datetime.utcnow())
+    to_date = from_date + timedelta(hours=hours)
+
+    temporary_executor = executor is None
+    if temporary_executor:
+        executor = ParallelExecutor()
+    close_output = isinstance(output, str)
+    if close_output:
+        output = open(output, "wb")
+    try:
+        # build every channel's timeline up front, including redirect targets, rather than racing to build them
+        for task in executor.map(
+                func=_build_timeline, elements=channels_by_number.values(), element_param_name="channel"
+        ):
+            if task.error:
+                raise task.error
+
+        output.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="dizqueTV-python">\n')
+        for channel in channels:
+            output.write(_render_channel(channel=channel).encode("utf-8"))
+
+        tasks = []
+        for channel in channels:
+            window_start = from_date
+            while window_start < to_date:
+                window_end = min(window_start + RENDER_WINDOW, to_date)
+                tasks.append((channel, window_start, window_end, window_start == from_date))
+                window_start = window_end
+
+        programme_count = 0
+        # render a bounded number of windows at a time, writing them in order as they finish
+        for batch_start in range(0, len(tasks), executor.max_workers):
+            for task in executor.imap(
+                    func=_render_window,
+                    elements=tasks[batch_start:batch_start + executor.max_workers],
+                    element_param_name="task",
+                    channels=channels_by_number,
+            ):
+                if task.error:
+                    raise task.error
+                xml, count = task.result
+                output.write(xml)
+                programme_count += count
+        output.write(b"</tv>\n")
+        return programme_count
+    finally:
+        if close_output:
+            output.close()
+        if temporary_executor:
+            executor.shutdown()
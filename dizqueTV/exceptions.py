@@ -78,3 +78,13 @@ class ItemCreationError(IncludeFunctionName):
 class ChannelCreationError(IncludeFunctionName):
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class ChannelConflictError(IncludeFunctionName):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class RedirectCycleError(IncludeFunctionName):
+    def __init__(self, message: str):
+        super().__init__(message)
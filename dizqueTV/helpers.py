@@ -1,18 +1,22 @@
 import collections
+import hashlib
 import json
 import os
 import random
-from concurrent.futures import ALL_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import List, Tuple, Union
 
+import numpy
 import numpy.random as numpy_random
 from plexapi.audio import Track
 from plexapi.server import PlexServer as PServer
 from plexapi.video import Episode, Movie, Video
 
+import dizqueTV.dizquetv_blocks as blocks
 import dizqueTV.dizquetv_requests as requests
-from dizqueTV.exceptions import MissingSettingsError
+from dizqueTV.dizquetv_program_table import ProgramTable
+from dizqueTV.dizquetv_sampling import WeightedSampler
+from dizqueTV.exceptions import GeneralException, MissingSettingsError
 from dizqueTV.models.media import FillerItem, Program, Redirect
 
 _access_tokens = {}
@@ -20,40 +24,19 @@ _uris = {}
 
 
 # Internal Helpers
-def _multithread(
-    func, elements: List, element_param_name: str, thread_count: int = None, **kwargs
-) -> List:
-    """
-    Multithread a function for elements in a list
-
-    :param func: Function to be multithreaded
-    :type func: function
-    :param elements: List of elements to be multithreaded
-    :type elements: list
-    :param element_param_name: Name of the parameter to be passed to the function
-    :type element_param_name: str
-    :param thread_count: Number of threads to use
-    :type thread_count: int, optional
-    :param kwargs: Keyword arguments to be passed to the function
-    :type kwargs: dict, optional
-    :return: List of results from the function
-    :rtype: list
+def _channel_fingerprint(channel_data: dict) -> str:
     """
-    # Thread count is the smallest of the following:
-    # - Number of elements in the list
-    # - Number of CPU cores * 8 (arbitrary)
-    # Or override with thread_count
-    thread_count = thread_count or min(len(element_param_name), (os.cpu_count() * 8))
-    thread_list = []
-    pool = ThreadPoolExecutor(thread_count)
-
-    for element in elements:
-        temp_kwargs = kwargs.copy()
-        temp_kwargs[element_param_name] = element
-        thread_list.append(pool.submit(func, **temp_kwargs))
+    Hash a channel's settings (everything except its programs) to detect changes made elsewhere
 
-    wait(thread_list, return_when=ALL_COMPLETED)
-    return [t.result() for t in thread_list]
+    :param channel_data: Channel JSON data (with or without programs)
+    :type channel_data: dict
+    :return: Fingerprint of the channel settings
+    :rtype: str
+    """
+    settings = {key: value for key, value in channel_data.items() if key != "programs"}
+    return hashlib.sha1(
+        json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
 
 
 def _combine_settings_add_new(
@@ -411,6 +394,20 @@ def _make_server_dict_from_plex_server(
     return data
 
 
+def _as_program_table(media_items: Union[List, ProgramTable]) -> ProgramTable:
+    """
+    Get a ProgramTable over a list of media items (or the table itself, if already one)
+
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
+    :return: ProgramTable
+    :rtype: ProgramTable
+    """
+    if isinstance(media_items, ProgramTable):
+        return media_items
+    return ProgramTable.from_media_items(media_items=media_items)
+
+
 def _separate_with_and_without(items: List, attribute_name: str) -> Tuple[List, List]:
     """
     Split a list of items into those with a specific attribute and those without
@@ -859,6 +856,27 @@ def get_needed_flex_time(
     :return: int of milliseconds needed to stretch item
     :rtype: int
     """
+    return int(
+        get_needed_flex_times(
+            item_times_milliseconds=[item_time_milliseconds],
+            allowed_minutes_time_frame=allowed_minutes_time_frame,
+        )[0]
+    )
+
+
+def get_needed_flex_times(
+    item_times_milliseconds: Union[numpy.ndarray, List[int]], allowed_minutes_time_frame: int
+) -> numpy.ndarray:
+    """
+    Get how many milliseconds needed to stretch each of several items' runtimes to a specific interval length
+
+    :param item_times_milliseconds: how long each item is in milliseconds
+    :type item_times_milliseconds: Union[numpy.ndarray, List[int]]
+    :param allowed_minutes_time_frame: how long an interval the items are supposed to be, in minutes
+    :type allowed_minutes_time_frame: int
+    :return: Array of milliseconds needed to stretch each item
+    :rtype: numpy.ndarray
+    """
     minute_start = 30 if datetime.utcnow().minute >= 30 else 0
 
     allowed_milliseconds_time_frame = (
@@ -866,12 +884,8 @@ def get_needed_flex_time(
         * 60
         * 1000
     )
-    remainder = allowed_milliseconds_time_frame - (
-        item_time_milliseconds % allowed_milliseconds_time_frame
-    )
-    if remainder == allowed_milliseconds_time_frame:
-        return 0
-    return remainder
+    # an item already filling a whole number of intervals needs no padding
+    return -numpy.asarray(item_times_milliseconds, dtype=numpy.int64) % allowed_milliseconds_time_frame
 
 
 def get_plex_indirect_uri(
@@ -971,6 +985,7 @@ def random_choice(items: List):
 def weighted_choice_by_probabilities(items: List, probabilities: List[float]):
     """
     Get a random item from a weighted list
+    To draw repeatedly from the same weights, use a dizqueTV.dizquetv_sampling.WeightedSampler instead
 
     :param items: list of items
     :type items: list
@@ -979,8 +994,9 @@ def weighted_choice_by_probabilities(items: List, probabilities: List[float]):
     :return: random item
     :rtype: object
     """
-    choice_list = numpy_random.choice(a=items, size=1, p=probabilities)
-    return choice_list[0]
+    # draw an index rather than passing the items, so numpy does not copy them into an array
+    # the draw still comes from numpy.random's global state, so numpy.random.seed() keeps it reproducible
+    return items[numpy_random.choice(len(items), p=probabilities)]
 
 
 def weighted_choice_by_sizes_lists(items: List, sizes: List[int]):
@@ -994,11 +1010,8 @@ def weighted_choice_by_sizes_lists(items: List, sizes: List[int]):
     :return: random item
     :rtype: object
     """
-    total_items = sum(sizes)
-    percentages = []
-    for size in sizes:
-        percentages.append(size / total_items)
-    return weighted_choice_by_probabilities(items=items, probabilities=percentages)
+    sizes = numpy.asarray(sizes, dtype=numpy.float64)
+    return weighted_choice_by_probabilities(items=items, probabilities=sizes / sizes.sum())
 
 
 def weighted_choice_by_sizes_dict(items_and_sizes: dict):
@@ -1010,14 +1023,9 @@ def weighted_choice_by_sizes_dict(items_and_sizes: dict):
     :return: random item
     :rtype: object
     """
-    total_items = sum(items_and_sizes.values())
-    percentages = []
-    for size in items_and_sizes.values():
-        percentages.append(size / total_items)
-    items = []
-    for item in items_and_sizes.keys():
-        items.append(item)
-    return weighted_choice_by_probabilities(items=items, probabilities=percentages)
+    return weighted_choice_by_sizes_lists(
+        items=list(items_and_sizes.keys()), sizes=list(items_and_sizes.values())
+    )
 
 
 def shuffle(items: List) -> bool:
@@ -1091,119 +1099,90 @@ def remove_duplicates_by_attribute(items: List, attribute_name: str) -> List:
 
 
 def sort_media_alphabetically(
-    media_items: List[Union[Program, FillerItem]]
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media items alphabetically.
     Note: Shows will be grouped and sorted by series title, but episodes may be out of order.
     Items without titles will be appended at the end of the list
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerItem]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerItem]]
     """
-    items_with_titles, items_without_titles = _separate_with_and_without(
-        items=media_items, attribute_name="title"
-    )
-    sorted_items = sorted(
-        items_with_titles,
-        key=lambda x: (x.showTitle if x.type == "episode" else x.title),
-    )
-    sorted_items.extend(items_without_titles)
-    return sorted_items
+    table = _as_program_table(media_items=media_items)
+    return table.materialize(table.alphabetical_order())
 
 
 def sort_media_by_release_date(
-    media_items: List[Union[Program, FillerItem]]
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media items by release date.
     Note: Items without release dates are appended (alphabetically) at the end of the list
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerItem]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerItem]]
     """
-    items_with_dates, items_without_dates = _separate_with_and_without(
-        items=media_items, attribute_name="date"
-    )
-    sorted_items = sorted(
-        items_with_dates, key=lambda x: datetime.strptime(x.date, "%Y-%m-%d")
+    table = _as_program_table(media_items=media_items)
+    with_dates = numpy.flatnonzero(table.dates.present)
+    without_dates = numpy.flatnonzero(~table.dates.present)
+    # parse each distinct date once, rather than once per item
+    date_ranks = table.dates.map_values(
+        func=lambda date: datetime.strptime(date, "%Y-%m-%d").toordinal(),
+        missing=0,
+        dtype=numpy.int64,
     )
-    sorted_items.extend(sort_media_alphabetically(media_items=items_without_dates))
-    return sorted_items
-
-
-def _sort_shows_by_season_order(shows_dict: dict) -> List[Union[Program, FillerItem]]:
-    """
-    Sort a show dictionary by series-season-episode.
-    Series are ordered alphabetically
-
-    :param shows_dict: Series-season-episode dictionary
-    :type shows_dict: dict
-    :return: List of Program and FillerItem objects
-    :rtype: List[Union[Program, FillerList]]
-    """
-    sorted_list = []
-    sorted_shows = sorted(shows_dict.items(), key=lambda show_name: show_name)
-    for show in sorted_shows:
-        sorted_seasons = sorted(
-            show[1].items(), key=lambda season_number: season_number
+    order = numpy.concatenate(
+        (
+            with_dates[numpy.argsort(date_ranks[with_dates], kind="stable")],
+            table.alphabetical_order(indices=without_dates),
         )
-        for season in sorted_seasons:
-            sorted_episodes = sorted(
-                season[1].items(), key=lambda episode_number: episode_number
-            )
-            for item in sorted_episodes:
-                sorted_list.append(item[1])
-    return sorted_list
+    )
+    return table.materialize(order)
 
 
 def sort_media_by_season_order(
-    media_items: List[Union[Program, FillerItem]]
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media items by season order.
     Note: Series are ordered alphabetically, movies appended (alphabetically) at the end of the list.
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerItem]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerList]]
     """
-    non_shows = get_non_shows(media_items=media_items)
-    show_dict = make_show_dict(media_items=media_items)
-    sorted_shows = _sort_shows_by_season_order(shows_dict=show_dict)
-    sorted_movies = sort_media_alphabetically(media_items=non_shows)
-    sorted_all = sorted_shows + sorted_movies
-    return sorted_all
+    table = _as_program_table(media_items=media_items)
+    non_shows = numpy.flatnonzero(table.non_show_mask())
+    order = numpy.concatenate(
+        (table.show_index().episodes, table.alphabetical_order(indices=non_shows))
+    )
+    return table.materialize(order)
 
 
 def sort_media_by_duration(
-    media_items: List[Union[Program, FillerItem]]
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media by duration.
     Note: Automatically removes redirect items
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerList]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerList]]
     """
-    non_redirects = [
-        item
-        for item in media_items
-        if (
-            _object_has_attribute(obj=item, attribute_name="duration")
-            and _object_has_attribute(obj=item, attribute_name="type")
-            and item.type != "redirect"
-        )
-    ]
-    sorted_media = sorted(non_redirects, key=lambda x: x.duration)
-    return sorted_media
+    table = _as_program_table(media_items=media_items)
+    non_redirects = numpy.flatnonzero(
+        table.types.present & ~table.types.equals("redirect")
+    )
+    order = non_redirects[numpy.argsort(table.durations[non_redirects], kind="stable")]
+    return table.materialize(order)
 
 
 def sort_media_randomly(
@@ -1221,166 +1200,231 @@ def sort_media_randomly(
     return media_items
 
 
+def _pick_shows_cyclically(
+    episode_counts: numpy.ndarray, random_generator: numpy.random.Generator
+) -> numpy.ndarray:
+    """
+    Pick the show for each episode slot, each time uniformly among the shows with episodes left
+
+    Picks are drawn in batches. A batch is kept up to the pick that uses up a show's last episode, since the
+    shows to pick from change after that.
+
+    :param episode_counts: Number of episodes of each show
+    :type episode_counts: numpy.ndarray
+    :param random_generator: Random number generator
+    :type random_generator: numpy.random.Generator
+    :return: Show number for every episode slot
+    :rtype: numpy.ndarray
+    """
+    remaining = numpy.array(episode_counts, dtype=numpy.int64)
+    sampler = WeightedSampler(weights=remaining > 0, random_generator=random_generator)
+    picked = []
+    while sampler.total > 0:
+        left = remaining[remaining > 0]
+        # no show can run out before its remaining count of picks, so a batch this size is rarely wasted
+        batch_size = int(min(left.sum(), left.min() * len(left)))
+        picks = sampler.sample_indices(size=batch_size)
+        # how many times each pick's show was picked before it in this batch
+        order = numpy.argsort(picks, kind="stable")
+        group_starts = numpy.searchsorted(picks[order], picks[order], side="left")
+        ranks = numpy.empty(batch_size, dtype=numpy.int64)
+        ranks[order] = numpy.arange(batch_size) - group_starts
+        used_up = numpy.flatnonzero(ranks + 1 == remaining[picks])
+        kept = picks[: used_up[0] + 1 if len(used_up) else batch_size]
+        picked.append(kept)
+        remaining -= numpy.bincount(kept, minlength=len(remaining))
+        for show in numpy.unique(kept[remaining[kept] == 0]):
+            sampler.update(index=show, weight=0)
+    if not picked:
+        return numpy.empty(0, dtype=numpy.int64)
+    return numpy.concatenate(picked)
+
+
 def sort_media_cyclical_shuffle(
-    media_items: List[Union[Program, FillerItem]]
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable],
+    random_generator: numpy.random.Generator = None,
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media cyclically.
+    Each show plays in season-episode order from a random starting episode, wrapping around.
+    Each slot is a show or a non-show with odds matching how many of each are left,
+    and show slots pick uniformly among the shows with episodes left.
     Note: Automatically removes FillerItem objects
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerList]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
+    :param random_generator: numpy.random.Generator to draw from, for reproducible results (default: a new one)
+    :type random_generator: numpy.random.Generator, optional
     :return: List of Program objects, FillerItem objects removed
     :rtype: List[Union[Program, FillerList]]
     """
-    total_item_count = len(media_items)
-    non_shows = get_non_shows(media_items=media_items)
-    shuffle(items=non_shows)
-    show_dict = make_show_dict(media_items=media_items)
-    show_dict = order_show_dict(show_dict=show_dict)
-    total_episode_count = 0
-    show_list = {}
-    index = 0
-    index_list = []
-    for show_name, seasons in show_dict.items():
-        season_episode_order = []
-        for season_number, episodes in seasons.items():
-            for _, episode in episodes.items():
-                season_episode_order.append(episode)
-                total_episode_count += 1
-        show_cyclical_order = rotate_items(items=season_episode_order)
-        show_list[index] = show_cyclical_order
-        index_list.append(index)
-        index += 1
-    show_list["remaining_episode_count"] = total_episode_count
-    final_list = []
-    while len(final_list) != total_item_count:
-        categories_and_sizes = {
-            "show": show_list["remaining_episode_count"],
-            "non_show": len(non_shows),
-        }
-        if "non_show" in categories_and_sizes.keys() and len(non_shows) == 0:
-            del categories_and_sizes["non_show"]
-        if (
-            "show" in categories_and_sizes.keys()
-            and show_list["remaining_episode_count"] == 0
-        ):
-            del categories_and_sizes["show"]
-        if not categories_and_sizes:
-            break
-        show_or_non_show = weighted_choice_by_sizes_dict(
-            items_and_sizes=categories_and_sizes
-        )
-        if show_or_non_show == "show":
-            random_index = random_choice(items=index_list)  # failure 1
-            new_item = show_list[random_index].pop(0)
-            show_list["remaining_episode_count"] -= 1
-            final_list.append(new_item)
-            if len(show_list[random_index]) == 0:
-                index_list.remove(random_index)
-        else:
-            new_item = non_shows.pop(0)
-            final_list.append(new_item)
-    return final_list
+    if random_generator is None:
+        random_generator = numpy_random.default_rng()
+    table = _as_program_table(media_items=media_items)
+    non_shows = numpy.flatnonzero(table.non_show_mask())
+    show_index = table.show_index(alphabetical=False)
+    episodes, run_starts = show_index.episodes, show_index.show_starts
+    episode_counts = show_index.show_episode_counts
+    rotations = random_generator.integers(0, numpy.maximum(episode_counts, 1))
+
+    shows = _pick_shows_cyclically(episode_counts=episode_counts, random_generator=random_generator)
+    # the nth time a show is picked it airs its nth episode after the rotation
+    order = numpy.argsort(shows, kind="stable")
+    picks_so_far = numpy.empty(len(shows), dtype=numpy.int64)
+    # every show is picked once per episode, so its picks start where its episodes do once sorted
+    picks_so_far[order] = numpy.arange(len(shows)) - run_starts[shows[order]]
+    show_episodes = episodes[
+        run_starts[shows] + (picks_so_far - rotations[shows]) % episode_counts[shows]
+    ]
+
+    # which slots are shows: every arrangement of show and non-show slots is equally likely
+    is_show = random_generator.permutation(
+        numpy.repeat([True, False], [len(show_episodes), len(non_shows)])
+    )
+    final_order = numpy.empty(len(is_show), dtype=numpy.int64)
+    final_order[is_show] = show_episodes
+    final_order[~is_show] = random_generator.permutation(non_shows)
+    return table.materialize(final_order[: len(table)])
+
+
+def _pick_show_blocks(
+    episode_counts: numpy.ndarray, block_length: int, random_generator: numpy.random.Generator
+) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Pick random blocks of episodes, each from a show chosen uniformly among the shows with episodes left
+    Each block is between 1 and block_length episodes long, cut short if its show runs out.
+
+    Shows and block lengths are drawn in batches. A block drawn for a show that ran out earlier in its batch is
+    dropped, which leaves the other blocks uniform among the shows that still have episodes.
+
+    :param episode_counts: Number of episodes of each show
+    :type episode_counts: numpy.ndarray
+    :param block_length: Longest block, in episodes
+    :type block_length: int
+    :param random_generator: Random number generator
+    :type random_generator: numpy.random.Generator
+    :return: Show number, first episode and episode count of every block
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    episode_counts = numpy.asarray(episode_counts, dtype=numpy.int64)
+    used = numpy.zeros(len(episode_counts), dtype=numpy.int64)
+    sampler = WeightedSampler(weights=episode_counts > 0, random_generator=random_generator)
+    shows, firsts, counts = [], [], []
+    while sampler.total > 0:
+        left = episode_counts - used
+        # every block holds at most block_length episodes, so at least this many blocks are still to come
+        batch_size = max(int(numpy.count_nonzero(left)), -(-int(left.sum()) // block_length))
+        picks = sampler.sample_indices(size=batch_size)
+        lengths = random_generator.integers(1, block_length + 1, size=batch_size)
+        # episodes of each pick's show used before it: in earlier batches, plus by earlier picks in this one
+        order = numpy.argsort(picks, kind="stable")
+        running_lengths = numpy.cumsum(lengths[order])
+        group_starts = numpy.searchsorted(picks[order], picks[order], side="left")
+        before = numpy.empty(batch_size, dtype=numpy.int64)
+        before[order] = running_lengths - lengths[order] - numpy.append(0, running_lengths)[group_starts]
+        before += used[picks]
+        sizes = numpy.clip(episode_counts[picks] - before, 0, lengths)
+        kept = sizes > 0
+        shows.append(picks[kept])
+        firsts.append(before[kept])
+        counts.append(sizes[kept])
+        used += numpy.bincount(picks, weights=sizes, minlength=len(used)).astype(numpy.int64)
+        for show in numpy.unique(picks[used[picks] == episode_counts[picks]]):
+            sampler.update(index=show, weight=0)
+    if not shows:
+        empty = numpy.empty(0, dtype=numpy.int64)
+        return empty, empty, empty
+    return numpy.concatenate(shows), numpy.concatenate(firsts), numpy.concatenate(counts)
 
 
 def sort_media_block_shuffle(
-    media_items: List[Union[Program, FillerItem]],
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable],
     block_length: int = 1,
     randomize: bool = False,
+    random_generator: numpy.random.Generator = None,
 ) -> List[Union[Program, FillerItem]]:
     """
     Sort media with block shuffle.
-    Default: Items are alternated one at a time, alphabetically
+    Default: Shows take turns, in order of first appearance, each playing up to block_length episodes per turn
     Note: Automatically removes FillerItem objects
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerList]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :param block_length: length of each block of programming
     :type block_length: int, optional
     :param randomize: random length (up to block_length) and random order
     :type randomize: bool, optional
+    :param random_generator: numpy.random.Generator to draw from when randomizing (default: a new one)
+    :type random_generator: numpy.random.Generator, optional
     :return: List of Program objects, FillerItem objects removed
     :rtype: List[Union[Program, FillerList]]
     """
-    non_shows = get_non_shows(media_items=media_items)
-    show_dict = make_show_dict(media_items=media_items)
-    ordered_show_dict = order_show_dict(show_dict=show_dict)
-    condensed_show_dict = condense_show_dict(show_dict=ordered_show_dict)
-    final_show_list = []
-    target_length = condensed_show_dict["count"]
+    table = _as_program_table(media_items=media_items)
+    non_shows = numpy.flatnonzero(table.non_show_mask())
+    show_index = table.show_index(alphabetical=False)
+    episodes, run_starts = show_index.episodes, show_index.show_starts
     if randomize:
-        while len(final_show_list) < target_length:
-            random_show_name = random.choice(list(condensed_show_dict["shows"].keys()))
-            for _ in range(0, random.randint(1, block_length)):
-                if len(condensed_show_dict["shows"][random_show_name]["episodes"]) > 0:
-                    final_show_list.append(
-                        condensed_show_dict["shows"][random_show_name]["episodes"].pop(
-                            0
-                        )
-                    )
-                else:
-                    del condensed_show_dict["shows"][random_show_name]
-                    break
+        if random_generator is None:
+            random_generator = numpy_random.default_rng()
+        shows, firsts, counts = _pick_show_blocks(
+            episode_counts=show_index.show_episode_counts,
+            block_length=block_length,
+            random_generator=random_generator,
+        )
+        # lay the blocks end to end: each block is a slice of its show's run of episodes
+        block_ends = numpy.cumsum(counts)
+        show_episodes = episodes[
+            numpy.repeat(run_starts[shows] + firsts - (block_ends - counts), counts)
+            + numpy.arange(len(episodes))
+        ]
     else:
-        while len(final_show_list) < target_length:
-            for show_name, data in condensed_show_dict["shows"].items():
-                for _ in range(0, block_length):
-                    if len(data["episodes"]) > 0:
-                        final_show_list.append(data["episodes"].pop(0))
-                    else:
-                        break
-    final_list = final_show_list + non_shows
-    return final_list
+        positions = show_index.positions
+        # turn by turn, then show by show, then episode by episode
+        show_episodes = episodes[
+            numpy.lexsort((positions, show_index.show_numbers, positions // block_length))
+        ]
+    return table.materialize(numpy.concatenate((show_episodes, non_shows)))
 
 
 def balance_shows(
-    media_items: List[Union[Program, FillerItem]], margin_of_correction: float = 0.1
+    media_items: Union[List[Union[Program, FillerItem]], ProgramTable],
+    margin_of_correction: float = 0.1,
+    target_duration: int = None,
+    target_percentile: float = None,
 ) -> List[Union[Program, FillerItem]]:
     """
     Balance weights of the shows. Movies are untouched.
+    Each show keeps its first episodes (in season-episode order) up to the target length, plus the margin.
+    Shows shorter than the target keep all their episodes.
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerList]]
-    :param margin_of_correction: Percentage over shortest time to use when assessing whether to add a new episode
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
+    :param margin_of_correction: Percentage over the target length to use when assessing whether to add a new episode
     :type margin_of_correction: float, optional
+    :param target_duration: Length to balance every show to, in milliseconds (default: the shortest show's length)
+    :type target_duration: int, optional
+    :param target_percentile: Balance to this percentile (0-100) of show lengths instead (0 is the shortest show)
+    :type target_percentile: float, optional
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerList]]
     """
-    non_shows = get_non_shows(media_items=media_items)
-    show_dict = make_show_dict(media_items=media_items)
-    ordered_show_dict = order_show_dict(show_dict=show_dict)
-    ordered_show_dict_with_durations = add_durations_to_show_dict(
-        show_dict=ordered_show_dict
-    )
-    show_durations = []
-    for show_name in ordered_show_dict_with_durations.keys():
-        show_durations.append(ordered_show_dict_with_durations[show_name]["duration"])
-    shortest_show_length = min(show_durations)
-    margin = 1 + margin_of_correction
-    final_shows = []
-    for show_name, show_data in ordered_show_dict_with_durations.items():
-        show_running_duration = 0
-        continue_with_show = True
-        for season_number, season_data in show_data["seasons"].items():
-            if not continue_with_show:
-                break
-            for episode_number, episode_data in season_data["episodes"].items():
-                if not continue_with_show:
-                    break
-                potential_show_duration = (
-                    show_running_duration + episode_data["duration"]
-                )
-                if (
-                    float(potential_show_duration) / float(shortest_show_length)
-                ) <= margin:
-                    final_shows.append(episode_data["episode"])
-                    show_running_duration += episode_data["duration"]
-                else:
-                    continue_with_show = False
-    sorted_movies = sort_media_alphabetically(media_items=non_shows)
-    sorted_all = final_shows + sorted_movies
-    return sorted_all
+    if target_duration is not None and target_percentile is not None:
+        raise GeneralException("Use either target_duration or target_percentile, not both.")
+    table = _as_program_table(media_items=media_items)
+    show_index = table.show_index(alphabetical=False)
+    movies = table.alphabetical_order(indices=numpy.flatnonzero(table.non_show_mask()))
+    if not len(show_index):
+        return table.materialize(movies)
+    if target_duration is None:
+        target_duration = numpy.percentile(show_index.show_durations, target_percentile or 0)
+    limit = target_duration * (1 + margin_of_correction)
+    # running durations only grow, so one search over them finds where each show passes the limit
+    running_durations = numpy.cumsum(table.durations[show_index.episodes])
+    show_bases = numpy.append(0, running_durations)[show_index.show_starts]
+    cutoffs = numpy.searchsorted(running_durations, show_bases + limit, side="right")
+    keep_counts = numpy.minimum(cutoffs - show_index.show_starts, show_index.show_episode_counts)
+    keep = show_index.positions < keep_counts[show_index.show_numbers]
+    return table.materialize(numpy.concatenate((show_index.episodes[keep], movies)))
 
 
 def remove_non_programs(
@@ -1405,22 +1449,34 @@ def remove_non_programs(
 
 
 def remove_duplicate_media_items(
-    media_items: List[Union[Program, Redirect, FillerItem]]
+    media_items: Union[List[Union[Program, Redirect, FillerItem]], ProgramTable]
 ) -> List[Union[Program, FillerItem]]:
     """
     Remove duplicate items from list of media items.
     Check by ratingKey.
     Note: Automatically removes redirect items
 
-    :param media_items: List of Program and FillerItem objects
-    :type media_items: List[Union[Program, FillerList]]
+    :param media_items: List of Program and FillerItem objects, or a ProgramTable
+    :type media_items: Union[List[Union[Program, FillerItem]], ProgramTable]
     :return: List of Program and FillerItem objects
     :rtype: List[Union[Program, FillerList]]
     """
-    non_redirects = remove_non_programs(media_items=media_items)
-    return remove_duplicates_by_attribute(
-        items=non_redirects, attribute_name="ratingKey"
+    table = _as_program_table(media_items=media_items)
+    non_redirects = numpy.flatnonzero(
+        table.types.present & ~table.types.equals("redirect")
+    )
+    rating_key_codes = table.rating_keys.codes[non_redirects]
+    has_rating_key = table.rating_keys.map_values(func=bool, missing=False, dtype=bool)[
+        non_redirects
+    ]
+    # items without a ratingKey are always kept, others only on their first appearance
+    keep = ~has_rating_key
+    with_rating_key = numpy.flatnonzero(has_rating_key)
+    _, first_appearances = numpy.unique(
+        rating_key_codes[with_rating_key], return_index=True
     )
+    keep[with_rating_key[first_appearances]] = True
+    return table.materialize(non_redirects[keep])
 
 
 def _get_first_x_minutes_of_programs(
@@ -1436,16 +1492,10 @@ def _get_first_x_minutes_of_programs(
     :return: list of Program objects, total running time in milliseconds
     :rtype: Tuple[List[Union[Program, Redirect, FillerList]], int]
     """
-    milliseconds = minutes * 60 * 1000
-    running_total = 0
-    programs_to_return = []
-    for program in programs:
-        if (running_total + program.duration) <= milliseconds:
-            running_total += program.duration
-            programs_to_return.append(program)
-        else:
-            break
-    return programs_to_return, running_total
+    count, running_total = blocks.fit_programs(
+        durations=(program.duration for program in programs), length=minutes * 60 * 1000
+    )
+    return programs[:count], running_total
 
 
 def _get_first_x_minutes_of_programs_return_unused(
@@ -1465,17 +1515,7 @@ def _get_first_x_minutes_of_programs_return_unused(
     :return: list of Program objects, total running time in milliseconds, unused Programs
     :rtype: Tuple[List[Union[Program, Redirect, FillerList]], int, List[Union[Program, Redirect, FillerList]]]
     """
-    milliseconds = minutes * 60 * 1000
-    running_total = 0
-    leftover_programs = []
-    programs_to_return = []
-    for program in programs:
-        if (running_total + program.duration) <= milliseconds:
-            running_total += program.duration
-            programs_to_return.append(program)
-        else:
-            break
-    for program in programs:
-        if program not in programs_to_return:
-            leftover_programs.append(program)
-    return programs_to_return, running_total, leftover_programs
+    count, running_total = blocks.fit_programs(
+        durations=(program.duration for program in programs), length=minutes * 60 * 1000
+    )
+    return programs[:count], running_total, programs[count:]
@@ -1,6 +1,41 @@
+class DataField:
+    __slots__ = ("key",)
+
+    def __init__(self, key: str = None):
+        """
+        Attribute that reads a key of the object's raw JSON data, so values are not stored twice
+        The raw data is shared with where it came from (e.g. a Channel's program list).
+        Writes are kept on the object alone, so, as with a plain attribute, they never change its raw data (_data).
+
+        :param key: JSON key (default: the attribute name)
+        :type key: str, optional
+        """
+        self.key = key
+
+    def __set_name__(self, owner, name):
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if obj._set_fields and self.key in obj._set_fields:
+            return obj._set_fields[self.key]
+        return obj._raw_data.get(self.key)
+
+    def __set__(self, obj, value):
+        if obj._set_fields is None:
+            obj._set_fields = {}
+        obj._set_fields[self.key] = value
+
+
 class BaseObject:
+    __slots__ = ("_raw_data", "_set_fields")
+
     def __init__(self, data: dict):
         self._raw_data = data
+        # values written to DataFields, made on first write
+        self._set_fields = None
 
     @property
     def json(self) -> dict:
@@ -24,6 +59,8 @@ class BaseObject:
 
 
 class BaseAPIObject(BaseObject):
+    __slots__ = ("_dizque_instance",)
+
     def __init__(self, data: dict, dizque_instance):
         super().__init__(data)
         self._dizque_instance = dizque_instance
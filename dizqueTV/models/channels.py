@@ -1,15 +1,22 @@
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Union
+from typing import List, Tuple, Union
 
+import numpy
 from plexapi.audio import Track
 from plexapi.collection import Collection
 from plexapi.playlist import Playlist
 from plexapi.server import PlexServer as PServer
 from plexapi.video import Episode, Movie, Video
 
+import dizqueTV.dizquetv_blocks as blocks
 import dizqueTV.helpers as helpers
 from dizqueTV import decorators
-from dizqueTV.exceptions import GeneralException, MissingParametersError
+from dizqueTV.dizquetv_cache import _copy_json
+from dizqueTV.dizquetv_program_table import MISSING, ProgramTable, ShowIndex
+from dizqueTV.dizquetv_timeline import ScheduledProgram, TimelineIndex
+from dizqueTV.exceptions import (ChannelConflictError, GeneralException,
+                                 MissingParametersError)
 from dizqueTV.models.base import BaseAPIObject, BaseObject
 from dizqueTV.models.custom_show import CustomShow, CustomShowItem
 from dizqueTV.models.fillers import FillerList
@@ -56,10 +63,7 @@ class ChannelFFMPEGSettings(BaseAPIObject):
             new_settings = helpers._combine_settings(
                 new_settings_dict=kwargs, default_dict=self._data
             )
-        if self._dizque_instance.update_channel(
-                channel_number=self._channel_instance.number, transcoding=new_settings
-        ):
-            self._channel_instance.refresh()
+        if self._channel_instance.update(transcoding=new_settings):
             del self
             return True
         return False
@@ -95,10 +99,7 @@ class ChannelOnDemandSettings(BaseAPIObject):
         new_settings["firstProgramModulo"] = (
                                                      self._channel_instance.startTime_datetime.timestamp() * 1000
                                              ) % new_settings["modulo"]
-        if self._dizque_instance.update_channel(
-                channel_number=self._channel_instance.number, onDemand=new_settings
-        ):
-            self._channel_instance.refresh()
+        if self._channel_instance.update(onDemand=new_settings):
             del self
             return True
         return False
@@ -132,10 +133,7 @@ class Watermark(BaseAPIObject):
         :rtype: bool
         """
         new_watermark_dict = self._dizque_instance.fill_in_watermark_settings(**kwargs)
-        if self._dizque_instance.update_channel(
-                channel_number=self._channel_instance.number, watermark=new_watermark_dict
-        ):
-            self._channel_instance.refresh()
+        if self._channel_instance.update(watermark=new_watermark_dict):
             del self
             return True
         return False
@@ -390,7 +388,24 @@ class Channel(BaseAPIObject):
                 channel_instance=self,
             )
         self.plex_server = plex_server
-        self.scheduledableItems = self._get_schedulable_items()
+        # programs and schedulable items are built on first use, then reused until the program data changes
+        self._programs_cache = None
+        self._programs_cache_key = None
+        self._schedulable_items_cache = None
+        self._program_table_cache = None
+        self._program_table_key = None
+        self._timeline_cache = None
+        self._timeline_table = None
+        # bumped whenever the program list may have been edited in place, which its id and length can't show
+        self._programs_version = 0
+        self._fingerprint = (
+            helpers._channel_fingerprint(channel_data=data)
+            if getattr(dizque_instance, "detect_channel_conflicts", False)
+            else None
+        )
+        self._batch_depth = 0
+        self._batch_snapshot = None
+        self._batch_changed = False
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.number}:{self.name})"
@@ -406,7 +421,7 @@ class Channel(BaseAPIObject):
         :return: List of TimeSlotItem objects
         :rtype: List[TimeSlotItem]
         """
-        used_titles = []
+        used_titles = set()
         schedulable_items = []
         for program in self.programs:
             if (
@@ -417,7 +432,7 @@ class Channel(BaseAPIObject):
                 schedulable_items.append(
                     TimeSlotItem(item_type="redirect", item_value=program.channel)
                 )
-                used_titles.append(program.channel)
+                used_titles.add(program.channel)
             elif program.showTitle and program.showTitle not in used_titles:
                 if program.type == "movie":
                     schedulable_items.append(
@@ -427,9 +442,148 @@ class Channel(BaseAPIObject):
                     schedulable_items.append(
                         TimeSlotItem(item_type="tv", item_value=program.showTitle)
                     )
-                used_titles.append(program.showTitle)
+                used_titles.add(program.showTitle)
         return schedulable_items
 
+    @property
+    def scheduledableItems(self) -> List[TimeSlotItem]:
+        """
+        Get all programs able to be scheduled for this channel
+
+        :return: List of TimeSlotItem objects
+        :rtype: List[TimeSlotItem]
+        """
+        # rebuilding programs (when program data changed) also clears this cache
+        self._get_programs()
+        if self._schedulable_items_cache is None:
+            self._schedulable_items_cache = self._get_schedulable_items()
+        return list(self._schedulable_items_cache)
+
+    def _get_programs(self) -> List[Union[Program, CustomShow]]:
+        program_data = self._data.get("programs", self._program_data)
+        cache_key = (id(program_data), len(program_data), self._programs_version)
+        if self._programs_cache is None or self._programs_cache_key != cache_key:
+            self._programs_cache = self._dizque_instance.parse_custom_shows_and_non_custom_shows(
+                items=program_data,
+                non_custom_show_type=Program,
+                dizque_instance=self._dizque_instance,
+                channel_instance=self,
+            )
+            self._programs_cache_key = cache_key
+            self._schedulable_items_cache = None
+        return self._programs_cache
+
+    @property
+    def program_table(self) -> ProgramTable:
+        """
+        Get a columnar view of this channel's programs (one row per program, including custom show items)
+        Built once and reused until this channel's program data changes
+
+        :return: ProgramTable object
+        :rtype: ProgramTable
+        """
+        program_data = self._data.get("programs", self._program_data)
+        cache_key = (id(program_data), len(program_data), self._programs_version)
+        if self._program_table_cache is None or self._program_table_key != cache_key:
+            self._program_table_cache = ProgramTable(
+                rows=program_data, item_factory=self._make_program
+            )
+            self._program_table_key = cache_key
+        return self._program_table_cache
+
+    @property
+    def show_index(self) -> ShowIndex:
+        """
+        Get this channel's TV episodes grouped by show and season (shows in order of first appearance)
+        Built once and reused until this channel's program data changes
+
+        :return: ShowIndex object
+        :rtype: ShowIndex
+        """
+        return self.program_table.show_index(alphabetical=False)
+
+    def _programs_changed(self) -> None:
+        # drop the programs, table and timeline built from the program list, e.g. after its items were edited in place
+        self._programs_version += 1
+
+    def _make_program(self, data: dict) -> Program:
+        return Program(data=data, dizque_instance=self._dizque_instance, channel_instance=self)
+
+    @property
+    def timeline(self) -> TimelineIndex:
+        """
+        Get the index of when each program on this channel airs
+        Built once and reused until this channel's program data changes
+
+        :return: TimelineIndex object
+        :rtype: TimelineIndex
+        """
+        table = self.program_table
+        if self._timeline_cache is None or self._timeline_table is not table:
+            self._timeline_cache = TimelineIndex(
+                start_time=self.startTime_datetime, durations=table.durations
+            )
+            self._timeline_table = table
+        return self._timeline_cache
+
+    def _schedule_program(self, index: int, start: int) -> ScheduledProgram:
+        timeline = self.timeline
+        (program,) = self.program_table.materialize([index])
+        return ScheduledProgram(
+            program=program,
+            index=index,
+            start=timeline.time_at(elapsed=start),
+            stop=timeline.time_at(elapsed=start + int(timeline.durations[index])),
+        )
+
+    def now_playing(self, at: datetime = None) -> Union[ScheduledProgram, None]:
+        """
+        Get the program airing on this channel at a certain time, worked out locally from the lineup
+        The lineup loops, so any time after the channel's start time has a program
+
+        :param at: datetime.datetime object (default: now). Naive datetimes are assumed to be UTC.
+        :type at: datetime.datetime, optional
+        :return: ScheduledProgram object, or None if nothing airs (before the start time, or no programs)
+        :rtype: Union[ScheduledProgram, None]
+        """
+        timeline = self.timeline
+        position = timeline.locate(
+            elapsed=timeline.elapsed_milliseconds(at=at or datetime.utcnow())
+        )
+        if not position:
+            return None
+        return self._schedule_program(index=position[0], start=position[1])
+
+    def lineup(self, from_date: datetime, to_date: datetime) -> List[ScheduledProgram]:
+        """
+        Get the programs airing on this channel in a time range, worked out locally from the lineup
+
+        :param from_date: datetime.datetime object to start time frame. Naive datetimes are assumed to be UTC.
+        :type from_date: datetime.datetime
+        :param to_date: datetime.datetime object to end time frame. Naive datetimes are assumed to be UTC.
+        :type to_date: datetime.datetime
+        :return: List of ScheduledProgram objects, including any program already airing at from_date
+        :rtype: List[ScheduledProgram]
+        """
+        timeline = self.timeline
+        indexes, starts = timeline.window(
+            start=timeline.elapsed_milliseconds(at=from_date),
+            end=timeline.elapsed_milliseconds(at=to_date),
+        )
+        return [
+            self._schedule_program(index=index, start=start)
+            for index, start in zip(indexes.tolist(), starts.tolist())
+        ]
+
+    @property
+    def _sortable_programs(self) -> Union[ProgramTable, List[Union[Program, CustomShow]]]:
+        # sort the columns directly, only building Program objects for the result,
+        # unless custom shows need to stay together as one CustomShow each
+        table = self.program_table
+        if table.has_custom_shows:
+            return self.programs
+        return table
+
     # CRUD Operations
     # Create (handled in dizqueTV.py)
     # Read
@@ -437,16 +591,13 @@ class Channel(BaseAPIObject):
     def programs(self) -> List[Union[Program, CustomShow]]:
         """
         Get all programs on this channel
+        Built once and reused until this channel's program data changes
 
         :return: List of Program and CustomShow objects
         :rtype: List[Union[Program, CustomShow]]
         """
-        return self._dizque_instance.parse_custom_shows_and_non_custom_shows(
-            items=self._program_data,
-            non_custom_show_type=Program,
-            dizque_instance=self._dizque_instance,
-            channel_instance=self,
-        )
+        # copy the list, so callers can reorder or trim it without affecting the cache
+        return list(self._get_programs())
 
     @decorators.check_for_dizque_instance
     def get_program(
@@ -513,23 +664,148 @@ class Channel(BaseAPIObject):
         temp_channel = self._dizque_instance.get_channel(channel_number=self.number)
         if temp_channel:
             json_data = temp_channel._data
-            self.__init__(data=json_data, dizque_instance=self._dizque_instance)
+            self._reload(data=json_data, from_server=True)
             del temp_channel
 
+    def _reload(self, data: dict, from_server: bool = False):
+        # edit state belongs to this object rather than to its data, so carry it over
+        fingerprint = self._fingerprint
+        batch_state = (self._batch_depth, self._batch_snapshot, self._batch_changed)
+        self.__init__(data=data, dizque_instance=self._dizque_instance, plex_server=self.plex_server)
+        if not from_server:
+            self._fingerprint = fingerprint
+        self._batch_depth, self._batch_snapshot, self._batch_changed = batch_state
+
+    def _save(self, channel_data: dict) -> bool:
+        if self._fingerprint:
+            server_fingerprint = self._dizque_instance._get_channel_fingerprint(
+                channel_number=self.number
+            )
+            if server_fingerprint and server_fingerprint != self._fingerprint:
+                raise ChannelConflictError(
+                    f"Channel {self.number} was changed on dizqueTV since it was loaded. "
+                    f"Refresh the channel and try again."
+                )
+        if self._dizque_instance._save_channel(channel_data=channel_data):
+            self._reload(data=channel_data)
+            if self._fingerprint:
+                # the server may normalize some settings, so take its version as the new baseline
+                # (falling back to what was sent, so conflict detection stays on if that fetch fails)
+                self._fingerprint = self._dizque_instance._get_channel_fingerprint(
+                    channel_number=self.number
+                ) or helpers._channel_fingerprint(channel_data=channel_data)
+            return True
+        return False
+
+    @decorators.check_for_dizque_instance
+    def begin(self) -> None:
+        """
+        Start a batch of edits
+        Edits made until the matching commit() only change this Channel object, and are then sent to dizqueTV at once
+        Batches can be nested; only the outermost commit() sends the edits
+
+        :return: None
+        :rtype: None
+        """
+        if not self._batch_depth:
+            self._batch_snapshot = _copy_json(self._data)
+            self._batch_changed = False
+        self._batch_depth += 1
+
+    @decorators.check_for_dizque_instance
+    def commit(self) -> bool:
+        """
+        End a batch of edits, sending all edits to dizqueTV in a single request if this is the outermost batch
+
+        :return: True if successful, False if unsuccessful (Channel is restored to how it was at begin())
+        :rtype: bool
+        """
+        if not self._batch_depth:
+            raise GeneralException("There is no batch of edits to commit. Call begin() first.")
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return True
+        snapshot = self._batch_snapshot
+        self._batch_snapshot = None
+        if not self._batch_changed:
+            return True
+        self._batch_changed = False
+        # if the edits don't make it to dizqueTV, put this Channel back the way it was at begin()
+        try:
+            saved = self._save(channel_data=self._data)
+        except Exception:
+            self._reload(data=snapshot)
+            raise
+        if not saved:
+            self._reload(data=snapshot)
+        return saved
+
+    @decorators.check_for_dizque_instance
+    def rollback(self) -> None:
+        """
+        Discard the current batch of edits (including any nested batches), restoring this Channel to how it was at begin()
+
+        :return: None
+        :rtype: None
+        """
+        if not self._batch_depth:
+            return
+        snapshot = self._batch_snapshot
+        self._batch_depth = 0
+        self._batch_snapshot = None
+        self._batch_changed = False
+        self._reload(data=snapshot)
+
+    @contextmanager
+    def batch(self):
+        """
+        Batch edits to this Channel, sending them to dizqueTV in a single request when the block ends
+        Edits are discarded if the block raises an exception, or if they can't be saved (which raises GeneralException)
+
+        Ex.
+        with channel.batch():
+            channel.remove_specials()
+            channel.remove_duplicate_programs()
+            channel.pad_times(start_every_x_minutes=30)
+
+        :return: This Channel object
+        :rtype: Channel
+        """
+        self.begin()
+        try:
+            yield self
+        except Exception:
+            self.rollback()
+            raise
+        if not self.commit():
+            raise GeneralException(f"The edits to channel {self.number} could not be saved to dizqueTV.")
+
     @decorators.check_for_dizque_instance
     def update(self, **kwargs) -> bool:
         """
         Edit this Channel on dizqueTV
-        Automatically refreshes current Channel object
+        Sends this Channel's local data with the changes applied, then reloads the Channel from that data
+        Inside a batch, only the local data is changed until the batch is committed
 
         :param kwargs: keyword arguments of Channel settings names and values
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        if self._dizque_instance.update_channel(channel_number=self.number, **kwargs):
-            self.refresh()
+        if kwargs.get("iconPosition"):
+            kwargs["iconPosition"] = helpers.convert_icon_position(
+                position_text=kwargs["iconPosition"]
+            )
+        channel_data = helpers._combine_settings_add_new(
+            new_settings_dict=kwargs, default_dict=self._data
+        )
+        if "programs" in kwargs:
+            # callers often edit the program list in place before calling this, and it stays edited if the save fails
+            self._programs_changed()
+        if self._batch_depth:
+            self._batch_changed = True
+            self._reload(data=channel_data)
             return True
-        return False
+        return self._save(channel_data=channel_data)
 
     @decorators.check_for_dizque_instance
     def edit(self, **kwargs) -> bool:
@@ -765,10 +1041,8 @@ class Channel(BaseAPIObject):
                         # collect everything that's not the targeted season if there is one
                         if season_number != season_number:
                             programs_to_add.append(program)
-        if self.delete_all_programs():
-            # add back everything that's not the targeted show/season combo
-            return self.add_programs(programs=programs_to_add)
-        return False
+        # add back everything that's not the targeted show/season combo
+        return self._replace_programs(programs=programs_to_add)
 
     @decorators.check_for_dizque_instance
     def add_x_number_of_show_episodes(
@@ -830,10 +1104,14 @@ class Channel(BaseAPIObject):
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
+        # Plex items keep their duration when converted, so the cut is found before converting any of them
+        count, _ = blocks.fill_length(
+            durations=(item.duration for item in list_of_episodes),
+            length=duration_in_milliseconds,
+            allow_overtime=allow_overtime,
+        )
         channel_data = self._data
-        total_runtime = 0
-        list_index = 0
-        while total_runtime < duration_in_milliseconds:
+        for list_index in range(count):
             if not type(list_of_episodes[list_index]) == Program:
                 if not plex_server and not self.plex_server:
                     raise MissingParametersError(
@@ -846,19 +1124,8 @@ class Channel(BaseAPIObject):
                     plex_item=list_of_episodes[list_index],
                     plex_server=(plex_server if plex_server else self.plex_server),
                 )
-            if (
-                    total_runtime + list_of_episodes[list_index].duration
-            ) > duration_in_milliseconds:
-                if allow_overtime:
-                    channel_data["programs"].append(list_of_episodes[list_index]._data)
-                    channel_data["duration"] += list_of_episodes[list_index].duration
-                else:
-                    pass
-            else:
-                channel_data["programs"].append(list_of_episodes[list_index]._data)
-                channel_data["duration"] += list_of_episodes[list_index].duration
-            total_runtime += list_of_episodes[list_index].duration
-            list_index += 1
+            channel_data["programs"].append(list_of_episodes[list_index]._data)
+            channel_data["duration"] += list_of_episodes[list_index].duration
         return self.update(**channel_data)
 
     @decorators.check_for_dizque_instance
@@ -870,10 +1137,28 @@ class Channel(BaseAPIObject):
         :rtype: bool
         """
         channel_data = self._data
-        channel_data["duration"] -= sum(program.duration for program in self.programs)
+        channel_data["duration"] -= int(self.program_table.durations.sum())
         channel_data["programs"] = []
         return self.update(**channel_data)
 
+    @decorators.batch_changes
+    def _replace_programs(
+            self, programs: List[Union[Program, Redirect, FillerItem, CustomShow]]
+    ) -> bool:
+        """
+        Replace all programs on this channel, sending the change to dizqueTV in a single request
+
+        :param programs: List of Program, Redirect, FillerItem or CustomShow objects
+        :type programs: List[Union[Program, Redirect, FillerItem, CustomShow]]
+        :return: True if successful, False if unsuccessful (Channel reloads in-place)
+        :rtype: bool
+        """
+        if not self.delete_all_programs():
+            return False
+        if programs:
+            return self.add_programs(programs=programs)
+        return True
+
     @decorators.check_for_dizque_instance
     def _delete_all_offline_times(self) -> bool:
         """
@@ -886,8 +1171,8 @@ class Channel(BaseAPIObject):
         for program in self.programs:
             if not program.isOffline or program.type == "redirect":
                 programs_to_add.append(program)
-        if programs_to_add and self.delete_all_programs():
-            return self.add_programs(programs=programs_to_add)
+        if programs_to_add:
+            return self._replace_programs(programs=programs_to_add)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1047,6 +1332,7 @@ class Channel(BaseAPIObject):
         return self.add_schedule(time_slots=[], **kwargs)
 
     @decorators.check_for_dizque_instance
+    @decorators.batch_changes
     def delete_schedule(self) -> bool:
         """
         Delete this channel's Schedule
@@ -1069,9 +1355,9 @@ class Channel(BaseAPIObject):
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        sorted_programs = helpers.sort_media_by_release_date(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        sorted_programs = helpers.sort_media_by_release_date(media_items=self._sortable_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1083,9 +1369,9 @@ class Channel(BaseAPIObject):
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        sorted_programs = helpers.sort_media_by_season_order(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        sorted_programs = helpers.sort_media_by_season_order(media_items=self._sortable_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1096,9 +1382,9 @@ class Channel(BaseAPIObject):
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        sorted_programs = helpers.sort_media_alphabetically(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        sorted_programs = helpers.sort_media_alphabetically(media_items=self._sortable_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1109,9 +1395,9 @@ class Channel(BaseAPIObject):
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        sorted_programs = helpers.sort_media_by_duration(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        sorted_programs = helpers.sort_media_by_duration(media_items=self._sortable_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1123,25 +1409,31 @@ class Channel(BaseAPIObject):
         :rtype: bool
         """
         sorted_programs = helpers.sort_media_randomly(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
-    def cyclical_shuffle(self) -> bool:
+    def cyclical_shuffle(self, random_generator: numpy.random.Generator = None) -> bool:
         """
         Sort TV shows on this channel cyclically
 
+        :param random_generator: numpy.random.Generator to draw from, for reproducible results (default: a new one)
+        :type random_generator: numpy.random.Generator, optional
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
-        sorted_programs = helpers.sort_media_cyclical_shuffle(media_items=self.programs)
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        sorted_programs = helpers.sort_media_cyclical_shuffle(
+            media_items=self._sortable_programs, random_generator=random_generator
+        )
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
-    def block_shuffle(self, block_length: int, randomize: bool = False) -> bool:
+    def block_shuffle(
+        self, block_length: int, randomize: bool = False, random_generator: numpy.random.Generator = None
+    ) -> bool:
         """
         Sort TV shows on this channel cyclically
 
@@ -1149,14 +1441,19 @@ class Channel(BaseAPIObject):
         :type block_length: int
         :param randomize: Random block lengths between 1 and block_length
         :type randomize: bool, optional
+        :param random_generator: numpy.random.Generator to draw from when randomizing (default: a new one)
+        :type random_generator: numpy.random.Generator, optional
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
         sorted_programs = helpers.sort_media_block_shuffle(
-            media_items=self.programs, block_length=block_length, randomize=randomize
+            media_items=self._sortable_programs,
+            block_length=block_length,
+            randomize=randomize,
+            random_generator=random_generator,
         )
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1176,8 +1473,8 @@ class Channel(BaseAPIObject):
         for _ in range(0, how_many_times):
             for program in programs:
                 final_program_list.append(program)
-        if final_program_list and self.delete_all_programs():
-            return self.add_programs(programs=final_program_list)
+        if final_program_list:
+            return self._replace_programs(programs=final_program_list)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1199,8 +1496,8 @@ class Channel(BaseAPIObject):
             helpers.shuffle(list_to_shuffle)
             for program in list_to_shuffle:
                 final_program_list.append(program)
-        if final_program_list and self.delete_all_programs():
-            return self.add_programs(programs=final_program_list)
+        if final_program_list:
+            return self._replace_programs(programs=final_program_list)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1213,10 +1510,10 @@ class Channel(BaseAPIObject):
         :rtype: bool
         """
         sorted_programs = helpers.remove_duplicate_media_items(
-            media_items=self.programs
+            media_items=self._sortable_programs
         )
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1230,8 +1527,8 @@ class Channel(BaseAPIObject):
         sorted_programs = helpers.remove_duplicates_by_attribute(
             items=self.programs, attribute_name="channel"
         )
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1249,8 +1546,8 @@ class Channel(BaseAPIObject):
                     or item.type != "redirect"
             ):
                 non_redirects.append(item)
-        if non_redirects and self.delete_all_programs():
-            return self.add_programs(programs=non_redirects)
+        if non_redirects:
+            return self._replace_programs(programs=non_redirects)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1278,43 +1575,66 @@ class Channel(BaseAPIObject):
                     and item.season != 0
             )
         ]
-        if non_specials and self.delete_all_programs():
-            return self.add_programs(programs=non_specials)
+        if non_specials:
+            return self._replace_programs(programs=non_specials)
         return False
 
     @decorators.check_for_dizque_instance
-    def pad_times(self, start_every_x_minutes: int) -> bool:
+    def pad_times(
+            self, start_every_x_minutes: int, dry_run: bool = False
+    ) -> Union[bool, Tuple[int, int]]:
         """
         Add padding between programs on a channel, so programs start at specific intervals
+        Any existing padding (offline time) is replaced. A custom show is padded as a whole.
 
         :param start_every_x_minutes: Programs start every X minutes past the hour
         (ex. 10 for :00, :10, :20, :30, :40 & :50; 15 for :00, :15,
         :30 & :45; 20 for :00, :20 & :40; 30 for :00 & :30; 60 or 0 for :00)
         :type start_every_x_minutes: int
-        :return: True if successful, False if unsuccessful (Channel reloads in-place)
-        :rtype: bool
-        """
+        :param dry_run: Only work out the padding, without changing the channel
+        :type dry_run: bool, optional
+        :return: True if successful, False if unsuccessful (Channel reloads in-place).
+        On a dry run, the total padding that would be added and the channel's new duration, in milliseconds.
+        :rtype: Union[bool, Tuple[int, int]]
+        """
+        table = self.program_table
+        kept = numpy.flatnonzero(~table.offline | table.types.equals("redirect"))
+        # each custom show's consecutive items make up one unit, any other program is a unit of its own
+        custom_show_codes = table.custom_show_ids.codes[kept]
+        unit_ends = numpy.flatnonzero(
+            numpy.append(
+                (custom_show_codes[1:] != custom_show_codes[:-1]) | (custom_show_codes[:-1] == MISSING),
+                len(kept) > 0,
+            )
+        )
+        running_durations = numpy.cumsum(table.durations[kept])
+        unit_durations = numpy.diff(numpy.append(0, running_durations[unit_ends]))
+        padding = numpy.zeros(len(kept), dtype=numpy.int64)
+        padding[unit_ends] = helpers.get_needed_flex_times(
+            item_times_milliseconds=unit_durations,
+            allowed_minutes_time_frame=start_every_x_minutes,
+        )
+        total_padding = int(padding.sum())
+        new_duration = (
+            (self._data.get("duration") or 0)
+            - int(table.durations.sum())
+            + int(running_durations[-1] if len(kept) else 0)
+            + total_padding
+        )
+        if dry_run:
+            return total_padding, new_duration
+        if not len(kept):
+            return False
+        rows = table.rows
         programs_and_pads = []
-        if self._delete_all_offline_times():
-            for program in self.programs:
-                filler_time_needed = helpers.get_needed_flex_time(
-                    item_time_milliseconds=program.duration,
-                    allowed_minutes_time_frame=start_every_x_minutes,
-                )
-                programs_and_pads.append(program)
-                if filler_time_needed > 0:
-                    programs_and_pads.append(
-                        Program(
-                            data={"duration": filler_time_needed, "isOffline": True},
-                            dizque_instance=self._dizque_instance,
-                            channel_instance=self,
-                        )
-                    )
-            if programs_and_pads and self.delete_all_programs():
-                return self.add_programs(programs=programs_and_pads)
-        return False
+        for index, pad in zip(kept.tolist(), padding.tolist()):
+            programs_and_pads.append(rows[index])
+            if pad:
+                programs_and_pads.append({"duration": pad, "isOffline": True})
+        return self.update(programs=programs_and_pads, duration=new_duration)
 
     @decorators.check_for_dizque_instance
+    @decorators.batch_changes
     def add_reruns(
             self, start_time: datetime, length_hours: int, times_to_repeat: int
     ) -> bool:
@@ -1334,9 +1654,11 @@ class Channel(BaseAPIObject):
             raise GeneralException("You cannot use a start time in the future.")
         start_time = start_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
         self.remove_duplicate_programs()
-        programs_to_add, running_time = helpers._get_first_x_minutes_of_programs(
-            programs=self.programs, minutes=length_hours * 60
+        programs = self.programs
+        count, running_time = blocks.fit_programs(
+            durations=(program.duration for program in programs), length=length_hours * 60 * 60 * 1000
         )
+        programs_to_add = programs[:count]
         if running_time < (length_hours * 60 * 60 * 1000):
             time_needed = (length_hours * 60 * 60 * 1000) - running_time
             programs_to_add.append(
@@ -1351,11 +1673,77 @@ class Channel(BaseAPIObject):
             for program in programs_to_add:
                 final_programs_to_add.append(program)
         self.update(startTime=start_time)
-        if final_programs_to_add and self.delete_all_programs():
-            return self.add_programs(programs=final_programs_to_add)
+        if final_programs_to_add:
+            return self._replace_programs(programs=final_programs_to_add)
         return False
 
+    def _interlace_night_channel(
+            self,
+            programs: List[Union[Program, Redirect, FillerItem, CustomShow]],
+            night_channel_number: int,
+            regular_block_length: int,
+            night_block_length: int,
+            first_block_length: int = None,
+    ) -> List[Union[Program, Redirect, FillerItem, CustomShow]]:
+        """
+        Split programs into blocks that fit between nightly redirects to another channel
+
+        Each block is padded with flex time to its full length and followed by a Redirect to the night channel.
+        A program too long for a block gets a block of its own, without flex time.
+
+        :param programs: Programs to split up, in order
+        :type programs: List[Union[Program, Redirect, FillerItem, CustomShow]]
+        :param night_channel_number: number of the channel to redirect to
+        :type night_channel_number: int
+        :param regular_block_length: milliseconds of programs between two nights
+        :type regular_block_length: int
+        :param night_block_length: milliseconds of each night
+        :type night_block_length: int
+        :param first_block_length: milliseconds until the first night, if not a full block (may be left empty)
+        :type first_block_length: int, optional
+        :return: List of programs, flex time and Redirect objects
+        :rtype: List[Union[Program, Redirect, FillerItem, CustomShow]]
+        """
+        programs_with_nights = []
+        for block_number, (start, end, running_time) in enumerate(
+                blocks.partition_into_blocks(
+                    durations=(program.duration for program in programs),
+                    block_length=regular_block_length,
+                    # only whole minutes of programs are fit in before the first night
+                    first_block_length=(
+                        None if first_block_length is None else int(first_block_length / 1000 / 60) * 60 * 1000
+                    ),
+                )
+        ):
+            block_length = regular_block_length
+            if block_number == 0 and first_block_length is not None:
+                block_length = first_block_length
+            programs_with_nights.extend(programs[start:end])
+            if running_time < block_length:
+                # add flex time between last item and night channel
+                programs_with_nights.append(
+                    Program(
+                        data={"duration": block_length - running_time, "isOffline": True},
+                        dizque_instance=self._dizque_instance,
+                        channel_instance=self,
+                    )
+                )
+            programs_with_nights.append(
+                Redirect(
+                    data={
+                        "duration": night_block_length,
+                        "isOffline": True,
+                        "channel": night_channel_number,
+                        "type": "redirect",
+                    },
+                    dizque_instance=self._dizque_instance,
+                    channel_instance=self,
+                )
+            )
+        return programs_with_nights
+
     @decorators.check_for_dizque_instance
+    @decorators.batch_changes
     def add_channel_at_night(
             self, night_channel_number: int, start_hour: int, end_hour: int
     ) -> bool:
@@ -1394,44 +1782,16 @@ class Channel(BaseAPIObject):
         new_channel_start_time = new_channel_start_time.strftime(
             "%Y-%m-%dT%H:%M:%S.000Z"
         )
-        final_programs_to_add = []
-        programs_left = self.programs
-        while programs_left:  # loop until you get done with all the programs
-            (
-                programs_to_add,
-                total_running_time,
-                programs_left,
-            ) = helpers._get_first_x_minutes_of_programs_return_unused(
-                programs=programs_left, minutes=int(length_of_regular_block / 1000 / 60)
-            )
-            if total_running_time < length_of_regular_block:
-                # add flex time between last item and night channel
-                time_needed = length_of_regular_block - total_running_time
-                programs_to_add.append(
-                    Program(
-                        data={"duration": time_needed, "isOffline": True},
-                        dizque_instance=self._dizque_instance,
-                        channel_instance=self,
-                    )
-                )
-            programs_to_add.append(
-                Redirect(
-                    data={
-                        "duration": length_of_night_block,
-                        "isOffline": True,
-                        "channel": night_channel_number,
-                        "type": "redirect",
-                    },
-                    dizque_instance=self._dizque_instance,
-                    channel_instance=self,
-                )
-            )
-            for program in programs_to_add:
-                final_programs_to_add.append(program)
+        final_programs_to_add = self._interlace_night_channel(
+            programs=self.programs,
+            night_channel_number=night_channel_number,
+            regular_block_length=length_of_regular_block,
+            night_block_length=length_of_night_block,
+        )
 
         self.update(startTime=new_channel_start_time)
-        if final_programs_to_add and self.delete_all_programs():
-            return self.add_programs(programs=final_programs_to_add)
+        if final_programs_to_add:
+            return self._replace_programs(programs=final_programs_to_add)
         return False
 
     @decorators.check_for_dizque_instance
@@ -1473,126 +1833,41 @@ class Channel(BaseAPIObject):
                 hour=start_hour, minute=0, second=0, microsecond=0
             ),
         )
-        final_programs_to_add = []
-        all_programs = self.programs
-        programs_to_add, total_running_time = helpers._get_first_x_minutes_of_programs(
-            programs=all_programs, minutes=int(time_until_night_block_start / 1000 / 60)
+        final_programs_to_add = self._interlace_night_channel(
+            programs=self.programs,
+            night_channel_number=night_channel_number,
+            regular_block_length=length_of_regular_block,
+            night_block_length=length_of_night_block,
+            first_block_length=time_until_night_block_start,
         )
-        if len(programs_to_add) == len(
-                all_programs
-        ):  # all programs can play before night channel even starts
-            if (
-                    total_running_time < time_until_night_block_start
-            ):  # add flex time between last item and night channel
-                time_needed = time_until_night_block_start - total_running_time
-                programs_to_add.append(
-                    Program(
-                        data={"duration": time_needed, "isOffline": True},
-                        dizque_instance=self._dizque_instance,
-                        channel_instance=self,
-                    )
-                )
-            # add the night channel
-            programs_to_add.append(
-                Redirect(
-                    data={
-                        "duration": length_of_night_block,
-                        "isOffline": True,
-                        "channel": night_channel_number,
-                        "type": "redirect",
-                    },
-                    dizque_instance=self._dizque_instance,
-                    channel_instance=self,
-                )
-            )
-            final_programs_to_add = programs_to_add
-        else:  # need to interlace programs and night channels
-            programs_left = all_programs
-            (
-                programs_to_add,
-                total_running_time,
-                programs_left,
-            ) = helpers._get_first_x_minutes_of_programs_return_unused(
-                programs=programs_left,
-                minutes=int(time_until_night_block_start / 1000 / 60),
-            )
-            if (
-                    total_running_time < time_until_night_block_start
-            ):  # add flex time between last item and night channel
-                time_needed = time_until_night_block_start - total_running_time
-                programs_to_add.append(
-                    Program(
-                        data={"duration": time_needed, "isOffline": True},
-                        dizque_instance=self._dizque_instance,
-                        channel_instance=self,
-                    )
-                )
-            # add the night channel
-            programs_to_add.append(
-                Redirect(
-                    data={
-                        "duration": length_of_night_block,
-                        "isOffline": True,
-                        "channel": night_channel_number,
-                        "type": "redirect",
-                    },
-                    dizque_instance=self._dizque_instance,
-                    channel_instance=self,
-                )
-            )
-            final_programs_to_add = programs_to_add
-            while programs_left:  # loop until you get done with all the programs
-                (
-                    programs_to_add,
-                    total_running_time,
-                    programs_left,
-                ) = helpers._get_first_x_minutes_of_programs_return_unused(
-                    programs=programs_left,
-                    minutes=int(length_of_regular_block / 1000 / 60),
-                )
-                if total_running_time < length_of_regular_block:
-                    # add flex time between last item and night channel
-                    time_needed = length_of_regular_block - total_running_time
-                    programs_to_add.append(
-                        Program(
-                            data={"duration": time_needed, "isOffline": True},
-                            dizque_instance=self._dizque_instance,
-                            channel_instance=self,
-                        )
-                    )
-                programs_to_add.append(
-                    Redirect(
-                        data={
-                            "duration": length_of_night_block,
-                            "isOffline": True,
-                            "channel": night_channel_number,
-                            "type": "redirect",
-                        },
-                        dizque_instance=self._dizque_instance,
-                        channel_instance=self,
-                    )
-                )
-                for program in programs_to_add:
-                    final_programs_to_add.append(program)
-        if final_programs_to_add and self.delete_all_programs():
-            return self.add_programs(programs=final_programs_to_add)
+        if final_programs_to_add:
+            return self._replace_programs(programs=final_programs_to_add)
         return False
 
     @decorators.check_for_dizque_instance
-    def balance_programs(self, margin_of_error: float = 0.1) -> bool:
+    def balance_programs(
+            self, margin_of_error: float = 0.1, target_duration: int = None, target_percentile: float = None
+    ) -> bool:
         """
-        Balance shows to the shortest show length. Movies unaffected.
+        Balance shows to the shortest show length (or another target length). Movies unaffected.
 
-        :param margin_of_error: (Optional) Specify margin of error when deciding whether to add another episode. Ex. margin_of_error = 0.1 -> If adding a new episode would eclipse the shortest show length by 10% or less, add the episode.
+        :param margin_of_error: (Optional) Specify margin of error when deciding whether to add another episode. Ex. margin_of_error = 0.1 -> If adding a new episode would eclipse the target length by 10% or less, add the episode.
         :type margin_of_error: float, optional
+        :param target_duration: (Optional) Length to balance every show to, in milliseconds
+        :type target_duration: int, optional
+        :param target_percentile: (Optional) Balance to this percentile (0-100) of show lengths. Ex. 50 -> the median show length
+        :type target_percentile: float, optional
         :return: True if successful, False if unsuccessful (Channel reloads in-place)
         :rtype: bool
         """
         sorted_programs = helpers.balance_shows(
-            media_items=self.programs, margin_of_correction=margin_of_error
+            media_items=self._sortable_programs,
+            margin_of_correction=margin_of_error,
+            target_duration=target_duration,
+            target_percentile=target_percentile,
         )
-        if sorted_programs and self.delete_all_programs():
-            return self.add_programs(programs=sorted_programs)
+        if sorted_programs:
+            return self._replace_programs(programs=sorted_programs)
         return False
 
     @decorators.check_for_dizque_instance
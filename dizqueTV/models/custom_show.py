@@ -11,6 +11,8 @@ from dizqueTV.models.media import Program
 
 
 class CustomShowItem(Program):
+    __slots__ = ("_full_data", "order", "durationStr", "_commercials")
+
     def __init__(self, data: dict, dizque_instance, order: int):
         super().__init__(data, dizque_instance, None)
         self._full_data = data
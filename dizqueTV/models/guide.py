@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import List, Union
+from typing import Dict, List, Union
 
 import dizqueTV.helpers as helpers
+from dizqueTV.dizquetv_guide_index import ChannelGuideIndex, GuideIndex
+from dizqueTV.dizquetv_timeline import to_utc
 from dizqueTV.models.base import BaseAPIObject, BaseObject
 
 
@@ -21,44 +23,97 @@ class GuideProgram(BaseObject):
 
 
 class GuideChannel(BaseAPIObject):
-    def __init__(self, data, programs, dizque_instance):
+    def __init__(self, data, programs=None, dizque_instance=None, programs_data=None):
         super().__init__(data, dizque_instance)
         self.name = data.get("name")
         self.icon = data.get("icon")
         self.number = data.get("number")
-        self.programs = programs
+        self._programs = programs
+        self._programs_data = programs_data
+        self._index = None
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.name})"
 
+    @property
+    def programs(self) -> List[GuideProgram]:
+        """
+        Get the channel's programs in the guide
+        Built from the guide's JSON data the first time they are used, so unused channels cost nothing.
+
+        :return: list of GuideProgram objects
+        :rtype: list[GuideProgram]
+        """
+        if self._programs is None:
+            self._programs = [
+                GuideProgram(data=program_data) for program_data in self._programs_data or []
+            ]
+        return self._programs
+
+    @programs.setter
+    def programs(self, programs: List[GuideProgram]):
+        self._programs = programs
+        self._index = None
+
+    @property
+    def index(self) -> ChannelGuideIndex:
+        """
+        Get an interval index over the channel's programs, for fast time range, gap and overlap lookups
+        Built the first time it is used.
+
+        :return: ChannelGuideIndex object
+        :rtype: ChannelGuideIndex
+        """
+        if self._index is None:
+            self._index = ChannelGuideIndex(programs=self.programs)
+        return self._index
+
+    def _get_lineup_data(self, from_string: str, to_string: str) -> List[dict]:
+        def fetch(start: str, stop: str) -> Union[List[dict], None]:
+            json_data = self._dizque_instance._get_json(
+                endpoint=f"/guide/channels/{self.number}", params={"dateFrom": start, "dateTo": stop}
+            )
+            return json_data.get("programs", []) if json_data else None
+
+        lineup_cache = self._dizque_instance.lineup_cache
+        if not lineup_cache:
+            return fetch(start=from_string, stop=to_string) or []
+        return lineup_cache.get(channel_number=self.number, start=from_string, stop=to_string, fetch=fetch)
+
     def get_lineup(self, from_date: datetime, to_date: datetime) -> List[GuideProgram]:
         """
         Get guide channel lineup for a certain time range
+        Programs already fetched for an overlapping range are reused, if the guide has not been updated since.
 
-        :param from_date: datetime.datetime object to start time frame
+        :param from_date: datetime.datetime object to start time frame (naive datetimes are assumed to be UTC)
         :type from_date: datetime.datetime
-        :param to_date: datetime.datetime object to end time frame
+        :param to_date: datetime.datetime object to end time frame (naive datetimes are assumed to be UTC)
         :type to_date: datetime.datetime
         :return: list of GuideProgram objects
         :rtype: list[GuideProgram]
         """
-        params = {
-            "dateFrom": helpers.datetime_to_string(datetime_object=from_date),
-            "dateTo": helpers.datetime_to_string(datetime_object=to_date),
-        }
-        json_data = self._dizque_instance._get_json(
-            endpoint=f"/guide/channels/{self.number}", params=params
-        )
+        _sync_lineup_cache(dizque_instance=self._dizque_instance)
         return [
-                GuideProgram(data=program_data)
-                for program_data in json_data.get("programs", [])
-            ]
+            GuideProgram(data=program_data)
+            for program_data in self._get_lineup_data(
+                from_string=helpers.datetime_to_string(datetime_object=to_utc(from_date)),
+                to_string=helpers.datetime_to_string(datetime_object=to_utc(to_date)),
+            )
+        ]
+
+
+def _sync_lineup_cache(dizque_instance) -> None:
+    # cached lineups are only good until the guide is next updated
+    if dizque_instance.lineup_cache:
+        data = dizque_instance._get_json(endpoint="/guide/status")
+        dizque_instance.lineup_cache.sync(last_update=data.get("lastUpdate") if data else None)
 
 
 class Guide(BaseAPIObject):
     def __init__(self, data, dizque_instance):
         super().__init__(data, dizque_instance)
         self.channels = self._create_channels_and_programs()
+        self._index = None
 
     def __repr__(self):
         return f"{self.__class__.__name__})"
@@ -72,17 +127,72 @@ class Guide(BaseAPIObject):
         """
         channels = []
         for channel_number, data in self._data.items():
-            programs = [
-                GuideProgram(data=program_data) for program_data in data.get("programs", [])
-            ]
+            # programs are only built if a channel's programs are used
             channel = GuideChannel(
                 data=data.get("channel", {}),
-                programs=programs,
+                programs_data=data.get("programs", []),
                 dizque_instance=self._dizque_instance,
             )
             channels.append(channel)
         return channels
 
+    def get_lineups(
+            self,
+            from_date: datetime,
+            to_date: datetime,
+            channels: List[Union[GuideChannel, int]] = None,
+    ) -> Dict[int, List[GuideProgram]]:
+        """
+        Get the lineups of many guide channels for a certain time range, fetched concurrently
+        Programs already fetched for an overlapping range are reused, so moving the range forward only fetches
+        what is new, if the guide has not been updated since.
+
+        :param from_date: datetime.datetime object to start time frame (naive datetimes are assumed to be UTC)
+        :type from_date: datetime.datetime
+        :param to_date: datetime.datetime object to end time frame (naive datetimes are assumed to be UTC)
+        :type to_date: datetime.datetime
+        :param channels: GuideChannel objects or channel numbers to get lineups for (default: all channels)
+        :type channels: List[Union[GuideChannel, int]], optional
+        :return: Dictionary of channel numbers and lists of GuideProgram objects
+        :rtype: Dict[int, List[GuideProgram]]
+        """
+        if channels is None:
+            channels = self.channels
+        else:
+            channels_by_number = {channel.number: channel for channel in self.channels}
+            channels = [
+                channel if isinstance(channel, GuideChannel) else channels_by_number[channel]
+                for channel in channels
+            ]
+        _sync_lineup_cache(dizque_instance=self._dizque_instance)
+        results = self._dizque_instance.executor.map(
+            func=lambda channel, from_string, to_string: channel._get_lineup_data(
+                from_string=from_string, to_string=to_string
+            ),
+            elements=channels,
+            element_param_name="channel",
+            from_string=helpers.datetime_to_string(datetime_object=to_utc(from_date)),
+            to_string=helpers.datetime_to_string(datetime_object=to_utc(to_date)),
+        )
+        return {
+            task.element.number: [GuideProgram(data=program_data) for program_data in task.result]
+            for task in self._dizque_instance._log_failed_tasks(results=results)
+            if task.succeeded
+        }
+
+    @property
+    def index(self) -> GuideIndex:
+        """
+        Get interval indexes over every channel's programs, for fast lookups of what airs when
+        Built the first time it is used.
+
+        :return: GuideIndex object
+        :rtype: GuideIndex
+        """
+        if self._index is None:
+            self._index = GuideIndex(channels=self.channels)
+        return self._index
+
     @property
     def last_update(self) -> Union[datetime, None]:
         """
@@ -1,44 +1,51 @@
 import dizqueTV.decorators as decorators
 from dizqueTV.exceptions import MissingParametersError
-from dizqueTV.models.base import BaseAPIObject
+from dizqueTV.models.base import BaseAPIObject, DataField
 
 
 class BaseMediaItem(BaseAPIObject):
+    # fields are views onto the raw JSON data rather than copies, which keeps large lineups small in memory
+    # every slot lives here, since Program inherits from both MediaItem and Redirect
+    __slots__ = ("_channel_instance", "_filler_list_instance")
+
+    type = DataField()
+    isOffline = DataField()
+    duration = DataField()
+
     def __init__(self, data: dict, dizque_instance, channel_instance=None):
         super().__init__(data, dizque_instance)
-        self.type = data.get("type")
-        self.isOffline = data.get("isOffline")
-        self.duration = data.get("duration")
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.type})"
 
 
 class MediaItem(BaseMediaItem):
+    __slots__ = ()
+
+    title = DataField()
+    key = DataField()
+    ratingKey = DataField()
+    icon = DataField()
+    summary = DataField()
+    date = DataField()
+    year = DataField()
+    plexFile = DataField()
+    file = DataField()
+    showTitle = DataField()
+    episode = DataField()
+    season = DataField()
+    serverKey = DataField()
+
+    showIcon = DataField()
+    episodeIcon = DataField()
+    seasonIcon = DataField()
+
     def __init__(self, data: dict, dizque_instance, channel_instance=None):
         super().__init__(
             data=data,
             dizque_instance=dizque_instance,
             channel_instance=channel_instance,
         )
-        self.title = data.get("title")
-        self.key = data.get("key")
-        self.ratingKey = data.get("ratingKey")
-        self.duration = data.get("duration")
-        self.icon = data.get("icon")
-        self.summary = data.get("summary")
-        self.date = data.get("date")
-        self.year = data.get("year")
-        self.plexFile = data.get("plexFile")
-        self.file = data.get("file")
-        self.showTitle = data.get("showTitle")
-        self.episode = data.get("episode")
-        self.season = data.get("season")
-        self.serverKey = data.get("serverKey")
-
-        self.showIcon = data.get("showIcon")
-        self.episodeIcon = data.get("episodeIcon")
-        self.seasonIcon = data.get("seasonIcon")
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.title})"
@@ -51,23 +58,29 @@ class MediaItem(BaseMediaItem):
 
 
 class Redirect(BaseMediaItem):
+    __slots__ = ()
+
+    channel = DataField()
+
     def __init__(self, data: dict, dizque_instance, channel_instance):
         super().__init__(data=data, dizque_instance=dizque_instance)
         self._channel_instance = channel_instance
-        self.channel = data.get("channel")
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.channel})"
 
 
 class Program(MediaItem, Redirect):
+    __slots__ = ()
+
+    rating = DataField()
+
     def __init__(self, data: dict, dizque_instance, channel_instance):
         super().__init__(
             data=data,
             dizque_instance=dizque_instance,
             channel_instance=channel_instance,
         )
-        self.rating = data.get("rating")
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.title})"
@@ -129,6 +142,8 @@ class Program(MediaItem, Redirect):
 
 
 class FillerItem(MediaItem):
+    __slots__ = ()
+
     def __init__(self, data: dict, dizque_instance, filler_list_instance):
         super().__init__(data=data, dizque_instance=dizque_instance)
         self._filler_list_instance = filler_list_instance
@@ -26,6 +26,7 @@ setuptools.setup(
     install_requires=requirements,
     extras_require={
         "dev": dev_requirements,
+        "async": ["aiohttp"],
     },
     classifiers=[
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
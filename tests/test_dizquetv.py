@@ -1,8 +1,35 @@
+import asyncio
+import collections
+import io
+import json
+import threading
+from datetime import datetime, timedelta
 from time import sleep
+from xml.etree import ElementTree
 
+import numpy
 import pytest
+import requests
+
+try:
+    from aiohttp import test_utils, web
+except ImportError:  # optional dependency, needed only for the AsyncAPI tests
+    test_utils = web = None
 
 import dizqueTV
+import dizqueTV.dizquetv_streaming as streaming
+from dizqueTV.exceptions import GeneralException, RedirectCycleError
+from dizqueTV.models.channels import Channel
+from dizqueTV.models.guide import Guide
+from dizqueTV.dizquetv_async import AsyncAPI
+from dizqueTV.dizquetv_blocks import fill_length, partition_into_blocks
+from dizqueTV.dizquetv_cache import GuideCache, LineupCache, ResponseCache, SingleFlight, _copy_json
+from dizqueTV.dizquetv_parallel import ParallelExecutor
+from dizqueTV.dizquetv_playout import PlayoutResolver
+from dizqueTV.dizquetv_xmltv import iter_programmes, write_xmltv
+from dizqueTV.dizquetv_program_table import MISSING, ProgramTable
+from dizqueTV.dizquetv_sampling import WeightedSampler
+from dizqueTV.dizquetv_timeline import TimelineIndex
 from tests.setup import (client,
                          fake_plex_server,
                          plex_server,
@@ -137,3 +164,890 @@ class TestWithRealPlex:
         assert server is not None
         assert type(server) == dizqueTV.PlexServer
         assert server.name == plex_server().friendlyName
+
+
+def channel_data(number: int, programs: list = None) -> dict:
+    programs = programs or []
+    return {
+        "number": number,
+        "name": f"Channel {number}",
+        "startTime": "2021-01-01T00:00:00.000Z",
+        "duration": sum(program.get("duration", 0) for program in programs),
+        "programs": programs,
+        "fillerCollections": [],
+        "fallback": [],
+        "watermark": {},
+        "transcoding": {},
+        "onDemand": {},
+        "stealth": False,
+        "_id": str(number),
+    }
+
+
+class TestSession:
+    def test_pool_settings_reach_adapter_and_close_releases_it(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False,
+                           pool_connections=3, pool_maxsize=4, pool_block=True)
+        for prefix in ("http://", "https://"):
+            adapter = api._session._session.get_adapter(url=f"{prefix}127.0.0.1:9")
+            assert (adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block) == (3, 4, True)
+        adapter = api._session._session.get_adapter(url="http://127.0.0.1:9")
+        # opening a pool does not connect, so this works without a server
+        adapter.poolmanager.connection_from_url("http://127.0.0.1:9")
+        assert len(adapter.poolmanager.pools) == 1
+        api.close()
+        assert len(adapter.poolmanager.pools) == 0
+
+    def test_make_session_defaults(self):
+        session = dizqueTV.dizquetv_requests.make_session(keep_alive=False)
+        adapter = session._session.get_adapter(url="http://127.0.0.1:9")
+        assert (adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block) == (10, 10, False)
+        assert session._session.headers["Connection"] == "close"
+        dizqueTV.dizquetv_requests.close_session(session=session)
+
+
+@pytest.mark.skipif(web is None, reason="aiohttp is not installed")
+class TestAsyncAPI:
+    @staticmethod
+    def run_against_app(routes: list, test):
+        async def run():
+            app = web.Application()
+            app.add_routes(routes)
+            async with test_utils.TestServer(app) as server:
+                async with AsyncAPI(url=str(server.make_url("")), allow_analytics=False,
+                                    max_concurrency=3) as async_api:
+                    return await test(async_api)
+
+        return asyncio.run(run())
+
+    def test_request_and_timeout(self):
+        async def ok(request):
+            return web.json_response({"version": request.query.get("v")})
+
+        async def slow(request):
+            await asyncio.sleep(1)
+            return web.json_response({})
+
+        async def test(async_api):
+            response = await async_api._get(endpoint="ok", params={"v": "1"})
+            assert response and response.json() == {"version": "1"}
+            assert not await async_api._get(endpoint="/missing")
+            assert await async_api._get(endpoint="/slow", timeout=0.1) is None
+            assert await async_api._get_json(endpoint="/slow", timeout=0.1) == {}
+
+        self.run_against_app(routes=[web.get("/api/ok", ok), web.get("/api/slow", slow)], test=test)
+
+    def test_concurrency_is_bounded(self):
+        in_flight = {"now": 0, "most": 0}
+
+        async def wait(request):
+            in_flight["now"] += 1
+            in_flight["most"] = max(in_flight["most"], in_flight["now"])
+            await asyncio.sleep(0.05)
+            in_flight["now"] -= 1
+            return web.json_response({})
+
+        async def test(async_api):
+            await asyncio.gather(*[async_api._get(endpoint="/wait") for _ in range(10)])
+
+        self.run_against_app(routes=[web.get("/api/wait", wait)], test=test)
+        assert in_flight["most"] == 3
+
+    def test_connection_error_returns_none(self):
+        async def run():
+            # nothing listens on port 9
+            async with AsyncAPI(url="http://127.0.0.1:9", allow_analytics=False) as async_api:
+                assert await async_api._get(endpoint="/version") is None
+                assert await async_api._get_json(endpoint="/version") == {}
+
+        asyncio.run(run())
+
+    def test_get_filler_list_channels(self):
+        async def filler_channels(request):
+            return web.json_response([{"number": 2}, {"number": 3}, {"number": 1}])
+
+        async def channel(request):
+            number = int(request.match_info["number"])
+            if number == 3:
+                return web.json_response({}, status=404)
+            return web.json_response(channel_data(number=number))
+
+        async def test(async_api):
+            return await async_api.get_filler_list_channels(filler_list_id="abc")
+
+        channels = self.run_against_app(
+            routes=[web.get("/api/filler/abc/channels", filler_channels), web.get("/api/channel/{number}", channel)],
+            test=test,
+        )
+        assert [channel.number for channel in channels] == [2, 1]
+
+
+class TestChannelEdits:
+    @staticmethod
+    def offline_channel(detect_channel_conflicts: bool = False) -> Channel:
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False,
+                           detect_channel_conflicts=detect_channel_conflicts)
+        programs = [{"type": "movie", "title": "A", "duration": 10}, {"type": "movie", "title": "B", "duration": 20}]
+        return Channel(data=channel_data(number=1, programs=programs), dizque_instance=api)
+
+    def test_conflict_detection_survives_failed_fingerprint_fetch(self):
+        channel = self.offline_channel(detect_channel_conflicts=True)
+        api = channel._dizque_instance
+        server_fingerprints = [channel._fingerprint, None]
+        api._save_channel = lambda channel_data: True
+        api._get_channel_fingerprint = lambda channel_number: server_fingerprints.pop(0)
+        assert channel.update(name="Renamed")
+        assert channel._fingerprint
+        api._get_channel_fingerprint = lambda channel_number: "changed elsewhere"
+        with pytest.raises(dizqueTV.exceptions.ChannelConflictError):
+            channel.update(name="Renamed again")
+
+    def test_failed_commit_restores_channel(self):
+        channel = self.offline_channel()
+        channel._dizque_instance._save_channel = lambda channel_data: False
+        with pytest.raises(GeneralException):
+            with channel.batch():
+                channel.update(name="Renamed")
+                channel.delete_all_programs()
+        assert channel.name == "Channel 1"
+        assert [program.title for program in channel.programs] == ["A", "B"]
+        assert channel.duration == 30
+        # methods that batch their own edits are restored the same way
+        assert not channel.sort_programs_alphabetically()
+        assert [program.title for program in channel.programs] == ["A", "B"]
+
+    def test_programs_rebuilt_after_in_place_edits(self):
+        channel = self.offline_channel()
+        channel._dizque_instance._save_channel = lambda channel_data: False
+        assert [program.title for program in channel.programs] == ["A", "B"]
+        assert channel.program_table.durations.tolist() == [10, 20]
+        # the edit is made to the channel's program list in place, and stays there when the save fails
+        assert not channel.update_program(program=channel.programs[0], duration=15)
+        assert channel.program_table.durations.tolist() == [15, 20]
+        assert channel.timeline.durations.tolist() == [15, 20]
+        channel._data["programs"].reverse()
+        assert not channel.update(programs=channel._data["programs"])
+        assert [program.title for program in channel.programs] == ["B", "A"]
+        assert channel.program_table.durations.tolist() == [20, 15]
+
+    def test_commit_restores_channel_on_conflict(self):
+        channel = self.offline_channel(detect_channel_conflicts=True)
+        channel._dizque_instance._get_channel_fingerprint = lambda channel_number: "changed elsewhere"
+        channel.begin()
+        channel.update(name="Renamed")
+        with pytest.raises(dizqueTV.exceptions.ChannelConflictError):
+            channel.commit()
+        assert channel.name == "Channel 1"
+        assert not channel._batch_depth
+
+
+class TestMediaModels:
+    def test_fields_read_shared_data_and_writes_stay_out_of_it(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        programs = [{"type": "episode", "title": "A", "showTitle": "S", "season": 1, "episode": 1, "duration": 10},
+                    {"type": "movie", "title": "B", "duration": 20}]
+        channel = Channel(data=channel_data(number=1, programs=programs), dizque_instance=api)
+        program = channel.programs[0]
+        assert program._data is channel._data["programs"][0]
+        assert (program.title, program.showTitle, program.duration) == ("A", "S", 10)
+        assert not hasattr(program, "__dict__")
+        program.duration = 999
+        assert program.duration == 999
+        # as with plain attributes, a write never changes the JSON sent back to dizqueTV
+        assert program._data is channel._data["programs"][0]
+        assert program._data["duration"] == 10
+        assert channel.program_table.durations.tolist() == [10, 20]
+        assert channel.timeline.durations.tolist() == [10, 20]
+
+        row = {"type": "movie", "title": "C", "duration": 30}
+        for item in (dizqueTV.models.media.FillerItem(data=row, dizque_instance=api, filler_list_instance=None),
+                     dizqueTV.models.media.Redirect(data=row, dizque_instance=api, channel_instance=None),
+                     dizqueTV.models.custom_show.CustomShowItem(data=row, dizque_instance=api, order=0)):
+            item.duration = 1
+            assert item.duration == 1
+            assert item._data["duration"] == row["duration"] == 30
+
+
+class TestParallelExecutor:
+    def test_map_keeps_order_and_collects_errors(self):
+        def square(number):
+            if number == 3:
+                raise ValueError("bad number")
+            sleep(0.01 * (5 - number))
+            return number * number
+
+        executor = ParallelExecutor(max_workers=4)
+        results = executor.map(func=square, elements=range(5), element_param_name="number")
+        executor.shutdown()
+        assert [task.element for task in results] == [0, 1, 2, 3, 4]
+        assert [task.result for task in results] == [0, 1, 4, None, 16]
+        assert isinstance(results[3].error, ValueError)
+
+    def test_imap_unordered_and_timeout(self):
+        def nap(seconds):
+            sleep(seconds)
+            return seconds
+
+        executor = ParallelExecutor(max_workers=2)
+        results = list(
+            executor.imap(
+                func=nap, elements=[0.5, 0.01], element_param_name="seconds", ordered=False, timeout=0.2
+            )
+        )
+        executor.shutdown()
+        assert [task.element for task in results] == [0.01, 0.5]
+        assert results[0].succeeded
+        assert not results[1].succeeded
+
+    def test_timed_out_tasks_do_not_stall_later_calls(self):
+        release = threading.Event()
+
+        def hang(number):
+            # stands in for a request that never returns; the timeout cannot stop it
+            release.wait(timeout=3)
+            return number
+
+        executor = ParallelExecutor(max_workers=2, timeout=0.05)
+        for _ in range(3):
+            results = executor.map(func=hang, elements=range(2), element_param_name="number")
+            assert not any(task.succeeded for task in results)
+        started = datetime.now()
+        results = executor.map(func=lambda number: number, elements=range(4), element_param_name="number")
+        assert (datetime.now() - started).total_seconds() < 1
+        assert [task.result for task in results] == [0, 1, 2, 3]
+        release.set()
+        executor.shutdown()
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight()
+        barrier = threading.Barrier(8)
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(1)
+            sleep(0.2)
+            return {"numbers": [1, 2, 3]}
+
+        def worker():
+            barrier.wait()
+            results.append(single_flight.do(key="numbers", func=fetch, copy_func=_copy_json))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert single_flight.stats == {"calls": 8, "coalesced": 7, "in_flight": 0}
+        assert all(result == {"numbers": [1, 2, 3]} for result in results)
+        assert len({id(result) for result in results}) == 8
+
+    def test_raw_and_json_reads_share_one_request(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        barrier = threading.Barrier(8)
+        sent = []
+
+        def send_get(endpoint, **kwargs):
+            sent.append(endpoint)
+            sleep(0.2)
+            response = requests.models.Response()
+            response.status_code = 200
+            response._content = b'{"numbers": [1, 2, 3]}'
+            return response
+
+        api._send_get = send_get
+        raw, decoded = [], []
+
+        def read(index):
+            barrier.wait()
+            if index % 2:
+                raw.append(api._get(endpoint="/channelNumbers"))
+            else:
+                decoded.append(api._get_json(endpoint="/channelNumbers"))
+
+        threads = [threading.Thread(target=read, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sent == ["/channelNumbers"]
+        assert len({id(response) for response in raw}) == 4
+        assert all(response.json() == {"numbers": [1, 2, 3]} for response in raw)
+        assert all(response.content == b'{"numbers": [1, 2, 3]}' for response in raw)
+        assert decoded == [{"numbers": [1, 2, 3]}] * 4
+        assert len({id(result) for result in decoded}) == 4
+
+    def test_concurrent_channel_reads_share_one_request(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        barrier = threading.Barrier(4)
+        sent = []
+
+        def send_get(endpoint, **kwargs):
+            sent.append(endpoint)
+            sleep(0.2)
+            response = requests.models.Response()
+            response.status_code = 200
+            body = [1] if endpoint == "/channelNumbers" else channel_data(number=1)
+            response._content = json.dumps(body).encode("utf-8")
+            return response
+
+        api._send_get = send_get
+        channels = []
+
+        def read():
+            barrier.wait()
+            channels.extend(api.channels)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(sent) == ["/channel/1", "/channelNumbers"]
+        assert [channel.number for channel in channels] == [1, 1, 1, 1]
+        assert len({id(channel._data) for channel in channels}) == 4
+
+
+class TestResponseCache:
+    def test_cache_hits_expiry_and_invalidation(self):
+        cache = ResponseCache(ttls={"/channelNumbers": 0.2, "/version": 60})
+        fetched = []
+
+        def fetch_numbers():
+            fetched.append("/channelNumbers")
+            return [1, 2, 3]
+
+        assert cache.get(endpoint="/channelNumbers", key="numbers", fetch=fetch_numbers) == [1, 2, 3]
+        numbers = cache.get(endpoint="/channelNumbers", key="numbers", fetch=fetch_numbers)
+        numbers.append(4)
+        assert cache.get(endpoint="/channelNumbers", key="numbers", fetch=fetch_numbers) == [1, 2, 3]
+        assert len(fetched) == 1
+
+        sleep(0.25)
+        cache.get(endpoint="/channelNumbers", key="numbers", fetch=fetch_numbers)
+        assert len(fetched) == 2
+
+        cache.get(endpoint="/version", key="version", fetch=lambda: {"dizquetv": "1.5.0"})
+        cache.invalidate(endpoint="/channel")
+        assert cache.stats["entries"] == 1
+        cache.invalidate(endpoint="/channel-tools/time-slots")
+        assert cache.stats["entries"] == 1
+        assert not cache.caches(endpoint="/channel/1")
+
+
+class TestGuideCache:
+    def test_guide_reused_until_updated(self):
+        cache = GuideCache()
+        fetched = []
+
+        def fetch():
+            fetched.append(True)
+            return {"1": {"channel": {"number": 1}, "programs": [{"title": "A"}]}}
+
+        first = cache.get(last_update="2021-01-01T00:00:00.000Z", fetch=fetch)
+        assert cache.get(last_update="2021-01-01T00:00:00.000Z", fetch=fetch) is first
+        cache.get(last_update="2021-01-01T01:00:00.000Z", fetch=fetch)
+        cache.get(last_update=None, fetch=fetch)
+        assert len(fetched) == 3
+        assert cache.stats == {"hits": 1, "misses": 3}
+
+    def test_xmltv_refreshed_only_when_guide_changes(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        server = {"lastUpdate": "1", "refreshes": 0, "refresh_works": True}
+
+        def refresh_xml():
+            if not server["refresh_works"]:
+                return False
+            # like the server, rewriting xmltv.xml moves the guide's lastUpdate
+            server["refreshes"] += 1
+            server["lastUpdate"] += "+"
+            return True
+
+        api._get_json = api._get_json_uncached = lambda endpoint, **kwargs: {"lastUpdate": server["lastUpdate"]}
+        api.refresh_xml = refresh_xml
+        api._refresh_xml_if_guide_changed()
+        api._refresh_xml_if_guide_changed()
+        assert server["refreshes"] == 1
+
+        server["lastUpdate"] = "2"
+        server["refresh_works"] = False
+        api._refresh_xml_if_guide_changed()
+        server["refresh_works"] = True
+        api._refresh_xml_if_guide_changed()
+        api._refresh_xml_if_guide_changed()
+        assert server["refreshes"] == 2
+
+    def test_guide_programs_built_lazily(self):
+        guide = Guide(data={"1": {"channel": {"number": 1}, "programs": [{"title": "A"}]}}, dizque_instance=None)
+        channel = guide.channels[0]
+        assert channel._programs is None
+        assert [program.title for program in channel.programs] == ["A"]
+        assert channel.programs is channel.programs
+
+    def test_lineups_only_fetch_missing_ranges(self):
+        cache = LineupCache()
+        cache.sync(last_update="1")
+        programs = [
+            {"start": f"2021-01-01T{hour:02d}:00:00.000Z", "stop": f"2021-01-01T{hour + 1:02d}:00:00.000Z"}
+            for hour in range(23)
+        ]
+        fetched = []
+
+        def fetch(start, stop):
+            fetched.append((start, stop))
+            return [program for program in programs if program["stop"] > start and program["start"] < stop]
+
+        def lineup(start_hour, stop_hour):
+            return [
+                program["start"][11:13]
+                for program in cache.get(
+                    channel_number=1,
+                    start=f"2021-01-01T{start_hour}:30:00.000Z",
+                    stop=f"2021-01-01T{stop_hour}:30:00.000Z",
+                    fetch=fetch,
+                )
+            ]
+
+        assert lineup("02", "05") == ["02", "03", "04", "05"]
+        assert lineup("03", "06") == ["03", "04", "05", "06"]
+        assert fetched[-1] == ("2021-01-01T05:30:00.000Z", "2021-01-01T06:30:00.000Z")
+        assert lineup("04", "05") == ["04", "05"]
+        assert len(fetched) == 2 and cache.stats["hits"] == 1
+        cache.sync(last_update="2")
+        assert lineup("04", "05") == ["04", "05"]
+        assert len(fetched) == 3
+
+    def test_get_lineups_fetches_missing_windows_concurrently(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        requested = []
+
+        def get_json(endpoint, params=None, **kwargs):
+            if endpoint == "/guide/status":
+                return {"lastUpdate": "1"}
+            requested.append((endpoint, params["dateFrom"][11:16], params["dateTo"][11:16]))
+            programs = [
+                {"title": f"{endpoint[-1]}-{hour:02d}", "start": f"2021-01-01T{hour:02d}:00:00.000Z",
+                 "stop": f"2021-01-01T{hour + 1:02d}:00:00.000Z"}
+                for hour in range(23)
+            ]
+            return {"programs": [program for program in programs
+                                 if program["stop"] > params["dateFrom"] and program["start"] < params["dateTo"]]}
+
+        api._get_json = get_json
+        guide = Guide(data={str(number): {"channel": {"number": number}, "programs": []} for number in (1, 2)},
+                      dizque_instance=api)
+
+        def titles(lineups):
+            return {number: [program.title for program in programs] for number, programs in lineups.items()}
+
+        lineups = guide.get_lineups(from_date=datetime(2021, 1, 1, 2, 30), to_date=datetime(2021, 1, 1, 5, 30))
+        assert titles(lineups) == {number: [f"{number}-{hour:02d}" for hour in range(2, 6)] for number in (1, 2)}
+        assert sorted(requested) == [("/guide/channels/1", "02:30", "05:30"), ("/guide/channels/2", "02:30", "05:30")]
+
+        requested.clear()
+        lineups = guide.get_lineups(from_date=datetime(2021, 1, 1, 3, 30), to_date=datetime(2021, 1, 1, 6, 30),
+                                    channels=[1, 2])
+        assert titles(lineups) == {number: [f"{number}-{hour:02d}" for hour in range(3, 7)] for number in (1, 2)}
+        assert sorted(requested) == [("/guide/channels/1", "05:30", "06:30"), ("/guide/channels/2", "05:30", "06:30")]
+
+
+class TestGuideIndex:
+    def test_ranges_gaps_and_overlaps(self):
+        def program(start, stop, title):
+            return {"start": f"2021-01-01T{start}:00.000Z", "stop": f"2021-01-01T{stop}:00.000Z", "title": title}
+
+        guide = Guide(
+            data={
+                "1": {
+                    "channel": {"number": 1},
+                    "programs": [
+                        program("00:00", "01:00", "A"),
+                        program("01:30", "03:00", "B"),
+                        program("02:00", "02:30", "C"),
+                    ],
+                },
+                "2": {"channel": {"number": 2}, "programs": [program("00:30", "02:00", "D")]},
+                "3": {"channel": {"number": 3}, "programs": []},
+            },
+            dizque_instance=None,
+        )
+        index = guide.index
+        at = {number: program and program.title for number, program in index.at(datetime(2021, 1, 1, 2, 45)).items()}
+        assert at == {1: "B", 2: None, 3: None}
+        between = index.between(from_date=datetime(2021, 1, 1, 0, 45), to_date=datetime(2021, 1, 1, 2))
+        assert {number: [program.title for program in programs] for number, programs in between.items()} == {
+            1: ["A", "B"], 2: ["D"], 3: []
+        }
+        assert index[1].gaps() == [(datetime(2021, 1, 1, 1), datetime(2021, 1, 1, 1, 30))]
+        assert [(first.title, second.title) for first, second in index[1].overlaps()] == [("B", "C")]
+
+
+class TestBlocks:
+    def test_partition_into_blocks(self):
+        assert partition_into_blocks(durations=[10, 20, 30, 100, 5, 0, 5], block_length=30) == [
+            (0, 2, 30), (2, 3, 30), (3, 4, 100), (4, 7, 10)
+        ]
+        # the first block may be left empty, but every later block takes at least one program
+        assert partition_into_blocks(durations=[40, 20], block_length=30, first_block_length=30) == [
+            (0, 0, 0), (0, 1, 40), (1, 2, 20)
+        ]
+        assert partition_into_blocks(durations=[], block_length=30) == []
+
+    def test_fill_length(self):
+        assert fill_length(durations=[10, 20, 0, 5], length=30) == (2, 30)
+        assert fill_length(durations=[10, 25, 5], length=30) == (1, 10)
+        assert fill_length(durations=[10, 25, 5], length=30, allow_overtime=True) == (2, 35)
+        assert fill_length(durations=[10], length=30) == (1, 10)
+
+
+class TestPadTimes:
+    minute = 60 * 1000
+
+    def offline_channel(self) -> Channel:
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        programs = [
+            {"type": "movie", "title": "A", "duration": 20 * self.minute},
+            {"duration": 5 * self.minute, "isOffline": True},
+            {"type": "episode", "title": "X1", "customShowId": "x", "customShowName": "X",
+             "duration": 10 * self.minute},
+            {"type": "episode", "title": "X2", "customShowId": "x", "customShowName": "X",
+             "duration": 15 * self.minute},
+            {"type": "episode", "title": "Y1", "customShowId": "y", "customShowName": "Y",
+             "duration": 20 * self.minute},
+            {"type": "redirect", "channel": 2, "isOffline": True, "duration": 25 * self.minute},
+            {"type": "movie", "title": "B", "duration": 30 * self.minute},
+        ]
+        return Channel(data=channel_data(number=1, programs=programs), dizque_instance=api)
+
+    def test_needed_flex_times(self):
+        frame = 30 * 60 * 1000
+        flex_times = dizqueTV.helpers.get_needed_flex_times(
+            item_times_milliseconds=[0, 1, frame - 1, frame, frame + 1], allowed_minutes_time_frame=30
+        )
+        assert flex_times.tolist() == [0, frame - 1, 1, 0, frame - 1]
+        assert dizqueTV.helpers.get_needed_flex_time(item_time_milliseconds=1, allowed_minutes_time_frame=30) == frame - 1
+
+    def test_dry_run_leaves_channel_alone(self):
+        channel = self.offline_channel()
+        # A, custom shows x and y and the redirect need 10, 5, 10 and 5 minutes to end on the half hour, B none
+        assert channel.pad_times(start_every_x_minutes=30, dry_run=True) == (30 * self.minute, 150 * self.minute)
+        assert len(channel._data["programs"]) == 7
+        assert channel.duration == 125 * self.minute
+
+    def test_pads_units_and_keeps_redirects(self):
+        channel = self.offline_channel()
+        saved = []
+        channel._dizque_instance._save_channel = lambda channel_data: saved.append(channel_data) or True
+        assert channel.pad_times(start_every_x_minutes=30)
+        programs = saved[-1]["programs"]
+        assert [program.get("title", program.get("type", "pad")) for program in programs] == [
+            "A", "pad", "X1", "X2", "pad", "Y1", "pad", "redirect", "pad", "B"
+        ]
+        assert [program["duration"] // self.minute for program in programs if "type" not in program] == [10, 5, 10, 5]
+        assert saved[-1]["duration"] == channel.duration == 150 * self.minute
+
+
+class TestJSONStreamReader:
+    def test_load_matches_json_for_any_chunk_size(self):
+        document = {
+            "number": 1,
+            "name": "Café \U0001F4FA",
+            "programs": [{"title": f"Episode {i}", "duration": 1.5e6 + i, "isOffline": False} for i in range(50)],
+            "fillerCollections": [],
+            "watermark": None,
+        }
+        raw = json.dumps(document, ensure_ascii=False).encode("utf-8")
+        for size in (1, 3, 64, 4096):
+            chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+            assert streaming.load(chunks=chunks) == document
+
+    def test_iter_object_streams_selected_arrays(self):
+        raw = b'{"programs": [{"title": "A"}, {"title": "B"}, {"title": "C"}], "number": 12345}'
+        chunks = [raw[i:i + 5] for i in range(0, len(raw), 5)]
+        reader = streaming.JSONStreamReader(chunks=chunks)
+        members = {}
+        for key, value in reader.iter_object(stream_keys=["programs"]):
+            # only take the first program; the rest are skipped
+            members[key] = next(value) if key == "programs" else value
+        assert members == {"programs": {"title": "A"}, "number": 12345}
+
+
+class TestProgramTable:
+    def test_columns_and_orders(self):
+        rows = [
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 2, "duration": 20, "title": "b2"},
+            {"type": "movie", "title": "Zed", "duration": 90},
+            {"type": "episode", "showTitle": "A", "season": 2, "episode": 1, "duration": 30, "title": "a1"},
+            {"type": "redirect", "channel": 5, "duration": 60},
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 1, "duration": 10, "title": "b1"},
+        ]
+        table = ProgramTable(rows=rows)
+        assert table.seasons.tolist() == [1, MISSING, 2, MISSING, 1]
+        assert table.show_titles.values == ["B", "A"]
+        assert table.types.equals("episode").tolist() == [True, False, True, False, True]
+        assert table.show_order().tolist() == [2, 4, 0]
+        assert table.show_order(alphabetical=False).tolist() == [4, 0, 2]
+        assert table.materialize(table.alphabetical_order()) == [rows[2], rows[0], rows[4], rows[1], rows[3]]
+
+
+class TestCyclicalShuffle:
+    def test_seeded_rotation(self):
+        rows = [{"type": "episode", "showTitle": show, "season": 1, "episode": episode, "duration": 10,
+                 "title": f"{show}{episode}"} for show in "AB" for episode in range(1, 6)]
+        rows += [{"type": "movie", "title": f"m{number}", "duration": 90} for number in range(3)]
+        table = ProgramTable(rows=rows)
+        first = dizqueTV.helpers.sort_media_cyclical_shuffle(media_items=table,
+                                                             random_generator=numpy.random.default_rng(7))
+        second = dizqueTV.helpers.sort_media_cyclical_shuffle(media_items=table,
+                                                              random_generator=numpy.random.default_rng(7))
+        assert first == second
+        assert sorted(item["title"] for item in first) == sorted(row["title"] for row in rows)
+        for show in "AB":
+            episodes = [item["episode"] for item in first if item.get("showTitle") == show]
+            # each show plays in order from a random episode, wrapping around
+            assert episodes == [(episodes[0] - 1 + offset) % 5 + 1 for offset in range(5)]
+
+
+class TestBlockShuffle:
+    def test_turns_and_random_blocks(self):
+        rows = [{"type": "episode", "showTitle": show, "season": 1, "episode": episode, "duration": 10,
+                 "title": f"{show}{episode}"} for show, count in (("B", 3), ("A", 5)) for episode in range(count, 0, -1)]
+        rows.append({"type": "movie", "title": "m", "duration": 90})
+        table = ProgramTable(rows=rows)
+        ordered = dizqueTV.helpers.sort_media_block_shuffle(media_items=table, block_length=2)
+        assert [item["title"] for item in ordered] == ["B1", "B2", "A1", "A2", "B3", "A3", "A4", "A5", "m"]
+        shuffled = dizqueTV.helpers.sort_media_block_shuffle(media_items=table, block_length=3, randomize=True,
+                                                             random_generator=numpy.random.default_rng(5))
+        assert shuffled == dizqueTV.helpers.sort_media_block_shuffle(
+            media_items=table, block_length=3, randomize=True, random_generator=numpy.random.default_rng(5))
+        assert shuffled[-1]["title"] == "m"
+        for show, count in (("B", 3), ("A", 5)):
+            assert [item["episode"] for item in shuffled if item.get("showTitle") == show] == list(range(1, count + 1))
+
+
+class TestWeightedSampler:
+    def test_draws_follow_weights_as_they_drain(self):
+        sampler = WeightedSampler(weights=[1, 0, 3], items=["a", "b", "c"],
+                                  random_generator=numpy.random.default_rng(1))
+        counts = numpy.bincount(sampler.sample_indices(size=40000), minlength=3)
+        assert counts[1] == 0
+        assert 2.8 < counts[2] / counts[0] < 3.2
+        sampler.drain(index=2, amount=2)
+        counts = numpy.bincount(sampler.sample_indices(size=40000), minlength=3)
+        assert 0.9 < counts[2] / counts[0] < 1.1
+        sampler.update(index=0, weight=0)
+        assert set(sampler.sample(size=100)) == {"c"}
+        assert sampler.sample() == "c"
+        sampler.drain(index=2)
+        with pytest.raises(GeneralException):
+            sampler.sample()
+
+    def test_weighted_choices_follow_numpy_seed(self):
+        items = [("a", 1), ("b", 2), ("c", 3)]
+        numpy.random.seed(5)
+        expected = [numpy.random.choice(a=3, size=1, p=[0.25, 0.25, 0.5])[0] for _ in range(20)]
+        numpy.random.seed(5)
+        drawn = [dizqueTV.helpers.weighted_choice_by_sizes_lists(items=items, sizes=[1, 1, 2]) for _ in range(20)]
+        assert drawn == [items[index] for index in expected]
+        numpy.random.seed(5)
+        drawn = [dizqueTV.helpers.weighted_choice_by_sizes_dict(items_and_sizes={"a": 1, "b": 1, "c": 2})
+                 for _ in range(20)]
+        assert drawn == ["abc"[index] for index in expected]
+
+
+class TestShowIndex:
+    def test_show_index(self):
+        rows = [
+            {"type": "episode", "showTitle": "B", "season": 2, "episode": 1, "duration": 5},
+            {"type": "episode", "showTitle": "A", "season": 1, "episode": 1, "duration": 30},
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 2, "duration": 20},
+            {"type": "movie", "title": "Zed", "duration": 90},
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 1, "duration": 10},
+        ]
+        table = ProgramTable(rows=rows)
+        index = table.show_index(alphabetical=False)
+        assert table.show_index(alphabetical=False) is index
+        assert index.show_titles == ["B", "A"]
+        assert index.episodes.tolist() == [4, 2, 0, 1]
+        assert index.show_durations.tolist() == [35, 30]
+        assert index.show_running_durations.tolist() == [10, 30, 35, 30]
+        assert index.seasons.tolist() == [1, 2, 1]
+        assert index.season_episode_counts.tolist() == [2, 1, 1]
+        assert index.season_shows.tolist() == [0, 0, 1]
+        assert index.season_episodes(season_number=1).tolist() == [0]
+        assert ProgramTable(rows=[]).show_index().show_durations.tolist() == []
+
+    def test_channel_show_index_reused_until_programs_change(self):
+        api = dizqueTV.API(url="http://127.0.0.1:9", allow_analytics=False)
+        api._save_channel = lambda channel_data: True
+        rows = [
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 1, "duration": 10},
+            {"type": "episode", "showTitle": "A", "season": 1, "episode": 1, "duration": 30},
+            {"type": "episode", "showTitle": "B", "season": 1, "episode": 2, "duration": 20},
+        ]
+        channel = Channel(data=channel_data(number=1, programs=rows), dizque_instance=api)
+        index = channel.show_index
+        assert channel.show_index is index
+        assert index.show_titles == ["B", "A"]
+        assert channel.update(programs=rows[1:])
+        assert channel.show_index is not index
+        assert channel.show_index is channel.show_index
+        assert channel.show_index.show_titles == ["A", "B"]
+
+
+class TestBalanceShows:
+    def test_balance_targets(self):
+        rows = [{"type": "episode", "showTitle": show, "season": 1, "episode": episode, "duration": 10}
+                for show, count in (("A", 2), ("B", 4), ("C", 6)) for episode in range(1, count + 1)]
+        table = ProgramTable(rows=rows)
+
+        def kept(**kwargs):
+            balanced = dizqueTV.helpers.balance_shows(media_items=table, **kwargs)
+            return collections.Counter(item["showTitle"] for item in balanced)
+
+        assert kept() == {"A": 2, "B": 2, "C": 2}
+        assert kept(target_duration=35, margin_of_correction=0) == {"A": 2, "B": 3, "C": 3}
+        assert kept(target_percentile=50, margin_of_correction=0.25) == {"A": 2, "B": 4, "C": 5}
+        with pytest.raises(GeneralException):
+            kept(target_duration=10, target_percentile=50)
+
+
+class TestTimelineIndex:
+    def test_locate_and_window_loop(self):
+        start = datetime(2021, 1, 1)
+        timeline = TimelineIndex(start_time=start, durations=[100, 0, 200, 300])
+        assert timeline.locate(elapsed=-1) is None
+        assert timeline.locate(elapsed=0) == (0, 0)
+        # zero-length programs never air
+        assert timeline.locate(elapsed=100) == (2, 100)
+        assert timeline.locate(elapsed=650) == (0, 600)
+        assert timeline.elapsed_milliseconds(at=start + timedelta(seconds=1)) == 1000
+        indexes, begins = timeline.window(start=250, end=750)
+        assert indexes.tolist() == [2, 3, 0, 2]
+        assert begins.tolist() == [100, 300, 600, 700]
+
+
+class TestChannelSchedule:
+    hour = 60 * 60 * 1000
+
+    def offline_channel(self) -> Channel:
+        # A then B, looping every 90 minutes from midnight
+        programs = [{"type": "movie", "title": "A", "duration": self.hour},
+                    {"type": "movie", "title": "B", "duration": self.hour // 2}]
+        return Channel(data=channel_data(number=1, programs=programs), dizque_instance=None)
+
+    def test_now_playing(self):
+        channel = self.offline_channel()
+        assert channel.now_playing(at=datetime(2020, 12, 31, 23)) is None
+        playing = channel.now_playing(at=datetime(2021, 1, 1, 0, 30))
+        assert (playing.program.title, playing.index) == ("A", 0)
+        assert (playing.start, playing.stop) == (datetime(2021, 1, 1), datetime(2021, 1, 1, 1))
+        assert channel.now_playing(at=datetime(2021, 1, 1, 1, 29, 59)).program.title == "B"
+        # the lineup starts over at 01:30
+        playing = channel.now_playing(at=datetime(2021, 1, 1, 1, 30))
+        assert (playing.program.title, playing.index) == ("A", 0)
+        assert (playing.start, playing.stop) == (datetime(2021, 1, 1, 1, 30), datetime(2021, 1, 1, 2, 30))
+
+    def test_lineup(self):
+        channel = self.offline_channel()
+        lineup = channel.lineup(from_date=datetime(2021, 1, 1, 1, 15), to_date=datetime(2021, 1, 1, 2, 45))
+        assert [(airing.program.title, airing.start.hour, airing.start.minute) for airing in lineup] == [
+            ("B", 1, 0), ("A", 1, 30), ("B", 2, 30)
+        ]
+        assert lineup[-1].stop == datetime(2021, 1, 1, 3)
+        lineup = channel.lineup(from_date=datetime(2020, 12, 31, 23, 30), to_date=datetime(2021, 1, 1, 0, 30))
+        assert [airing.program.title for airing in lineup] == ["A"]
+        assert channel.lineup(from_date=datetime(2020, 12, 31, 22), to_date=datetime(2020, 12, 31, 23)) == []
+
+
+class TestPlayoutResolver:
+    @staticmethod
+    def _channel(number: int, programs: list) -> Channel:
+        data = {
+            "number": number,
+            "startTime": "2021-01-01T00:00:00.000Z",
+            "duration": sum(program["duration"] for program in programs),
+            "programs": programs,
+            "fallback": [],
+        }
+        return Channel(data=data, dizque_instance=None)
+
+    def test_follows_redirects_and_detects_cycles(self):
+        resolver = PlayoutResolver(
+            channels=[
+                self._channel(1, [{"type": "redirect", "channel": 2, "duration": 60000}]),
+                self._channel(2, [{"type": "movie", "title": "A", "duration": 30000},
+                                  {"type": "movie", "title": "B", "duration": 30000}]),
+                self._channel(3, [{"type": "redirect", "channel": 4, "duration": 60000}]),
+                self._channel(4, [{"type": "redirect", "channel": 3, "duration": 60000}]),
+            ]
+        )
+        at = datetime(2021, 1, 1, 0, 0, 45)
+        resolved = resolver.resolve(channel_number=1, at=at)
+        assert resolved.path == (1, 2)
+        assert resolved.program.title == "B"
+        assert resolved.until == datetime(2021, 1, 1, 0, 1)
+        with pytest.raises(RedirectCycleError):
+            resolver.resolve(channel_number=3, at=at)
+        everything = resolver.resolve_all(at=at)
+        assert everything[2].program.title == "B"
+        assert everything[3] is None and everything[4] is None
+
+
+class TestXMLTVWriter:
+    @staticmethod
+    def _channel(number: int, programs: list) -> Channel:
+        return Channel(data=channel_data(number, programs), dizque_instance=None)
+
+    def test_write_xmltv_follows_redirects(self):
+        channels = [
+            self._channel(1, [{"type": "movie", "title": "A", "duration": 3600000},
+                              {"type": "redirect", "channel": 2, "duration": 3600000}]),
+            self._channel(2, [{"type": "movie", "title": "B & C", "duration": 1800000}]),
+        ]
+        output = io.BytesIO()
+        count = write_xmltv(channels=channels, output=output, hours=48, from_date=datetime(2021, 1, 1))
+        programmes = ElementTree.fromstring(output.getvalue()).findall("programme")
+        assert count == len(programmes) == 72 + 96
+        first_channel = [programme for programme in programmes if programme.get("channel") == "1"]
+        assert [programme.find("title").text for programme in first_channel[:3]] == ["A", "B & C", "B & C"]
+        assert first_channel[2].get("stop") == "20210101020000 +0000"
+
+    def test_write_xmltv_keeps_programs_crossing_a_window_once(self):
+        hour = 3600000
+        channels = [
+            self._channel(1, [{"type": "movie", "title": "A", "duration": 20 * hour},
+                              {"type": "movie", "title": "B", "duration": 8 * hour},
+                              {"type": "movie", "title": "C", "duration": 20 * hour}]),
+        ]
+        output = io.BytesIO()
+        # the guide starts an hour into A, and B runs from hour 20 to 28, across the first 24-hour window
+        count = write_xmltv(channels=channels, output=output, hours=47, from_date=datetime(2021, 1, 1, 1))
+        programmes = ElementTree.fromstring(output.getvalue()).findall("programme")
+        assert count == len(programmes) == 3
+        assert [programme.find("title").text for programme in programmes] == ["A", "B", "C"]
+        assert programmes[0].get("start") == "20210101000000 +0000"
+        assert programmes[1].get("start") == "20210101200000 +0000"
+        assert programmes[1].get("stop") == "20210102040000 +0000"
+
+
+class TestXMLTVReader:
+    def test_iter_programmes_filters_while_streaming(self):
+        document = (
+            b'<?xml version="1.0" encoding="UTF-8"?><tv><channel id="1"><display-name>One</display-name></channel>'
+            b'<programme start="20210101000000 +0000" stop="20210101010000 +0000" channel="1"><title>A</title></programme>'
+            b'<programme start="20210101010000 +0100" stop="20210101020000 +0100" channel="1"><title>B</title>'
+            b'<rating><value>TV-PG</value></rating></programme>'
+            b'<programme start="20210101010000 +0000" stop="20210101020000 +0000" channel="2"><title>C</title></programme>'
+            b'</tv>'
+        )
+        chunks = [document[i:i + 7] for i in range(0, len(document), 7)]
+        programmes = list(
+            iter_programmes(chunks=chunks, channel_ids=[1], from_date=datetime(2021, 1, 1, 0, 30))
+        )
+        assert [programme.title for programme in programmes] == ["A", "B"]
+        assert programmes[1].start == datetime(2021, 1, 1) and programmes[1].rating == "TV-PG"
+        assert [p.title for p in iter_programmes(chunks=chunks, to_date=datetime(2021, 1, 1, 1))] == ["A", "B"]